@@ -28,6 +28,7 @@ Use the left sidebar to navigate:
 - **Upload & Parse**: upload PDF/DOCX resumes and parse into structured JSON
 - **Search**: filter candidates by geo/approach/sector/skills/experience + keyword search
 - **Insights**: visualize candidate pool distributions
+- **Metrics**: per-stage ingest latency, errors and LLM token usage
 """
 )
 
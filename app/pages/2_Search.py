@@ -17,103 +17,160 @@ from dotenv import load_dotenv
 import streamlit as st
 import pandas as pd
 
-from core.db import get_session, query_candidates, get_candidate_json
+from core.db import get_session, get_candidate_json, get_candidates
+from core.vectors import get_vector_index
+from core.query_cache import cached_search_page, cached_count, cached_facet_values, normalize_filters
 from core.config import resolve_db_url
-from core import taxonomy
+from core import profiling, taxonomy
 
 load_dotenv()
 DB_URL = resolve_db_url(os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite"))
 
 st.set_page_config(page_title="Search Candidates", layout="wide")
-st.title("Search & Filter Candidates")
-
-session = get_session(DB_URL)
-
-with st.sidebar:
-    st.header("Filters")
-    geo = st.multiselect("Geographic Market", taxonomy.GEOGRAPHIC_MARKETS)
-    approach = st.multiselect("Approach", taxonomy.INVESTMENT_APPROACHES)
-    sector = st.multiselect("Sector (any match)", taxonomy.SECTORS)
-    role = st.multiselect("Role (any match)", taxonomy.ROLES)
-    degree = st.multiselect("Degree level", taxonomy.DEGREE_LEVELS)
-    min_exp, max_exp = st.slider("Years of Experience", 0, 30, (0, 30))
-    include_unknown_exp = st.checkbox("Include candidates with unknown experience", value=True)
-    keyword = st.text_input("Keyword (skills/employers/bullets)", value="")
-
-records = query_candidates(
-    session=session,
-    geo_markets=geo or None,
-    approaches=approach or None,
-    sectors_any=sector or None,
-    roles_any=role or None,
-    degree_levels=degree or None,
-    min_exp=float(min_exp),
-    max_exp=float(max_exp),
-    keyword=keyword or None,
-    include_unknown_exp=include_unknown_exp,
-    limit=500,
-)
-
-rows = []
-for r in records:
-    rows.append({
-        "resume_id": r.resume_id,
-        "name": r.full_name,
-        "geo_market": r.geo_market,
-        "country": r.country,
-        "approach": r.approach,
-        "years_experience": r.years_experience,
-        "sectors": ", ".join(json.loads(r.sectors_json)),
-        "top_programming": ", ".join(json.loads(r.skills_programming_json)[:3]),
-        "source_filename": r.source_filename,
-    })
-
-df = pd.DataFrame(rows)
-
-st.subheader(f"Results ({len(df)})")
-st.dataframe(df, use_container_width=True, hide_index=True)
-
-colA, colB, colC = st.columns([1,1,1])
-
-with colA:
-    st.download_button(
-        "Export results CSV",
-        data=df.to_csv(index=False).encode("utf-8"),
-        file_name="candidate_search_results.csv",
-        mime="text/csv",
-        disabled=df.empty
+with profiling.page_profile("search"):  # PROFILE_PAGES=1
+    st.title("Search & Filter Candidates")
+
+    session = get_session(DB_URL)
+
+    with st.sidebar:
+        st.header("Filters")
+        geo = st.multiselect("Geographic Market", taxonomy.GEOGRAPHIC_MARKETS)
+        approach = st.multiselect("Approach", taxonomy.INVESTMENT_APPROACHES)
+        sector = st.multiselect("Sector", taxonomy.SECTORS)
+        sector_all = st.radio("Sector match", ["any", "all"], horizontal=True, key="sector_match") == "all"
+        role = st.multiselect("Role", taxonomy.ROLES)
+        role_all = st.radio("Role match", ["any", "all"], horizontal=True, key="role_match") == "all"
+        asset_class = st.multiselect("Asset class (any match)", taxonomy.ASSET_CLASSES)
+        skills = st.multiselect("Skills (must have all)", cached_facet_values(session, "skill"))
+        degree = st.multiselect("Degree level", taxonomy.DEGREE_LEVELS)
+        min_exp, max_exp = st.slider("Years of Experience", 0, 30, (0, 30))
+        include_unknown_exp = st.checkbox("Include candidates with unknown experience", value=True)
+        keyword = st.text_input(
+            "Keyword (skills/employers/bullets)", value="",
+            help='Words are ANDed. Use quant* for prefixes and "machine learning" for phrases. Results are ranked by relevance.',
+        )
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+        role_text = st.text_area("Role description (semantic match)", value="", help="Ranks candidates by similarity to this text; ignores the filters above.")
+
+    def _similar_frame(hits):
+        recs = {r.resume_id: r for r in get_candidates(session, [rid for rid, _ in hits])}
+        return pd.DataFrame([{
+            "resume_id": rid,
+            "name": recs[rid].full_name,
+            "geo_market": recs[rid].geo_market,
+            "approach": recs[rid].approach,
+            "years_experience": recs[rid].years_experience,
+            "similarity": round(score, 3),
+        } for rid, score in hits if rid in recs])
+
+    if role_text.strip():
+        st.subheader("Closest to the role description")
+        st.dataframe(_similar_frame(get_vector_index().search_text(role_text, k=20)), use_container_width=True, hide_index=True)
+
+    filters = dict(
+        geo_markets=geo or None,
+        approaches=approach or None,
+        sectors_any=(sector or None) if not sector_all else None,
+        sectors_all=(sector or None) if sector_all else None,
+        roles_any=(role or None) if not role_all else None,
+        roles_all=(role or None) if role_all else None,
+        asset_classes_any=asset_class or None,
+        skills_all=skills or None,
+        degree_levels=degree or None,
+        min_exp=float(min_exp),
+        max_exp=float(max_exp),
+        include_unknown_exp=include_unknown_exp,
+        keyword=keyword or None,
     )
 
-with colB:
-    selected_id = st.selectbox("Open candidate profile (resume_id)", df["resume_id"].tolist() if not df.empty else [])
-
-with colC:
-    show_evidence = st.checkbox("Show evidence snippets", value=True)
-
-if selected_id:
-    cand = get_candidate_json(session, selected_id)
-    st.divider()
-    st.subheader(cand.get("candidate", {}).get("full_name") or "Candidate Profile")
-
-    left, right = st.columns([1,1])
-
-    with left:
-        st.markdown("### Summary")
-        st.write(cand.get("summary", {}))
-
-        st.markdown("### Target Fit")
-        st.write(cand.get("target_fit", {}))
-
-        st.markdown("### Skills")
-        st.write(cand.get("skills", {}))
-
-    with right:
-        st.markdown("### Education")
-        st.write(cand.get("education", []))
-
-        st.markdown("### Experience")
-        st.write(cand.get("experience", []))
-
-    if show_evidence:
-        st.markdown("### Evidence")
-        st.json(cand.get("evidence", {}))
+    # Keyset pagination: a stack of page-start cursors, reset whenever the filters change.
+    signature = (normalize_filters(filters), page_size)
+    if st.session_state.get("search_signature") != signature:
+        st.session_state.search_signature = signature
+        st.session_state.search_cursors = [None]
+    cursors = st.session_state.search_cursors
+
+    # Served from the process-wide query cache until ingest writes new data.
+    page = cached_search_page(session, page_size=page_size, cursor=cursors[-1], **filters)
+    total = cached_count(session, **filters)
+    records = page["rows"]
+
+    rows = []
+    for r in records:
+        rows.append({
+            "resume_id": r["resume_id"],
+            "name": r["full_name"],
+            "geo_market": r["geo_market"],
+            "country": r["country"],
+            "approach": r["approach"],
+            "years_experience": r["years_experience"],
+            "sectors": ", ".join(json.loads(r["sectors_json"])),
+            "top_programming": ", ".join(json.loads(r["skills_programming_json"])[:3]),
+            "source_filename": r["source_filename"],
+        })
+
+    df = pd.DataFrame(rows)
+
+    st.subheader(f"Results ({total})")
+    first = (len(cursors) - 1) * page_size
+    st.caption(f"Showing {first + 1 if records else 0}–{first + len(records)} of {total}")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    prev_col, next_col, _ = st.columns([1, 1, 6])
+    with prev_col:
+        st.button("◀ Previous", disabled=len(cursors) == 1, on_click=lambda: cursors.pop())
+    with next_col:
+        st.button("Next ▶", disabled=page["next_cursor"] is None, on_click=lambda: cursors.append(page["next_cursor"]))
+
+    colA, colB, colC = st.columns([1,1,1])
+
+    with colA:
+        st.download_button(
+            "Export page CSV",
+            data=df.to_csv(index=False).encode("utf-8"),
+            file_name="candidate_search_results.csv",
+            mime="text/csv",
+            disabled=df.empty,
+            help="For a full export use scripts/export_all.py",
+        )
+
+    with colB:
+        selected_id = st.selectbox("Open candidate profile (resume_id)", df["resume_id"].tolist() if not df.empty else [])
+
+    with colC:
+        show_evidence = st.checkbox("Show evidence snippets", value=True)
+
+    if selected_id:
+        cand = get_candidate_json(session, selected_id)
+        st.divider()
+        st.subheader(cand.get("candidate", {}).get("full_name") or "Candidate Profile")
+
+        left, right = st.columns([1,1])
+
+        with left:
+            st.markdown("### Summary")
+            st.write(cand.get("summary", {}))
+
+            st.markdown("### Target Fit")
+            st.write(cand.get("target_fit", {}))
+
+            st.markdown("### Skills")
+            st.write(cand.get("skills", {}))
+
+        with right:
+            st.markdown("### Education")
+            st.write(cand.get("education", []))
+
+            st.markdown("### Experience")
+            st.write(cand.get("experience", []))
+
+        if show_evidence:
+            st.markdown("### Evidence")
+            st.json(cand.get("evidence", {}))
+
+        st.markdown("### Similar candidates")
+        similar = get_vector_index().similar_to(selected_id, k=10)
+        if similar:
+            st.dataframe(_similar_frame(similar), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No embedding for this candidate yet; run scripts/build_vectors.py.")
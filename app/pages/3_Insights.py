@@ -12,15 +12,15 @@ def _ensure_project_root_on_path():
 
 _ensure_project_root_on_path()
 
-import os, json
+import os
 from dotenv import load_dotenv
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from core.db import get_session, query_candidates
+from core.db import get_session, CUBE_ALL_SECTORS, EXP_BUCKETS, UNKNOWN
+from core.query_cache import cached_cube
 from core.config import resolve_db_url
-from core import taxonomy
 
 load_dotenv()
 DB_URL = resolve_db_url(os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite"))
@@ -29,73 +29,78 @@ st.set_page_config(page_title="Insights", layout="wide")
 st.title("Candidate Pool Insights")
 
 session = get_session(DB_URL)
-records = query_candidates(session=session, limit=5000)
 
-if not records:
+# Pre-aggregated counts (insights_cube), maintained on upsert: size tracks distinct values, not candidates.
+cube = pd.DataFrame(cached_cube(session))
+
+if cube.empty:
     st.warning("No candidates yet. Upload and parse resumes first.")
     st.stop()
 
-# Build dataframe
-rows=[]
-for r in records:
-    sectors = json.loads(r.sectors_json)
-    for s in sectors or ["(None)"]:
-        rows.append({
-            "resume_id": r.resume_id,
-            "geo_market": r.geo_market or "(Unknown)",
-            "approach": r.approach or "(Unknown)",
-            "sector": s or "(None)",
-            "years_experience": r.years_experience,
-        })
-
-df = pd.DataFrame(rows)
-
+per_candidate = cube[cube["sector"] == CUBE_ALL_SECTORS]
+per_sector = cube[cube["sector"] != CUBE_ALL_SECTORS]
+bucket_order = [label for _, _, label in EXP_BUCKETS] + [UNKNOWN]
+
+def _options(col):
+    vals = sorted(per_candidate[col].unique()) if col != "sector" else sorted(per_sector["sector"].unique())
+    return vals if col != "exp_bucket" else [b for b in bucket_order if b in vals]
+
+# Cross-filters: every chart applies all selections except the one on its own dimension.
+with st.sidebar:
+    st.header("Cross-filters")
+    selected = {
+        "geo_market": st.multiselect("Geographic Market", _options("geo_market")),
+        "approach": st.multiselect("Approach", _options("approach")),
+        "degree_level": st.multiselect("Degree level", _options("degree_level")),
+        "exp_bucket": st.multiselect("Years of experience", _options("exp_bucket")),
+    }
+    sector = st.selectbox("Sector (drill-down)", ["(All)"] + _options("sector"))
+
+def _filtered(frame, skip=None):
+    for col, vals in selected.items():
+        if vals and col != skip:
+            frame = frame[frame[col].isin(vals)]
+    return frame
+
+def _base(skip=None):
+    # With a sector drill-down, per-sector cells count each matching candidate exactly once.
+    frame = per_candidate if sector == "(All)" else per_sector[per_sector["sector"] == sector]
+    return _filtered(frame, skip)
+
+def _bar(counts, xlabel, ylabel="Candidates"):
+    fig = plt.figure()
+    counts.plot(kind="bar")
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    st.pyplot(fig, clear_figure=True)
+
+current = _base()
 c1, c2, c3 = st.columns(3)
 
 with c1:
-    st.metric("Candidates", len(set(df["resume_id"])))
+    st.metric("Candidates", int(current["n"].sum()))
 
 with c2:
-    st.metric("Geo markets", df["geo_market"].nunique())
+    st.metric("Geo markets", current.loc[current["n"] > 0, "geo_market"].nunique())
 
 with c3:
-    st.metric("Sectors (incl none)", df["sector"].nunique())
+    st.metric("Sectors (incl none)", _filtered(per_sector).query("n > 0")["sector"].nunique())
 
 st.divider()
 
-# Distribution by geo
 st.subheader("Distribution by Geographic Market")
-geo_counts = df.drop_duplicates("resume_id")["geo_market"].value_counts()
-
-fig = plt.figure()
-geo_counts.plot(kind="bar")
-plt.xlabel("Geo market")
-plt.ylabel("Candidates")
-st.pyplot(fig, clear_figure=True)
+_bar(_base("geo_market").groupby("geo_market")["n"].sum().sort_values(ascending=False), "Geo market")
 
-# Distribution by approach
 st.subheader("Distribution by Approach")
-ap_counts = df.drop_duplicates("resume_id")["approach"].value_counts()
-fig = plt.figure()
-ap_counts.plot(kind="bar")
-plt.xlabel("Approach")
-plt.ylabel("Candidates")
-st.pyplot(fig, clear_figure=True)
-
-# Sector counts
+_bar(_base("approach").groupby("approach")["n"].sum().sort_values(ascending=False), "Approach")
+
 st.subheader("Distribution by Sector (any exposure)")
-sector_counts = df["sector"].value_counts().head(15)
-fig = plt.figure()
-sector_counts.plot(kind="bar")
-plt.xlabel("Sector")
-plt.ylabel("Mentions")
-st.pyplot(fig, clear_figure=True)
-
-# Experience histogram
-st.subheader("Years of Experience Histogram")
-exp = df.drop_duplicates("resume_id")["years_experience"].dropna()
-fig = plt.figure()
-plt.hist(exp, bins=15)
-plt.xlabel("Years of experience")
-plt.ylabel("Candidates")
-st.pyplot(fig, clear_figure=True)
+sector_counts = _filtered(per_sector).groupby("sector")["n"].sum().sort_values(ascending=False).head(15)
+_bar(sector_counts, "Sector", "Mentions")
+
+st.subheader("Distribution by Degree Level")
+_bar(_base("degree_level").groupby("degree_level")["n"].sum().sort_values(ascending=False), "Degree level")
+
+st.subheader("Years of Experience")
+exp = _base("exp_bucket").groupby("exp_bucket")["n"].sum().reindex(bucket_order, fill_value=0)
+_bar(exp, "Years of experience")
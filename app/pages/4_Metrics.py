@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+from dotenv import load_dotenv
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from core import metrics
+
+load_dotenv()
+
+st.set_page_config(page_title="Metrics", layout="wide")
+st.title("Pipeline Metrics")
+
+if not metrics.ENABLED:
+    st.warning("Metrics are disabled (METRICS=0).")
+    st.stop()
+
+# This process's counters (uploads from the app) go to disk first, so every job is read the same way.
+metrics.export()
+jobs = metrics.read_textfiles()
+
+if not jobs:
+    st.info(f"No metrics yet in `{metrics.metrics_dir()}`. Parse some resumes or run `scripts/batch_ingest.py`.")
+    st.stop()
+
+st.caption(f"Prometheus textfiles in `{metrics.metrics_dir()}` (point node_exporter's textfile collector here).")
+job = st.selectbox("Job", list(jobs), index=0)
+samples = jobs[job]
+
+def _frame(name, *label_cols):
+    rows = [dict(s["labels"], value=s["value"]) for s in samples if s["name"] == name]
+    if not rows:
+        return pd.DataFrame(columns=list(label_cols) + ["value"])
+    return pd.DataFrame(rows)[list(label_cols) + ["value"]]
+
+stages = pd.DataFrame(metrics.stage_summary(samples))
+files = _frame(metrics.INGEST_FILES, "status")
+tokens = _frame(metrics.LLM_TOKENS, "provider", "model", "kind")
+
+c1, c2, c3, c4 = st.columns(4)
+with c1:
+    st.metric("Files ingested", int(files["value"].sum()))
+with c2:
+    st.metric("Failed / quarantined", int(files.loc[files["status"].isin(["failed", "quarantined"]), "value"].sum()))
+with c3:
+    st.metric("Prompt tokens", int(tokens.loc[tokens["kind"] == "prompt", "value"].sum()))
+with c4:
+    st.metric("Completion tokens", int(tokens.loc[tokens["kind"] == "completion", "value"].sum()))
+
+st.divider()
+
+st.subheader("Stage latency")
+if stages.empty:
+    st.write("No stage timings recorded.")
+else:
+    st.dataframe(stages, use_container_width=True, hide_index=True)
+    # Total time per stage is where the wall clock goes; the biggest bar is the bottleneck.
+    fig = plt.figure()
+    stages.set_index("stage")["total_s"].sort_values(ascending=False).plot(kind="bar")
+    plt.xlabel("Stage")
+    plt.ylabel("Total seconds")
+    st.pyplot(fig, clear_figure=True)
+
+st.subheader("Errors by stage and type")
+errors = _frame(metrics.STAGE_ERRORS, "stage", "error")
+if errors.empty:
+    st.write("No errors recorded.")
+else:
+    st.dataframe(errors.sort_values("value", ascending=False), use_container_width=True, hide_index=True)
+
+st.subheader("PDF extraction fallbacks")
+fallbacks = _frame(metrics.EXTRACT_FALLBACK, "reason")
+if fallbacks.empty:
+    st.write("No pages fell back to pdfplumber.")
+else:
+    st.dataframe(fallbacks.sort_values("value", ascending=False), use_container_width=True, hide_index=True)
+
+st.subheader("Extraction workers")
+worker_events = _frame(metrics.WORKER_EVENTS, "pool", "event")
+if worker_events.empty:
+    st.write("No worker timeouts, memory kills, crashes or recycles.")
+else:
+    st.dataframe(worker_events, use_container_width=True, hide_index=True)
+
+st.subheader("LLM usage")
+retries = _frame(metrics.LLM_RETRIES, "provider", "reason")
+if tokens.empty and retries.empty:
+    st.write("No LLM usage reported (the mock provider does not report tokens).")
+else:
+    if not tokens.empty:
+        st.dataframe(tokens.pivot_table(index=["provider", "model"], columns="kind", values="value", aggfunc="sum").reset_index(),
+                     use_container_width=True, hide_index=True)
+    if not retries.empty:
+        st.dataframe(retries, use_container_width=True, hide_index=True)
+
+st.subheader("Files by status")
+if not files.empty:
+    st.dataframe(files, use_container_width=True, hide_index=True)
+
+with st.expander("Raw textfile"):
+    st.code((metrics.metrics_dir() / f"{job}.prom").read_text(encoding="utf-8"), language="text")
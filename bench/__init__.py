@@ -0,0 +1,4 @@
+# Benchmark suite: synthetic resume corpus (bench/corpus.py) and hot-path timings with
+# baseline comparison (bench/run.py). Run from the project root:
+#   python -m bench.corpus --out data/bench_corpus --n 10000 --workers 8
+#   python -m bench.run --out bench_results.json [--compare bench_baseline.json]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import random
+import time
+
+from core import taxonomy
+
+# Synthetic resumes built from core/taxonomy.py vocabularies, written as PDF (a minimal
+# hand-rolled writer, no extra dependency) or DOCX (python-docx). Document i is generated from
+# its own seeded RNG, so a corpus is reproducible regardless of worker count.
+
+FIRST = ["James", "Mary", "Wei", "Priya", "Lukas", "Sofia", "Kenji", "Aisha", "Daniel", "Chloe",
+         "Rahul", "Elena", "Minh", "Olivia", "Mateo", "Hannah", "Arjun", "Yuki", "Samuel", "Grace"]
+LAST = ["Smith", "Chen", "Patel", "Muller", "Rossi", "Tanaka", "Khan", "Garcia", "Kim", "Novak",
+        "Brown", "Singh", "Dubois", "Nguyen", "Cohen", "Silva", "Ivanova", "Okafor", "Larsen", "Wong"]
+CITIES = {
+    "US": [("New York", "NY", "USA"), ("Chicago", "IL", "USA"), ("Boston", "MA", "USA"), ("San Francisco", "CA", "USA")],
+    "Europe": [("London", "", "United Kingdom"), ("Paris", "", "France"), ("Frankfurt", "", "Germany"), ("Zurich", "", "Switzerland")],
+    "APAC": [("Hong Kong", "", "Hong Kong"), ("Singapore", "", "Singapore"), ("Tokyo", "", "Japan"), ("Sydney", "", "Australia")],
+}
+EMPLOYERS = ["Blackrock", "Citadel", "Millennium", "Point72", "Goldman Sachs", "Morgan Stanley", "J.P. Morgan",
+             "Bridgewater", "Two Sigma", "Man Group", "Schroders", "Fidelity", "UBS", "Nomura", "GIC", "Temasek"]
+SKILLS = {
+    "programming": ["Python", "SQL", "C++", "R", "Java", "Matlab", "kdb+/q"],
+    "data": ["Bloomberg", "FactSet", "Capital IQ", "Refinitiv", "Pandas", "Spark"],
+    "ml": ["scikit-learn", "PyTorch", "XGBoost", "TensorFlow", "NLP"],
+    "finance": ["DCF", "Comps", "LBO", "Options pricing", "Portfolio construction", "Risk models"],
+    "tools": ["Excel", "Tableau", "Git", "Airflow", "Docker"],
+}
+DEGREES = [("Bachelors", "BA Economics"), ("Bachelors", "BSc Computer Science"), ("Masters", "MSc Financial Engineering"),
+           ("Masters", "MBA"), ("PhD", "PhD Physics"), ("PhD", "PhD Statistics")]
+SCHOOLS = ["Columbia University", "London School of Economics", "University of Tokyo", "ETH Zurich",
+           "National University of Singapore", "University of Chicago", "HEC Paris", "MIT"]
+FUNDAMENTAL_BULLETS = [
+    "Built DCF and comps models for {sector} coverage of {n} names",
+    "Pitched long/short {asset} ideas to the PM with discretionary conviction sizing",
+    "Led management meetings and channel checks across the {sector} value chain",
+    "Wrote initiation reports on {sector} companies; fundamental bottom-up research",
+]
+SYSTEMATIC_BULLETS = [
+    "Researched systematic {asset} signals using {prog} and {ml} on {n} years of tick data",
+    "Built a quantitative backtesting framework for cross-sectional {sector} factors",
+    "Deployed statistical arbitrage strategies with automated execution and risk limits",
+    "Engineered alternative data pipelines in {prog} feeding quant models",
+]
+
+def resume_text(i: int, seed: int = 0) -> List[str]:
+    """
+    Lines of synthetic resume number `i`.
+    """
+    rng = random.Random(seed * 1_000_003 + i)
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    geo = rng.choice(taxonomy.GEOGRAPHIC_MARKETS)
+    city, state, country = rng.choice(CITIES[geo])
+    systematic = rng.random() < 0.4
+    sectors = rng.sample(taxonomy.SECTORS, rng.randint(1, 3))
+    assets = rng.sample(taxonomy.ASSET_CLASSES, rng.randint(1, 2))
+    skills = {k: rng.sample(v, rng.randint(1, min(3, len(v)))) for k, v in SKILLS.items()}
+    years = rng.randint(1, 25)
+
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{i}@example.com | +1 212 555 {i % 10000:04d} | {city}{', ' + state if state else ''}, {country}",
+        "",
+        "SUMMARY",
+        f"{'Systematic quant' if systematic else 'Fundamental'} {rng.choice(taxonomy.ROLES).lower()} with {years} years of experience "
+        f"in {', '.join(sectors)} across {' and '.join(assets)}.",
+        "",
+        "EXPERIENCE",
+    ]
+    start = 2025 - years
+    for j in range(rng.randint(2, 4)):
+        end = min(2025, start + rng.randint(1, 6))
+        lines.append(f"{rng.choice(taxonomy.ROLES)}, {rng.choice(EMPLOYERS)} ({start} - {'Present' if end == 2025 else end})")
+        for _ in range(rng.randint(2, 5)):
+            tpl = rng.choice(SYSTEMATIC_BULLETS if systematic else FUNDAMENTAL_BULLETS)
+            lines.append("- " + tpl.format(sector=rng.choice(sectors), asset=rng.choice(assets).lower(), n=rng.randint(5, 40),
+                                           prog=rng.choice(skills["programming"]), ml=rng.choice(skills["ml"])))
+        start = end
+    degree, title = rng.choice(DEGREES)
+    lines += ["", "EDUCATION", f"{title}, {rng.choice(SCHOOLS)} ({2025 - years - rng.randint(1, 3)})", "", "SKILLS"]
+    for k, vals in skills.items():
+        lines.append(f"{k.capitalize()}: {', '.join(vals)}")
+    return lines
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 52) -> None:
+    """
+    Minimal text-only PDF (Helvetica, one content stream per page) that pdfplumber can read.
+    """
+    pages = [lines[k:k + lines_per_page] for k in range(0, len(lines), lines_per_page)] or [[]]
+    n_pages = len(pages)
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * k} 0 R" for k in range(n_pages)), n_pages)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for k, page in enumerate(pages):
+        body = "BT /F1 10 Tf 13 TL 50 750 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objs.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                     f"/Contents {5 + 2 * k} 0 R >>").encode())
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+
+def write_docx(path: str, lines: List[str]) -> None:
+    import docx
+    d = docx.Document()
+    for line in lines:
+        d.add_paragraph(line)
+    d.save(path)
+
+def _write_one(args) -> str:
+    out_dir, i, fmt, seed = args
+    lines = resume_text(i, seed)
+    if fmt == "mix":
+        fmt = "pdf" if i % 2 == 0 else "docx"
+    path = str(Path(out_dir) / f"resume_{i:06d}.{fmt}")
+    (write_pdf if fmt == "pdf" else write_docx)(path, lines)
+    return path
+
+def generate(out_dir: str, n: int, fmt: str = "mix", seed: int = 0, workers: int = 1, start: int = 0) -> List[str]:
+    """
+    Write resumes start..start+n-1 to `out_dir`; fmt is "pdf", "docx" or "mix" (alternating).
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    jobs = [(out_dir, i, fmt, seed) for i in range(start, start + n)]
+    if workers <= 1:
+        return [_write_one(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_write_one, jobs, chunksize=64))
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic resume corpus (PDF/DOCX)")
+    ap.add_argument("--out", default="data/bench_corpus")
+    ap.add_argument("--n", type=int, default=1000, help="Number of resumes (e.g. 1000, 10000, 100000)")
+    ap.add_argument("--format", choices=["pdf", "docx", "mix"], default="mix")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    paths = generate(args.out, args.n, args.format, args.seed, args.workers)
+    print(f"Wrote {len(paths)} resumes to {args.out} in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from bench.corpus import generate
+
+# End-to-end hot-path timings on a synthetic corpus. Each benchmark reports per-call latency
+# percentiles and throughput; --compare diffs p50/mean against a saved baseline JSON and exits
+# non-zero when something regressed beyond --threshold.
+
+QUERY_MIXES: Dict[str, Dict[str, Any]] = {
+    "all": {},
+    "geo": {"geo_markets": ["US"]},
+    "geo_sector_any": {"geo_markets": ["Europe", "APAC"], "sectors_any": ["TMT", "Healthcare"]},
+    "sectors_all_role": {"sectors_all": ["TMT", "Technology"], "roles_any": ["Research Analyst"]},
+    "exp_range": {"min_exp": 5.0, "max_exp": 12.0, "include_unknown_exp": False},
+    "skills_all": {"skills_all": ["Python", "SQL"]},
+    "keyword": {"keyword": "python"},
+    "keyword_phrase_geo": {"keyword": '"alternative data"', "geo_markets": ["US"]},
+    "combined": {"geo_markets": ["US"], "approaches": ["Systematic"], "sectors_any": ["TMT"], "min_exp": 3.0,
+                 "max_exp": 20.0, "degree_levels": ["Masters", "PhD"]},
+}
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    n = len(s)
+    if not n:
+        return {"n": 0}
+    pick = lambda q: s[min(n - 1, int(q * n))] * 1000
+    total = sum(s)
+    return {
+        "n": n,
+        "total_s": round(total, 4),
+        "mean_ms": round(total / n * 1000, 4),
+        "p50_ms": round(pick(0.50), 4),
+        "p95_ms": round(pick(0.95), 4),
+        "max_ms": round(s[-1] * 1000, 4),
+        "per_s": round(n / total, 2) if total else None,
+    }
+
+def _time_each(fn: Callable[[Any], Any], items: List[Any]) -> Dict[str, float]:
+    samples = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - t0)
+    return _stats(samples)
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parents[1], timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def _clone(record: Dict[str, Any], i: int, rng: random.Random) -> Dict[str, Any]:
+    from core import taxonomy
+    r = dict(record)
+    r["resume_id"] = f"bench-{i:07d}"
+    r["geo_market"] = rng.choice(taxonomy.GEOGRAPHIC_MARKETS)
+    r["years_experience"] = rng.choice([None, float(rng.randint(0, 30))])
+    return r
+
+def run(args) -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix="talent-bench-"))
+    try:
+        results = _run_benchmarks(args, work)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "meta": {
+            "timestamp": dt.datetime.utcnow().isoformat() + "Z",
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {k: getattr(args, k) for k in ("sample", "db_records", "upserts", "query_repeat", "seed", "corpus")},
+        },
+        "results": results,
+    }
+
+def _run_benchmarks(args, work: Path) -> Dict[str, Any]:
+    from core.extract import extract_resume_text, extract_pdf_pages, PDF_BACKENDS
+    from core.llm_providers.mock import MockProvider
+    from core.parser import finalize_parsed, normalize_for_db
+    from core.schema import json_schema
+    from core.db import get_session, upsert_candidate, bulk_upsert_candidates, query_candidates
+
+    results: Dict[str, Any] = {}
+    corpus = Path(args.corpus) if args.corpus else work / "corpus"
+    if not args.corpus:
+        generate(str(corpus), args.sample * 2, "mix", seed=args.seed)
+    files = sorted(corpus.glob("*.pdf"))[:args.sample] + sorted(corpus.glob("*.docx"))[:args.sample]
+
+    # Extraction
+    texts: Dict[str, str] = {}
+    def extract(path):
+        texts[str(path)] = extract_resume_text(str(path))
+    for ext in ("pdf", "docx"):
+        results[f"extract.{ext}"] = _time_each(extract, [f for f in files if f.suffix == f".{ext}"])
+    # Each PDF backend on its own (extract.pdf above is the EXTRACT_BACKEND default, auto).
+    pdfs = [str(f) for f in files if f.suffix == ".pdf"]
+    for name in PDF_BACKENDS:
+        results[f"extract.pdf.{name}"] = _time_each(lambda p, name=name: extract_pdf_pages(p, backend=name), pdfs)
+
+    # Mock LLM parse
+    provider = MockProvider()
+    schema = json_schema()
+    parsed: Dict[str, Dict[str, Any]] = {}
+    def parse(path):
+        parsed[path] = provider.parse_resume(resume_id=Path(path).stem, resume_text=texts[path], schema=schema)
+    results["mock.parse_resume"] = _time_each(parse, list(texts))
+
+    # Normalization (validation done up front; this times normalize_for_db alone)
+    models = {p: finalize_parsed(dict(v), file_hash=Path(p).stem) for p, v in parsed.items()}
+    records: List[Dict[str, Any]] = []
+    results["normalize_for_db"] = _time_each(
+        lambda p: records.append(normalize_for_db(models[p], texts[p], source_filename=Path(p).name)), list(models))
+
+    # Writes: per-record upsert (one commit each) and batched bulk upsert
+    rng = random.Random(args.seed)
+    session = get_session(f"sqlite:///{(work / 'bench.sqlite').as_posix()}")
+    single = [_clone(records[i % len(records)], i, rng) for i in range(min(args.upserts, args.db_records))]
+    results["db.upsert_candidate"] = _time_each(lambda r: upsert_candidate(session, r), single)
+    bulk = [_clone(records[i % len(records)], i, rng) for i in range(len(single), args.db_records)]
+    t0 = time.perf_counter()
+    bulk_upsert_candidates(session, bulk, chunk_size=500)
+    elapsed = time.perf_counter() - t0
+    results["db.bulk_upsert_candidates"] = {"n": len(bulk), "total_s": round(elapsed, 4),
+                                            "per_s": round(len(bulk) / elapsed, 2) if elapsed else None}
+
+    # Read mixes over db_records candidates
+    for name, filters in QUERY_MIXES.items():
+        results[f"query.{name}"] = _time_each(lambda _: query_candidates(session, limit=500, **filters), range(args.query_repeat))
+    session.close()
+    return results
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Rows of {bench, metric, baseline, current, change_pct, regressed} for shared latency metrics.
+    """
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "mean_ms"):
+            if metric in cur and base.get(metric):
+                change = (cur[metric] - base[metric]) / base[metric] * 100
+                rows.append({"bench": name, "metric": metric, "baseline": base[metric], "current": cur[metric],
+                             "change_pct": round(change, 1), "regressed": change > threshold})
+        if "mean_ms" not in cur and cur.get("per_s") and base.get("per_s"):
+            change = (base["per_s"] - cur["per_s"]) / base["per_s"] * 100
+            rows.append({"bench": name, "metric": "per_s", "baseline": base["per_s"], "current": cur["per_s"],
+                         "change_pct": round(-change, 1), "regressed": change > threshold})
+    return rows
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Benchmark extraction, parsing, normalization, upserts and queries")
+    ap.add_argument("--corpus", help="Existing corpus dir (default: generate --sample of each format in a temp dir)")
+    ap.add_argument("--sample", type=int, default=100, help="Files per format to extract/parse")
+    ap.add_argument("--db-records", dest="db_records", type=int, default=10000, help="Candidates loaded before query benchmarks")
+    ap.add_argument("--upserts", type=int, default=200, help="Single-record upserts to time")
+    ap.add_argument("--query-repeat", dest="query_repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", help="Baseline JSON from a previous run")
+    ap.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for name, r in report["results"].items():
+        if not r["n"]:
+            # e.g. a --corpus without any DOCX files
+            print(f"{name:32s} n=0      (no samples)")
+            continue
+        lat = f"p50 {r['p50_ms']:.3f} ms  p95 {r['p95_ms']:.3f} ms" if "p50_ms" in r else f"total {r['total_s']:.2f} s"
+        print(f"{name:32s} n={r['n']:<6d} {lat}  {r.get('per_s') or '-'}/s")
+    print(f"Wrote {args.out}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {"baseline": args.compare, "threshold_pct": args.threshold, "rows": rows}
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nvs {args.compare} (threshold {args.threshold}%)")
+        for r in rows:
+            flag = "REGRESSED" if r["regressed"] else ""
+            print(f"{r['bench']:32s} {r['metric']:8s} {r['baseline']:>12} -> {r['current']:>12}  {r['change_pct']:+7.1f}%  {flag}")
+        if any(r["regressed"] for r in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+import datetime as dt
+import hashlib
+import uuid
+
+from .db import ParseCacheEntry
+from .schema import ParsedResume, schema_version
+from .text_store import get_text, put_text
+
+# Fixed namespace so the same file bytes always map to the same resume_id.
+_RESUME_ID_NS = uuid.UUID("6f1c7a52-3f0e-4d1b-9a57-2b8e5d0c4e11")
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def resume_id_for_hash(file_hash: str) -> str:
+    return str(uuid.uuid5(_RESUME_ID_NS, file_hash))
+
+def cache_key(file_hash: str, provider_name: str, model: str, schema_ver: Optional[str] = None) -> str:
+    raw = "|".join([file_hash, provider_name, model or "", schema_ver or schema_version()])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _provider_model(provider) -> str:
+    model = getattr(provider, "model", "") or ""
+    pv = getattr(provider, "prompt_version", "")
+    return f"{model}@{pv}" if pv else model
+
+def provider_cache_key(file_hash: str, provider) -> str:
+    return cache_key(file_hash, getattr(provider, "name", type(provider).__name__), _provider_model(provider))
+
+def get_cached_parse(session, file_hash: str, provider) -> Optional[Tuple[ParsedResume, str, str]]:
+    """
+    Returns (parsed, resume_text, resume_id) on a hit, else None.
+    """
+    entry = session.get(ParseCacheEntry, provider_cache_key(file_hash, provider))
+    if not entry:
+        return None
+    text = get_text(session, file_hash)
+    if text is None:
+        return None
+    return ParsedResume.model_validate_json(entry.parsed_json), text, entry.resume_id
+
+def put_cached_parse(session, file_hash: str, provider, parsed: ParsedResume, resume_text: str, commit: bool = True) -> None:
+    key = provider_cache_key(file_hash, provider)
+    if session.get(ParseCacheEntry, key) is None:
+        session.add(ParseCacheEntry(
+            cache_key=key,
+            file_sha256=file_hash,
+            provider=getattr(provider, "name", type(provider).__name__),
+            model=_provider_model(provider),
+            schema_version=schema_version(),
+            resume_id=parsed.resume_id,
+            parsed_json=parsed.model_dump_json(),
+            created_at=dt.datetime.utcnow().isoformat() + "Z",
+        ))
+        session.flush()
+    put_text(session, file_hash, resume_text, commit=commit)
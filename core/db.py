@@ -1,10 +1,15 @@
 from __future__ import annotations
+import hashlib
 import json
 from .config import resolve_db_url
-from typing import Any, Dict, List, Optional
-from sqlalchemy import create_engine, Column, String, Float, Integer, Text
-from sqlalchemy.orm import declarative_base, sessionmaker
+from . import metrics
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, select, insert, delete, func, Column, String, Float, Integer, Text, LargeBinary, Index
 from sqlalchemy.sql import text as sql_text
+import re
+import threading
+from sqlalchemy.orm import declarative_base, sessionmaker
 
 Base = declarative_base()
 
@@ -42,37 +47,612 @@ class CandidateRecord(Base):
     # Source file reference
     source_filename = Column(String, nullable=True)
 
+    __table_args__ = (
+        Index("ix_candidates_geo_market", "geo_market"),
+        Index("ix_candidates_approach", "approach"),
+        Index("ix_candidates_degree_level", "degree_level"),
+        Index("ix_candidates_years_experience", "years_experience"),
+    )
+
+# Normalized facet tables: one row per (candidate, value), derived from the *_json columns and
+# kept in sync by the upsert path. Indexed on (value, resume_id) so facet filters are index
+# lookups instead of LIKE scans over JSON strings.
+class CandidateSector(Base):
+    __tablename__ = "candidate_sector"
+    resume_id = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    __table_args__ = (Index("ix_candidate_sector_value", "value", "resume_id"),)
+
+class CandidateRole(Base):
+    __tablename__ = "candidate_role"
+    resume_id = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    __table_args__ = (Index("ix_candidate_role_value", "value", "resume_id"),)
+
+class CandidateAssetClass(Base):
+    __tablename__ = "candidate_asset_class"
+    resume_id = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    __table_args__ = (Index("ix_candidate_asset_class_value", "value", "resume_id"),)
+
+class CandidateSkill(Base):
+    __tablename__ = "candidate_skill"
+    resume_id = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)     # programming/data/ml/finance/tools
+    value = Column(String, primary_key=True)
+    __table_args__ = (Index("ix_candidate_skill_value", "value", "resume_id"),)
+
+# facet name -> (table model, source JSON column)
+FACETS = {
+    "sector": (CandidateSector, "sectors_json"),
+    "role": (CandidateRole, "roles_json"),
+    "asset_class": (CandidateAssetClass, "asset_classes_json"),
+}
+SKILL_COLUMNS = {
+    "programming": "skills_programming_json",
+    "data": "skills_data_json",
+    "ml": "skills_ml_json",
+    "finance": "skills_finance_json",
+    "tools": "skills_tools_json",
+}
+
+class CandidateChange(Base):
+    """
+    Change log for candidates: each upsert gives the touched resume_ids a new, strictly increasing
+    seq (one row per candidate, the latest). In-process caches refresh incrementally from it.
+    """
+    __tablename__ = "candidate_changes"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    resume_id = Column(String, nullable=False, unique=True)
+    # AUTOINCREMENT: never reuse a seq, or a reader could miss an update.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+class InsightsCube(Base):
+    """
+    Candidate counts by geo_market x approach x sector x degree_level x experience bucket,
+    kept in step by the upsert path. sector "*" rows count each candidate once; the per-sector
+    rows count one per sector held (or "(None)"). Missing scalar values are "(Unknown)".
+    """
+    __tablename__ = "insights_cube"
+
+    geo_market = Column(String, primary_key=True)
+    approach = Column(String, primary_key=True)
+    sector = Column(String, primary_key=True)
+    degree_level = Column(String, primary_key=True)
+    exp_bucket = Column(String, primary_key=True)
+    n = Column(Integer, nullable=False, default=0)
+
+CUBE_DIMS = ["geo_market", "approach", "sector", "degree_level", "exp_bucket"]
+CUBE_ALL_SECTORS = "*"
+EXP_BUCKETS = [(0, 2, "0-2"), (3, 5, "3-5"), (6, 10, "6-10"), (11, 15, "11-15"), (16, 20, "16-20"), (21, None, "21+")]
+UNKNOWN = "(Unknown)"
+
+class ResumeSignature(Base):
+    """
+    MinHash signature of a file's extracted text (see core/dedupe.py). duplicate_of points at the
+    canonical resume_id of its near-duplicate cluster, or is NULL for a cluster root.
+    """
+    __tablename__ = "resume_signatures"
+
+    file_sha256 = Column(String, primary_key=True)
+    resume_id = Column(String, nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    duplicate_of = Column(String, nullable=True, index=True)
+    similarity = Column(Float, nullable=True)
+    source_filename = Column(String, nullable=True)
+    created_at = Column(String, nullable=True)
+
+class LshBucket(Base):
+    __tablename__ = "lsh_buckets"
+
+    band = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    file_sha256 = Column(String, primary_key=True)
+
+class ParseCacheEntry(Base):
+    """
+    One LLM parse per (file bytes, provider, model, schema version). See core/cache.py.
+    """
+    __tablename__ = "parse_cache"
+
+    cache_key = Column(String, primary_key=True)
+    file_sha256 = Column(String, nullable=False, index=True)
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    schema_version = Column(String, nullable=False)
+    resume_id = Column(String, nullable=False)
+    parsed_json = Column(Text, nullable=False)
+    created_at = Column(String, nullable=True)
+
+class ResumeText(Base):
+    """
+    Extracted resume text, zlib-compressed, keyed by the SHA-256 of the source file bytes.
+    """
+    __tablename__ = "resume_texts"
+
+    file_sha256 = Column(String, primary_key=True)
+    text_z = Column(LargeBinary, nullable=False)
+
+class IngestFile(Base):
+    """
+    Ingest manifest: one row per source file with the last stage it reached. See core/manifest.py.
+    """
+    __tablename__ = "ingest_files"
+
+    path = Column(String, primary_key=True)          # absolute path
+    file_sha256 = Column(String, nullable=True, index=True)
+    size = Column(Integer, nullable=True)
+    mtime_ns = Column(Integer, nullable=True)
+    stage = Column(String, nullable=False, index=True)   # pending/extracted/parsed/stored/failed/quarantined
+    resume_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    extract_s = Column(Float, nullable=True)
+    parse_s = Column(Float, nullable=True)
+    store_s = Column(Float, nullable=True)
+    updated_at = Column(String, nullable=True)
+
 def get_engine(db_url: str):
     db_url = resolve_db_url(db_url)
-    return create_engine(db_url, future=True)
+    engine = create_engine(db_url, future=True)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, _):
+            # WAL + NORMAL: one WAL append per commit instead of a full fsync; readers don't block ingest.
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.close()
+    return engine
+
+@contextmanager
+def write_savepoint(session):
+    """
+    session.begin_nested() for a unit of writes that can be rolled back on its own.
+
+    On SQLite a SAVEPOINT outside a transaction opens a deferred one: its first read pins a WAL
+    snapshot, and if another process commits before the first write the upgrade fails at once with
+    "database is locked" instead of waiting out the busy timeout. So the enclosing transaction is
+    opened with BEGIN IMMEDIATE, which waits for the write lock up front.
+    """
+    conn = session.connection()
+    if conn.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    with session.begin_nested() as sp:
+        yield sp
+
+# SQLite FTS5 keyword index over candidates. Each row carries its resume_id (UNINDEXED) and
+# searches join on it: candidates has a TEXT primary key, so its implicit rowid can change on
+# VACUUM. The FTS rowid is a hash of resume_id (fts_rowid), so re-syncing a candidate deletes its
+# old row by rowid instead of scanning the unindexed column. Columns are weighted in bm25().
+FTS_TABLE = "candidates_fts"
+FTS_WEIGHTS = (0.0, 5.0, 3.0, 1.0)  # resume_id (unindexed), full_name, facets (sectors/roles/asset classes/skills), search_blob
+_FTS_ENABLED: Dict[str, bool] = {}
+
+def fts_rowid(resume_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(resume_id.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+def _init_fts(engine) -> None:
+    key = str(engine.url)
+    if engine.dialect.name != "sqlite":
+        _FTS_ENABLED[key] = False
+        return
+    try:
+        with engine.begin() as conn:
+            cols = [r[1] for r in conn.execute(sql_text(f"PRAGMA table_info({FTS_TABLE})"))]
+            # Index from before it was keyed on resume_id (rows keyed on candidates.rowid).
+            stale = bool(cols) and "resume_id" not in cols
+            if stale:
+                conn.execute(sql_text(f"DROP TABLE {FTS_TABLE}"))
+            conn.execute(sql_text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "resume_id UNINDEXED, full_name, facets, search_blob, tokenize='unicode61 remove_diacritics 2')"
+            ))
+        _FTS_ENABLED[key] = True
+    except Exception:
+        # SQLite built without FTS5: keyword search falls back to LIKE.
+        _FTS_ENABLED[key] = False
+        return
+    if stale:
+        with sessionmaker(bind=engine, future=True)() as session:
+            rebuild_fts(session)
+
+def fts_enabled(session) -> bool:
+    return _FTS_ENABLED.get(str(session.get_bind().url), False)
 
 def init_db(db_url: str):
     engine = get_engine(db_url)
     Base.metadata.create_all(engine)
+    # create_all skips indexes on tables that already exist; add any that are missing.
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(engine, checkfirst=True)
+    _init_fts(engine)
     return engine
 
-def get_session(db_url: str):
+# One engine (connection pool) and session factory per DB URL per process; schema setup runs once.
+_SESSION_FACTORIES: Dict[str, sessionmaker] = {}
+_SESSION_FACTORIES_LOCK = threading.Lock()
+
+def get_sessionmaker(db_url: str) -> sessionmaker:
     db_url = resolve_db_url(db_url)
-    engine = init_db(db_url)
-    return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+    factory = _SESSION_FACTORIES.get(db_url)
+    if factory is None:
+        with _SESSION_FACTORIES_LOCK:
+            factory = _SESSION_FACTORIES.get(db_url)
+            if factory is None:
+                engine = init_db(db_url)
+                factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+                _SESSION_FACTORIES[db_url] = factory
+    return factory
+
+def get_session(db_url: str):
+    return get_sessionmaker(db_url)()
 
 def _to_json_str(x: Any) -> str:
     return json.dumps(x or [], ensure_ascii=False)
 
-def upsert_candidate(session, record: Dict[str, Any]) -> None:
+_CANDIDATE_COLUMNS = [c.name for c in CandidateRecord.__table__.columns]
+_CANDIDATE_DEFAULTS = {c.name: c.default.arg for c in CandidateRecord.__table__.columns if c.default is not None}
+
+def _upsert_statement(dialect_name: str):
+    table = CandidateRecord.__table__
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.resume_id],
+        set_={c: stmt.excluded[c] for c in _CANDIDATE_COLUMNS if c != "resume_id"},
+    )
+
+def _upsert_rows(session, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
-    record: dict with keys matching CandidateRecord columns.
+    Write one chunk without committing; raises on failure. Returns per-row outcomes.
     """
-    existing = session.get(CandidateRecord, record["resume_id"])
-    if existing:
-        for k, v in record.items():
-            setattr(existing, k, v)
+    # Last write wins for repeated ids within a chunk (ON CONFLICT can't touch a row twice).
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for r in records:
+        by_id[r["resume_id"]] = {c: r.get(c, _CANDIDATE_DEFAULTS.get(c)) for c in _CANDIDATE_COLUMNS}
+    ids = list(by_id)
+    # Previous values of existing rows: tells inserts from updates and lets the cube subtract them.
+    old = {
+        r["resume_id"]: dict(r)
+        for r in session.execute(select(*_CUBE_SOURCE).where(CandidateRecord.resume_id.in_(ids))).mappings()
+    }
+    existing = set(old)
+
+    stmt = _upsert_statement(session.get_bind().dialect.name)
+    if stmt is not None:
+        session.execute(stmt, list(by_id.values()))
     else:
-        session.add(CandidateRecord(**record))
+        for rid, row in by_id.items():
+            if rid in existing:
+                session.query(CandidateRecord).filter(CandidateRecord.resume_id == rid).update(row)
+            else:
+                session.execute(insert(CandidateRecord.__table__), [row])
+    _sync_derived(session, list(by_id.values()), old)
+    return [{"resume_id": rid, "status": "updated" if rid in existing else "inserted"} for rid in ids]
+
+def _json_list(raw: Optional[str]) -> List[str]:
+    try:
+        vals = json.loads(raw or "[]")
+    except ValueError:
+        return []
+    return list(dict.fromkeys(v for v in vals if isinstance(v, str) and v))
+
+def _sync_facets(session, rows: List[Dict[str, Any]]) -> None:
+    ids = [r["resume_id"] for r in rows]
+    for model, col in list(FACETS.values()) + [(CandidateSkill, None)]:
+        session.execute(delete(model).where(model.resume_id.in_(ids)))
+    for model, col in FACETS.values():
+        facet_rows = [{"resume_id": r["resume_id"], "value": v} for r in rows for v in _json_list(r.get(col))]
+        if facet_rows:
+            session.execute(insert(model.__table__), facet_rows)
+    skill_rows = [
+        {"resume_id": r["resume_id"], "category": cat, "value": v}
+        for r in rows for cat, col in SKILL_COLUMNS.items() for v in _json_list(r.get(col))
+    ]
+    if skill_rows:
+        session.execute(insert(CandidateSkill.__table__), skill_rows)
+
+def _fts_facets_text(r: Dict[str, Any]) -> str:
+    cols = [c for _, c in FACETS.values()] + list(SKILL_COLUMNS.values())
+    return " ".join(v for c in cols for v in _json_list(r.get(c)))
+
+def _sync_fts(session, rows: List[Dict[str, Any]]) -> None:
+    if not fts_enabled(session):
+        return
+    if not rows:
+        return
+    params = {f"r{i}": fts_rowid(r["resume_id"]) for i, r in enumerate(rows)}
+    session.execute(sql_text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(':' + k for k in params)})"), params)
+    session.execute(
+        sql_text(f"INSERT INTO {FTS_TABLE}(rowid, resume_id, full_name, facets, search_blob) "
+                 "VALUES (:rowid, :resume_id, :full_name, :facets, :search_blob)"),
+        [
+            {"rowid": fts_rowid(r["resume_id"]), "resume_id": r["resume_id"], "full_name": r.get("full_name") or "",
+             "facets": _fts_facets_text(r), "search_blob": r.get("search_blob") or ""}
+            for r in rows
+        ],
+    )
+
+def _log_changes(session, ids: List[str]) -> None:
+    session.execute(delete(CandidateChange).where(CandidateChange.resume_id.in_(ids)))
+    session.execute(insert(CandidateChange.__table__), [{"resume_id": rid} for rid in ids])
+
+def data_generation(session) -> int:
+    """
+    Monotonic counter bumped by every candidate upsert (max change-log seq).
+    """
+    return session.query(func.max(CandidateChange.seq)).scalar() or 0
+
+def changed_since(session, seq: int) -> List[tuple]:
+    """
+    [(seq, resume_id)] for candidates upserted after `seq`, oldest first.
+    """
+    return session.query(CandidateChange.seq, CandidateChange.resume_id).filter(CandidateChange.seq > seq).order_by(CandidateChange.seq).all()
+
+def exp_bucket(years: Optional[float]) -> str:
+    if years is None:
+        return UNKNOWN
+    for _lo, hi, label in EXP_BUCKETS:
+        if hi is None or years < hi + 1:
+            return label
+    return EXP_BUCKETS[-1][2]
+
+_CUBE_SOURCE = [CandidateRecord.resume_id, CandidateRecord.geo_market, CandidateRecord.approach,
+                CandidateRecord.degree_level, CandidateRecord.years_experience, CandidateRecord.sectors_json]
+
+def _cube_keys(r: Dict[str, Any]) -> List[tuple]:
+    base = (r.get("geo_market") or UNKNOWN, r.get("approach") or UNKNOWN)
+    tail = (r.get("degree_level") or UNKNOWN, exp_bucket(r.get("years_experience")))
+    sectors = list(dict.fromkeys(_json_list(r.get("sectors_json")))) or ["(None)"]
+    return [base + (sec,) + tail for sec in [CUBE_ALL_SECTORS] + sectors]
+
+def _apply_cube_delta(session, delta: Dict[tuple, int]) -> None:
+    delta = {k: d for k, d in delta.items() if d}
+    if not delta:
+        return
+    table = InsightsCube.__table__
+    rows = [dict(zip(CUBE_DIMS, k), n=d) for k, d in delta.items()]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c[d] for d in CUBE_DIMS], set_={"n": table.c.n + stmt.excluded.n})
+        session.execute(stmt, rows)
+    else:
+        for row in rows:
+            cell = session.get(InsightsCube, tuple(row[d] for d in CUBE_DIMS))
+            if cell is None:
+                session.add(InsightsCube(**row))
+            else:
+                cell.n += row["n"]
+        session.flush()
+    if any(d < 0 for d in delta.values()):
+        session.execute(delete(InsightsCube).where(InsightsCube.n <= 0))
+
+def _sync_cube(session, rows: List[Dict[str, Any]], old: Dict[str, Dict[str, Any]]) -> None:
+    delta: Dict[tuple, int] = {}
+    for r in old.values():
+        for k in _cube_keys(r):
+            delta[k] = delta.get(k, 0) - 1
+    for r in rows:
+        for k in _cube_keys(r):
+            delta[k] = delta.get(k, 0) + 1
+    _apply_cube_delta(session, delta)
+
+def _sync_derived(session, rows: List[Dict[str, Any]], old: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Keep tables derived from candidates in step with an upserted chunk (same transaction).
+    `old` maps the resume_ids that were updates to their previous cube-relevant values.
+    """
+    _sync_facets(session, rows)
+    _sync_fts(session, rows)
+    _sync_cube(session, rows, old)
+    _log_changes(session, [r["resume_id"] for r in rows])
+
+def rebuild_facets(session, chunk_size: int = 1000) -> int:
+    """
+    Repopulate the facet tables from candidates (e.g. for a DB created before they existed).
+    """
+    n = 0
+    cols = [CandidateRecord.resume_id] + [getattr(CandidateRecord, c) for _, c in FACETS.values()] \
+        + [getattr(CandidateRecord, c) for c in SKILL_COLUMNS.values()]
+    last = ""
+    while True:
+        rows = session.execute(
+            select(*cols).where(CandidateRecord.resume_id > last).order_by(CandidateRecord.resume_id).limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+        _sync_facets(session, [dict(r) for r in rows])
+        session.commit()
+        n += len(rows)
+        last = rows[-1]["resume_id"]
+    return n
+
+def rebuild_cube(session, chunk_size: int = 1000) -> int:
+    """
+    Recount insights_cube from scratch.
+    """
+    session.execute(delete(InsightsCube))
+    delta: Dict[tuple, int] = {}
+    n = 0
+    last = ""
+    while True:
+        rows = session.execute(
+            select(*_CUBE_SOURCE).where(CandidateRecord.resume_id > last).order_by(CandidateRecord.resume_id).limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+        for r in rows:
+            for k in _cube_keys(r):
+                delta[k] = delta.get(k, 0) + 1
+        n += len(rows)
+        last = rows[-1]["resume_id"]
+    _apply_cube_delta(session, delta)
     session.commit()
+    return n
 
-def query_candidates(
-    session,
+def load_cube(session) -> List[Dict[str, Any]]:
+    """
+    Every non-empty cube cell as {dim: value, ..., "n": count}. Size depends on the number of
+    distinct dimension values, not on the number of candidates.
+    """
+    return [dict(r) for r in session.execute(select(InsightsCube.__table__)).mappings()]
+
+def rebuild_fts(session, chunk_size: int = 1000) -> int:
+    """
+    Repopulate the FTS5 keyword index from candidates.
+    """
+    if not fts_enabled(session):
+        return 0
+    session.execute(sql_text(f"DELETE FROM {FTS_TABLE}"))
+    session.commit()
+    cols = [CandidateRecord.resume_id, CandidateRecord.full_name, CandidateRecord.search_blob] \
+        + [getattr(CandidateRecord, c) for _, c in FACETS.values()] + [getattr(CandidateRecord, c) for c in SKILL_COLUMNS.values()]
+    n = 0
+    last = ""
+    while True:
+        rows = session.execute(
+            select(*cols).where(CandidateRecord.resume_id > last).order_by(CandidateRecord.resume_id).limit(chunk_size)
+        ).mappings().all()
+        if not rows:
+            break
+        _sync_fts(session, [dict(r) for r in rows])
+        session.commit()
+        n += len(rows)
+        last = rows[-1]["resume_id"]
+    return n
+
+_FTS_TOKEN_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+def to_fts_query(keyword: str) -> str:
+    """
+    User keyword -> FTS5 MATCH expression. Terms are ANDed; "quoted words" are phrases and a
+    trailing * makes a prefix query (quant* matches quant, quantitative, ...). Everything is
+    quoted, so FTS5 operators/punctuation in user input can't produce a syntax error.
+    """
+    parts = []
+    for phrase, word in _FTS_TOKEN_RE.findall(keyword):
+        if phrase:
+            parts.append('"' + phrase.replace('"', '""') + '"')
+            continue
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            parts.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+def keyword_search(session, keyword: str, limit: int = 500) -> List[tuple]:
+    """
+    BM25-ranked (resume_id, score) pairs for a keyword query; lower score = more relevant.
+    """
+    fts_q = to_fts_query(keyword)
+    if not fts_q or not fts_enabled(session):
+        return []
+    rows = session.execute(sql_text(
+        f"SELECT c.resume_id, bm25({FTS_TABLE}, {', '.join(map(str, FTS_WEIGHTS))}) AS score "
+        f"FROM {FTS_TABLE} JOIN candidates c ON c.resume_id = {FTS_TABLE}.resume_id "
+        f"WHERE {FTS_TABLE} MATCH :q ORDER BY score LIMIT :lim"
+    ), {"q": fts_q, "lim": limit}).all()
+    return [(r[0], r[1]) for r in rows]
+
+def _fts_rank_subquery(fts_q: str):
+    return (
+        sql_text(
+            f"SELECT resume_id AS fts_resume_id, bm25({FTS_TABLE}, {', '.join(map(str, FTS_WEIGHTS))}) AS fts_rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_q"
+        )
+        .bindparams(fts_q=fts_q)
+        .columns(fts_resume_id=String, fts_rank=Float)
+        .subquery("fts")
+    )
+
+def facet_values(session, facet: str) -> List[str]:
+    """
+    Distinct values present for a facet ("sector", "role", "asset_class" or "skill").
+    """
+    model = CandidateSkill if facet == "skill" else FACETS[facet][0]
+    return [v for (v,) in session.query(model.value).distinct().order_by(model.value)]
+
+def _facet_filter(model, values: List[str], match_all: bool):
+    sub = select(model.resume_id).where(model.value.in_(values))
+    if match_all:
+        sub = sub.group_by(model.resume_id).having(func.count(func.distinct(model.value)) == len(set(values)))
+    return CandidateRecord.resume_id.in_(sub)
+
+def _chunks(items: Iterable[Any], n: int) -> Iterator[List[Any]]:
+    buf: List[Any] = []
+    for x in items:
+        buf.append(x)
+        if len(buf) >= n:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+def bulk_upsert_candidates(session, records: Iterable[Dict[str, Any]], chunk_size: int = 500) -> List[Dict[str, Any]]:
+    """
+    Upsert many records with native INSERT ... ON CONFLICT DO UPDATE, one transaction per chunk.
+
+    Returns one outcome per distinct resume_id: {"resume_id", "status": inserted|updated|failed, "error"}.
+    A failing chunk is retried row by row so one bad record doesn't sink its neighbours.
+    Chunks and retried rows run in SAVEPOINTs, so a failure never discards other rows pending in
+    the session (ingest's text-store, parse-cache and manifest rows ride along in these commits).
+    """
+    out: List[Dict[str, Any]] = []
+    for chunk in _chunks(records, chunk_size):
+        with metrics.stage("store"):
+            try:
+                with write_savepoint(session):
+                    out += _upsert_rows(session, chunk)
+            except Exception as e:
+                metrics.stage_error("store", e)
+                for rec in chunk:
+                    try:
+                        with write_savepoint(session):
+                            out += _upsert_rows(session, [rec])
+                    except Exception as e:
+                        out.append({"resume_id": rec.get("resume_id"), "status": "failed", "error": str(e)})
+            session.commit()
+    return out
+
+def candidate_unchanged(session, record: Dict[str, Any]) -> bool:
+    """
+    True when the stored row already holds exactly `record`, so upserting it would only churn the
+    change log and derived tables (a parse-cache hit re-ingested).
+    """
+    row = session.execute(
+        select(*[getattr(CandidateRecord, c) for c in _CANDIDATE_COLUMNS]).where(CandidateRecord.resume_id == record["resume_id"])
+    ).mappings().first()
+    return row is not None and all(row[c] == record.get(c, _CANDIDATE_DEFAULTS.get(c)) for c in _CANDIDATE_COLUMNS)
+
+def upsert_candidate(session, record: Dict[str, Any]) -> None:
+    """
+    record: dict with keys matching CandidateRecord columns.
+    """
+    with metrics.stage("store"):
+        _upsert_rows(session, [record])
+        session.commit()
+
+# Columns the search list view needs; parsed_json/search_blob stay on disk until a profile opens.
+LIST_COLUMNS = [
+    "resume_id", "full_name", "geo_market", "country", "approach", "degree_level",
+    "years_experience", "sectors_json", "roles_json", "skills_programming_json", "source_filename",
+]
+
+def _apply_filters(
+    q,
     geo_markets: List[str] | None = None,
     countries: List[str] | None = None,
     approaches: List[str] | None = None,
@@ -81,12 +661,18 @@ def query_candidates(
     min_exp: float | None = None,
     max_exp: float | None = None,
     degree_levels: List[str] | None = None,
-    keyword: str | None = None,
     include_unknown_exp: bool = True,
-    limit: int = 500,
-) -> List[CandidateRecord]:
-    q = session.query(CandidateRecord)
-
+    sectors_all: List[str] | None = None,
+    roles_all: List[str] | None = None,
+    asset_classes_any: List[str] | None = None,
+    asset_classes_all: List[str] | None = None,
+    skills_any: List[str] | None = None,
+    skills_all: List[str] | None = None,
+):
+    """
+    *_any: candidate has at least one of the values; *_all: candidate has every value.
+    Skills match across all skill buckets (programming/data/ml/finance/tools).
+    """
     if geo_markets:
         q = q.filter(CandidateRecord.geo_market.in_(geo_markets))
     if countries:
@@ -119,23 +705,163 @@ def query_candidates(
             if max_exp is not None:
                 q = q.filter(CandidateRecord.years_experience.isnot(None)).filter(CandidateRecord.years_experience <= max_exp)
 
-    # Sectors/Roles (simple contains search on JSON string)
-    # For large scale, move to OpenSearch or a normalized join table.
-    if sectors_any:
-        conds = []
-        for s in sectors_any:
-            conds.append(CandidateRecord.sectors_json.like(f'%"{s}"%'))
-        q = q.filter(sql_text(" OR ".join([f"sectors_json LIKE :s{i}" for i,_ in enumerate(conds)]))).params(**{f"s{i}": f'%"{s}"%' for i,s in enumerate(sectors_any)})
+    # Sectors/Roles/Asset classes/Skills via the indexed facet tables
+    for model, any_vals, all_vals in [
+        (CandidateSector, sectors_any, sectors_all),
+        (CandidateRole, roles_any, roles_all),
+        (CandidateAssetClass, asset_classes_any, asset_classes_all),
+        (CandidateSkill, skills_any, skills_all),
+    ]:
+        if any_vals:
+            q = q.filter(_facet_filter(model, any_vals, match_all=False))
+        if all_vals:
+            q = q.filter(_facet_filter(model, all_vals, match_all=True))
+    return q
 
-    if roles_any:
-        q = q.filter(sql_text(" OR ".join([f"roles_json LIKE :r{i}" for i in range(len(roles_any))]))).params(**{f"r{i}": f'%"{r}"%' for i,r in enumerate(roles_any)})
-
-    if keyword:
-        kw = keyword.strip().lower()
-        q = q.filter(CandidateRecord.search_blob.like(f"%{kw}%"))
+def _apply_keyword(session, q, keyword: str | None):
+    """
+    Keyword: FTS5 match ranked by BM25 (returns the rank column, lower = more relevant);
+    LIKE substring scan without FTS5 (rank None).
+    """
+    if not keyword or not keyword.strip():
+        return q, None
+    fts_q = to_fts_query(keyword)
+    if fts_enabled(session) and fts_q:
+        fts = _fts_rank_subquery(fts_q)
+        q = q.join(fts, fts.c.fts_resume_id == CandidateRecord.resume_id)
+        return q, fts.c.fts_rank
+    kw = keyword.strip().lower()
+    return q.filter(CandidateRecord.search_blob.like(f"%{kw}%")), None
 
+def query_candidates(
+    session,
+    geo_markets: List[str] | None = None,
+    countries: List[str] | None = None,
+    approaches: List[str] | None = None,
+    sectors_any: List[str] | None = None,
+    roles_any: List[str] | None = None,
+    min_exp: float | None = None,
+    max_exp: float | None = None,
+    degree_levels: List[str] | None = None,
+    keyword: str | None = None,
+    include_unknown_exp: bool = True,
+    limit: int = 500,
+    sectors_all: List[str] | None = None,
+    roles_all: List[str] | None = None,
+    asset_classes_any: List[str] | None = None,
+    asset_classes_all: List[str] | None = None,
+    skills_any: List[str] | None = None,
+    skills_all: List[str] | None = None,
+) -> List[CandidateRecord]:
+    """
+    Full ORM records; see _apply_filters for filter semantics and search_candidates for a paged,
+    column-projected variant.
+    """
+    q = _apply_filters(
+        session.query(CandidateRecord),
+        geo_markets=geo_markets, countries=countries, approaches=approaches,
+        sectors_any=sectors_any, roles_any=roles_any, min_exp=min_exp, max_exp=max_exp,
+        degree_levels=degree_levels, include_unknown_exp=include_unknown_exp,
+        sectors_all=sectors_all, roles_all=roles_all,
+        asset_classes_any=asset_classes_any, asset_classes_all=asset_classes_all,
+        skills_any=skills_any, skills_all=skills_all,
+    )
+    q, rank = _apply_keyword(session, q, keyword)
+    if rank is not None:
+        return q.order_by(rank, CandidateRecord.years_experience.desc().nullslast()).limit(limit).all()
     return q.order_by(CandidateRecord.years_experience.desc().nullslast()).limit(limit).all()
 
+def count_candidates(session, keyword: str | None = None, **filters) -> int:
+    q, _rank = _apply_keyword(session, _apply_filters(session.query(CandidateRecord.resume_id), **filters), keyword)
+    return q.count()
+
+def search_candidates(
+    session,
+    page_size: int = 50,
+    cursor: Optional[tuple] = None,
+    keyword: str | None = None,
+    columns: Optional[List[str]] = None,
+    with_total: bool = False,
+    **filters,
+) -> Dict[str, Any]:
+    """
+    One page of matches as plain dicts holding only `columns` (default LIST_COLUMNS).
+
+    Keyset pagination: pass the previous page's next_cursor to get the following page. Order is
+    (years_experience desc, unknown last, resume_id), or (BM25 rank, resume_id) for FTS keyword
+    searches, so paging stays an index range scan however deep it goes.
+    Returns {"rows", "next_cursor" (None on the last page), "total" (None unless with_total)}.
+    """
+    from sqlalchemy import or_, and_
+    names = list(dict.fromkeys(["resume_id", "years_experience"] + list(columns or LIST_COLUMNS)))
+    q = _apply_filters(session.query(*[getattr(CandidateRecord, c) for c in names]), **filters)
+    q, rank = _apply_keyword(session, q, keyword)
+    total = q.count() if with_total else None
+
+    rid = CandidateRecord.resume_id
+    if rank is not None:
+        q = q.add_columns(rank.label("_sort"))
+        if cursor is not None:
+            q = q.filter(or_(rank > cursor[0], and_(rank == cursor[0], rid > cursor[1])))
+        q = q.order_by(rank, rid)
+    else:
+        years = CandidateRecord.years_experience
+        if cursor is not None:
+            if cursor[0] is None:
+                q = q.filter(years.is_(None), rid > cursor[1])
+            else:
+                q = q.filter(or_(years < cursor[0], and_(years == cursor[0], rid > cursor[1]), years.is_(None)))
+        q = q.order_by(years.desc().nullslast(), rid)
+
+    rows = [dict(r._mapping) for r in q.limit(page_size + 1)]
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = (last["_sort"] if rank is not None else last["years_experience"], last["resume_id"])
+    for r in rows:
+        r.pop("_sort", None)
+    return {"rows": rows, "next_cursor": next_cursor, "total": total}
+
+def get_candidates(session, resume_ids: List[str]) -> List[CandidateRecord]:
+    """
+    Load candidates by id, returned in the order of `resume_ids`.
+    """
+    by_id: Dict[str, CandidateRecord] = {}
+    for chunk in _chunks(resume_ids, 500):
+        for rec in session.query(CandidateRecord).filter(CandidateRecord.resume_id.in_(chunk)):
+            by_id[rec.resume_id] = rec
+    return [by_id[rid] for rid in resume_ids if rid in by_id]
+
+def get_candidate_rows(session, resume_ids: List[str], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    search_candidates-style row dicts (`columns`, default LIST_COLUMNS) for `resume_ids`, in that order.
+    """
+    names = list(dict.fromkeys(["resume_id", "years_experience"] + list(columns or LIST_COLUMNS)))
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for chunk in _chunks(resume_ids, 500):
+        for r in session.query(*[getattr(CandidateRecord, c) for c in names]).filter(CandidateRecord.resume_id.in_(chunk)):
+            by_id[r.resume_id] = dict(r._mapping)
+    return [by_id[rid] for rid in resume_ids if rid in by_id]
+
+def iter_candidate_rows(session, columns: List[str], chunk_size: int = 2000) -> Iterator[List[tuple]]:
+    """
+    Chunks of column tuples for every candidate in resume_id order (keyset pagination), so
+    exports run in memory bounded by chunk_size whatever the table size.
+    """
+    cols = [getattr(CandidateRecord, c) for c in columns]
+    key = CandidateRecord.resume_id
+    pos = columns.index("resume_id") if "resume_id" in columns else None
+    if pos is None:
+        cols.append(key)
+    last = ""
+    while True:
+        rows = session.execute(select(*cols).where(key > last).order_by(key).limit(chunk_size)).all()
+        if not rows:
+            return
+        last = rows[-1][-1 if pos is None else pos]
+        yield [tuple(r[:len(columns)]) for r in rows]
+
 def get_candidate_json(session, resume_id: str) -> Dict[str, Any]:
     rec = session.get(CandidateRecord, resume_id)
     if not rec:
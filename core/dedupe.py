@@ -0,0 +1,138 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import datetime as dt
+import os
+import re
+import zlib
+
+import numpy as np
+from sqlalchemy import insert, tuple_
+
+from .db import LshBucket, ResumeSignature
+
+# Near-duplicate resume detection. Text -> word 5-gram shingles -> 128-permutation MinHash
+# signature. The signature is cut into 16 bands of 8 rows; each band hashes to an LSH bucket
+# stored in lsh_buckets, so finding candidates for a new file is 16 indexed lookups whatever
+# the corpus size. Candidates are then confirmed by estimated Jaccard similarity
+# (fraction of equal signature slots). With 16x8 bands, pairs at ~0.7 Jaccard collide
+# in at least one band about half the time, and pairs at 0.9 collide almost always.
+# Texts under DEDUPE_MIN_WORDS words (e.g. scanned PDFs whose text layer is just a header, when
+# OCR is unavailable) carry too few shingles to tell resumes apart; they are never matched.
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+
+DUP_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.8"))
+SKIP_THRESHOLD = float(os.getenv("DEDUPE_SKIP_THRESHOLD", "0.95"))
+SKIP_LLM = os.getenv("DEDUPE_SKIP_LLM", "1") != "0"
+ENABLED = os.getenv("DEDUPE", "1") != "0"
+MIN_WORDS = int(os.getenv("DEDUPE_MIN_WORDS", "50"))
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX32 = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def shingles(text: str, k: int = SHINGLE) -> np.ndarray:
+    """
+    crc32 of each k-word shingle of the normalised text (the whole text if shorter).
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    grams = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+def _unmatchable() -> np.ndarray:
+    return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+
+def is_unmatchable(sig: np.ndarray) -> bool:
+    return int(sig.min()) == 0xFFFFFFFF
+
+def minhash(text: str) -> np.ndarray:
+    """
+    uint32[NUM_PERM] MinHash signature; empty text or text under MIN_WORDS words gives all-max
+    (matches nothing).
+    """
+    if len(_WORD_RE.findall((text or "").lower())) < MIN_WORDS:
+        return _unmatchable()
+    hv = shingles(text)
+    if not len(hv):
+        return _unmatchable()
+    # Universal hashing h(x) = (a*x + b) mod p, truncated to 32 bits; a*x may wrap in uint64, as in datasketch.
+    with np.errstate(over="ignore"):
+        phv = ((hv[:, None] * _A + _B) % _MERSENNE) & _MAX32
+    return phv.min(axis=0).astype(np.uint32)
+
+def band_keys(sig: np.ndarray) -> List[int]:
+    return [zlib.crc32(sig[b * ROWS:(b + 1) * ROWS].tobytes()) & 0x7FFFFFFF for b in range(BANDS)]
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+def _sig(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype=np.uint32)
+
+def find_duplicate(session, sig: np.ndarray, exclude: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Best already-indexed match at or above DUP_THRESHOLD: {"resume_id" (cluster root), "similarity"}.
+    """
+    if is_unmatchable(sig):
+        return None
+    keys = [(band, key) for band, key in enumerate(band_keys(sig))]
+    hashes = {
+        h for (h,) in session.query(LshBucket.file_sha256).filter(tuple_(LshBucket.band, LshBucket.bucket).in_(keys))
+        if h != exclude
+    }
+    best = None
+    for row in session.query(ResumeSignature).filter(ResumeSignature.file_sha256.in_(list(hashes))):
+        s = similarity(sig, _sig(row.signature))
+        if s >= DUP_THRESHOLD and (best is None or s > best["similarity"]):
+            best = {"resume_id": row.duplicate_of or row.resume_id, "similarity": s}
+    return best
+
+def index_signature(session, file_hash: str, resume_id: str, sig: np.ndarray, source_filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Look up near-duplicates of `sig`, then add it to the index (not committed). Idempotent per file.
+    Returns {"duplicate_of": root resume_id or None, "similarity": float or None, "skip_llm": bool}.
+    """
+    row = session.get(ResumeSignature, file_hash)
+    if row is None:
+        match = find_duplicate(session, sig, exclude=file_hash)
+        if match and match["resume_id"] == resume_id:
+            match = None
+        row = ResumeSignature(
+            file_sha256=file_hash, resume_id=resume_id, signature=sig.astype(np.uint32).tobytes(),
+            duplicate_of=match["resume_id"] if match else None, similarity=match["similarity"] if match else None,
+            source_filename=source_filename, created_at=dt.datetime.utcnow().isoformat() + "Z",
+        )
+        session.add(row)
+        if not is_unmatchable(sig):
+            # Unmatchable signatures would all share the same 16 buckets; keep them out.
+            session.execute(insert(LshBucket.__table__), [
+                {"band": band, "bucket": key, "file_sha256": file_hash} for band, key in enumerate(band_keys(sig))
+            ])
+        session.flush()
+    skip = bool(SKIP_LLM and row.duplicate_of and (row.similarity or 0) >= SKIP_THRESHOLD)
+    return {"duplicate_of": row.duplicate_of, "similarity": row.similarity, "skip_llm": skip}
+
+def duplicate_clusters(session, min_size: int = 2) -> List[Dict[str, Any]]:
+    """
+    [{"resume_id": root, "members": [{resume_id, file_sha256, source_filename, similarity}]}], largest first.
+    """
+    from sqlalchemy import or_
+    roots = {rid for (rid,) in session.query(ResumeSignature.duplicate_of).filter(ResumeSignature.duplicate_of.isnot(None)).distinct()}
+    clusters: Dict[str, List[Dict[str, Any]]] = {r: [] for r in roots}
+    q = session.query(ResumeSignature).filter(or_(ResumeSignature.duplicate_of.isnot(None), ResumeSignature.resume_id.in_(list(roots))))
+    for row in q:
+        root = row.duplicate_of or row.resume_id
+        clusters.setdefault(root, []).append({
+            "resume_id": row.resume_id, "file_sha256": row.file_sha256,
+            "source_filename": row.source_filename, "similarity": row.similarity,
+        })
+    out = [{"resume_id": root, "members": members} for root, members in clusters.items() if len(members) >= min_size]
+    return sorted(out, key=lambda c: -len(c["members"]))
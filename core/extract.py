@@ -1,33 +1,291 @@
 from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
 from pathlib import Path
+import os
+import re
+import threading
+import time
+import unicodedata
 import pdfplumber
 from docx import Document
 
-def extract_text_from_pdf(path: str) -> str:
-    text_parts = []
+from . import metrics
+from . import ocr as ocr_mod
+
+# Nothing downstream reads past this many characters (the OpenAI-compatible provider truncates
+# its prompt at 120k), so extraction stops once it has this much text. 0 disables the cap.
+DEFAULT_MAX_CHARS = int(os.getenv("EXTRACT_MAX_CHARS", "120000"))
+
+# PDF text comes from a pluggable backend. pdfium (pypdfium2, installed with pdfplumber) reads
+# the text layer in C and is many times faster than pdfplumber's pure-Python layout pass, but
+# its reading order is cruder. In "auto" mode (the default) every page is read with pdfium and
+# only pages whose text looks wrong (see looks_garbled) are re-read with pdfplumber; if pdfium
+# fails on the file altogether the whole document goes to pdfplumber.
+# EXTRACT_BACKEND=pdfium / pdfplumber forces one backend with no fallback.
+BACKEND = os.getenv("EXTRACT_BACKEND", "auto").strip().lower()
+
+# pdfium is not thread-safe: every call into it (text here, page renders in core/ocr.py) holds this.
+PDFIUM_LOCK = threading.RLock()
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """
+    Yield stripped text page by page, releasing each page's cached layout objects
+    (chars, words, text map) before moving on, so memory stays flat on long documents.
+    Stop iterating early and the remaining pages are never parsed.
+    """
     with pdfplumber.open(path) as pdf:
         for page in pdf.pages:
-            t = page.extract_text() or ""
-            t = t.strip()
-            if t:
-                text_parts.append(t)
-    return "\n\n".join(text_parts).strip()
+            try:
+                t = (page.extract_text() or "").strip()
+            finally:
+                page.close()
+            yield t
+
+_CONTROL = re.compile(r"[\x00-\x08\x0b-\x1f\x7f\ufffe\uffff]")
+
+def _clean_pdfium(text: str) -> str:
+    # pdfium ends lines with \r\n and marks soft hyphens at line breaks with \x02.
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x02", "-")
+    return "\n".join(line.rstrip() for line in _CONTROL.sub("", text).split("\n")).strip()
+
+class PdfBackend:
+    """
+    A way of reading a PDF's text layer. iter_pages yields every page's stripped text in order;
+    page_texts re-reads just the given pages (used for fallback).
+    """
+    name = "base"
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    def page_texts(self, path: str, indexes: List[int]) -> Dict[int, str]:
+        raise NotImplementedError
+
+class PdfplumberBackend(PdfBackend):
+    name = "pdfplumber"
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        return iter_pdf_pages(path)
+
+    def page_texts(self, path: str, indexes: List[int]) -> Dict[int, str]:
+        out: Dict[int, str] = {}
+        with pdfplumber.open(path) as pdf:
+            for i in indexes:
+                page = pdf.pages[i]
+                try:
+                    out[i] = (page.extract_text() or "").strip()
+                finally:
+                    page.close()
+        return out
+
+class PdfiumBackend(PdfBackend):
+    name = "pdfium"
+
+    def _page(self, pdf, index: int) -> str:
+        with PDFIUM_LOCK:
+            page = pdf[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    return _clean_pdfium(textpage.get_text_range())
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        import pypdfium2 as pdfium
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(path)
+        try:
+            for i in range(len(pdf)):
+                yield self._page(pdf, i)
+        finally:
+            with PDFIUM_LOCK:
+                pdf.close()
+
+    def page_texts(self, path: str, indexes: List[int]) -> Dict[int, str]:
+        import pypdfium2 as pdfium
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(path)
+        try:
+            return {i: self._page(pdf, i) for i in indexes}
+        finally:
+            with PDFIUM_LOCK:
+                pdf.close()
+
+PDF_BACKENDS: Dict[str, PdfBackend] = {b.name: b for b in (PdfiumBackend(), PdfplumberBackend())}
+
+def get_pdf_backend(name: str) -> PdfBackend:
+    try:
+        return PDF_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown EXTRACT_BACKEND={name}. Use auto, {', '.join(PDF_BACKENDS)}.") from None
+
+_MIN_JUDGE_CHARS = 40
+
+def looks_garbled(text: str) -> Optional[str]:
+    """
+    Why a page's extracted text looks unusable, or None if it looks fine (or is too short to
+    judge). Catches the ways a fast text-layer read goes wrong: broken font encodings (replacement
+    or private-use characters, symbol soup), per-glyph output ("J o h n  S m i t h"), lost word
+    spacing and column-scrambled layouts that come out as one or two characters per line.
+    """
+    if len(text) < _MIN_JUDGE_CHARS:
+        return None
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return None
+    bad = sum(1 for c in chars if c == "\ufffd" or unicodedata.category(c) in ("Co", "Cc", "Cs"))
+    if bad / len(chars) > 0.02:
+        return "bad_chars"
+    if sum(1 for c in chars if c.isalnum()) / len(chars) < 0.5:
+        return "symbols"
+    words = text.split()
+    if len(words) >= 20 and sum(1 for w in words if len(w) == 1 and w.isalpha()) / len(words) > 0.4:
+        return "letter_spaced"
+    if len(chars) / len(words) > 15:
+        return "no_spaces"
+    lines = [l for l in text.split("\n") if l.strip()]
+    if len(lines) >= 10 and sum(1 for l in lines if len(l.strip()) <= 2) / len(lines) > 0.4:
+        return "fragmented"
+    return None
 
-def extract_text_from_docx(path: str) -> str:
+def _collect(pages_iter: Iterator[str], budget: int) -> List[str]:
+    pages: List[str] = []
+    total = 0
+    for t in pages_iter:
+        pages.append(t)
+        if t:
+            total += len(t) + 2
+        if budget and total >= budget:
+            break
+    return pages
+
+def extract_pdf_pages(path: str, max_chars: Optional[int] = None, backend: Optional[str] = None,
+                      stats: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Text of each page, in order (empty string for pages without a text layer), stopping once
+    max_chars of text has been collected. Pages are kept positional so OCR can fill the blanks.
+    backend: auto / pdfium / pdfplumber (default EXTRACT_BACKEND).
+    stats: if given, filled with {"backend_s": {name: seconds}, "fallback_pages", "fallback_reasons"}.
+    """
+    budget = DEFAULT_MAX_CHARS if max_chars is None else max_chars
+    mode = (backend or BACKEND).strip().lower()
+    st: Dict[str, Any] = stats if stats is not None else {}
+    st.setdefault("backend_s", {})
+    st.setdefault("fallback_pages", 0)
+    st.setdefault("fallback_reasons", {})
+
+    def timed(b: PdfBackend, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            st["backend_s"][b.name] = st["backend_s"].get(b.name, 0.0) + time.perf_counter() - t0
+
+    if mode != "auto":
+        b = get_pdf_backend(mode)
+        return timed(b, lambda: _collect(b.iter_pages(path), budget))
+
+    fast, slow = PDF_BACKENDS["pdfium"], PDF_BACKENDS["pdfplumber"]
+    try:
+        pages = timed(fast, lambda: _collect(fast.iter_pages(path), budget))
+    except Exception:
+        # pdfium refused the file (or failed mid-way): read it all with pdfplumber instead.
+        pages = timed(slow, lambda: _collect(slow.iter_pages(path), budget))
+        st["fallback_pages"] += len(pages)
+        st["fallback_reasons"]["error"] = st["fallback_reasons"].get("error", 0) + len(pages)
+        return pages
+
+    redo: Dict[int, str] = {}
+    for i, t in enumerate(pages):
+        reason = looks_garbled(t)
+        if reason:
+            redo[i] = reason
+    if redo:
+        for i, t in timed(slow, slow.page_texts, path, list(redo)).items():
+            # Keep pdfium's text if pdfplumber does no better (e.g. a genuinely odd page).
+            if looks_garbled(t) is None:
+                pages[i] = t
+            st["fallback_pages"] += 1
+            st["fallback_reasons"][redo[i]] = st["fallback_reasons"].get(redo[i], 0) + 1
+    return pages
+
+def record_extract_stats(stats: Optional[Dict[str, Any]]) -> None:
+    """
+    Metrics for one extract_pdf_pages call (call in the process that exports metrics).
+    """
+    if not stats:
+        return
+    for name, seconds in stats.get("backend_s", {}).items():
+        metrics.observe_stage(f"extract_{name}", seconds)
+    for reason, n in stats.get("fallback_reasons", {}).items():
+        metrics.record_extract_fallback(reason, n)
+
+def join_pages(pages: List[str], max_chars: Optional[int] = None) -> str:
+    budget = DEFAULT_MAX_CHARS if max_chars is None else max_chars
+    text = "\n\n".join(t for t in pages if t).strip()
+    return text[:budget] if budget else text
+
+def extract_text_from_pdf(path: str, max_chars: Optional[int] = None, ocr: bool = True) -> str:
+    """
+    ocr: OCR pages that have no text layer (see core/ocr.py; no-op when Tesseract is missing).
+    """
+    stats: Dict[str, Any] = {}
+    pages = extract_pdf_pages(path, max_chars=max_chars, stats=stats)
+    record_extract_stats(stats)
+    if ocr:
+        pages = ocr_mod.fill_pages(path, pages)
+    return join_pages(pages, max_chars)
+
+def extract_text_from_docx(path: str, max_chars: Optional[int] = None) -> str:
+    budget = DEFAULT_MAX_CHARS if max_chars is None else max_chars
     doc = Document(path)
-    parts = [p.text.strip() for p in doc.paragraphs if p.text and p.text.strip()]
-    return "\n".join(parts).strip()
+    parts = []
+    total = 0
+    for p in doc.paragraphs:
+        if p.text and p.text.strip():
+            parts.append(p.text.strip())
+            total += len(parts[-1]) + 1
+            if budget and total >= budget:
+                break
+    text = "\n".join(parts).strip()
+    return text[:budget] if budget else text
 
-def extract_resume_text(path: str) -> str:
+def extract_document(path: str) -> Dict[str, Any]:
+    """
+    Extraction with OCR left to the caller, for worker processes: {"text", "pages" (only when
+    pages need OCR), "ocr_pages" (their indexes), "extract_stats" (record with record_extract_stats)}.
+    """
+    if Path(path).suffix.lower() != ".pdf":
+        return {"text": extract_resume_text(path), "pages": None, "ocr_pages": [], "extract_stats": None}
+    stats: Dict[str, Any] = {}
+    pages = extract_pdf_pages(path, stats=stats)
+    todo = ocr_mod.pages_needing_ocr(pages)
+    return {"text": join_pages(pages), "pages": pages if todo else None, "ocr_pages": todo,
+            "extract_stats": stats}
+
+def extract_resume_text_supervised(path: str) -> str:
+    """
+    extract_resume_text in a supervised worker process (core/workers.py): a file that hangs or
+    exhausts memory raises WorkerError instead of stalling the caller. OCR pages go to the OCR pool.
+    """
+    from .workers import shared_pool
+    res = shared_pool().submit(extract_document, path).result()
+    record_extract_stats(res["extract_stats"])
+    if res["ocr_pages"]:
+        return join_pages(ocr_mod.fill_pages(path, res["pages"]))
+    return res["text"]
+
+def extract_resume_text(path: str, max_chars: Optional[int] = None, ocr: bool = True) -> str:
+    """
+    max_chars: stop extracting once this much text is collected (default EXTRACT_MAX_CHARS; 0 = no cap).
+    ocr: fill text-less PDF pages with OCR.
+    """
     ext = Path(path).suffix.lower()
     if ext == ".pdf":
-        return extract_text_from_pdf(path)
+        return extract_text_from_pdf(path, max_chars=max_chars, ocr=ocr)
     if ext == ".docx":
-        return extract_text_from_docx(path)
+        return extract_text_from_docx(path, max_chars=max_chars)
     raise ValueError(f"Unsupported file type: {ext}")
-
-def needs_ocr(text: str) -> bool:
-    """
-    Simple heuristic: if extracted text is tiny, it might be a scanned PDF.
-    """
-    return (not text) or len(text.strip()) < 200
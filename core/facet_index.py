@@ -0,0 +1,303 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+from bisect import bisect_right
+import threading
+
+import numpy as np
+
+from .db import CandidateRecord, CandidateSkill, FACETS, changed_since, data_generation, _chunks
+
+# In-process facet index: every candidate gets a row number. Each (dimension, value) pair is a
+# packed bitset over rows, and years_experience is a float column (NaN = unknown) with a sorted
+# view for range lookups. A filter combination is then a few bitwise ANDs/ORs over n/8 bytes
+# instead of a SQL query. Refreshed incrementally from the candidate_changes log.
+
+SCALAR_DIMS = {
+    "geo_market": CandidateRecord.geo_market,
+    "country": CandidateRecord.country,
+    "approach": CandidateRecord.approach,
+    "degree_level": CandidateRecord.degree_level,
+}
+MULTI_DIMS = {name: model for name, (model, _col) in FACETS.items()}
+MULTI_DIMS["skill"] = CandidateSkill
+
+def _set_bit(bits: np.ndarray, i: int) -> None:
+    bits[i >> 3] |= np.uint8(0x80 >> (i & 7))
+
+class FacetIndex:
+    """
+    Columnar, bitset-backed answer to the non-keyword filters of db.query_candidates.
+    Call sync(session) before querying (get_facet_index does it for you).
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.years = np.full(0, np.nan)
+        self.alive = np.zeros(0, dtype=np.uint8)
+        self.bits: Dict[str, Dict[str, np.ndarray]] = {d: {} for d in list(SCALAR_DIMS) + list(MULTI_DIMS)}
+        self.generation = 0
+        self.loaded = False
+        self._asc_rows = self._sorted_years = self._desc_rows = self._unknown = None
+        self._id_rank = self._sorted_ids = None
+
+    @property
+    def capacity(self) -> int:
+        return len(self.years)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- maintenance ----
+    def _grow(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        cap = max(1024, self.capacity)
+        while cap < rows:
+            cap *= 2
+        pad_bytes = cap // 8 - len(self.alive)
+        self.years = np.concatenate([self.years, np.full(cap - self.capacity, np.nan)])
+        self.alive = np.concatenate([self.alive, np.zeros(pad_bytes, dtype=np.uint8)])
+        for values in self.bits.values():
+            for v, b in values.items():
+                values[v] = np.concatenate([b, np.zeros(pad_bytes, dtype=np.uint8)])
+
+    def _row(self, rid: str) -> int:
+        row = self.row_of.get(rid)
+        if row is None:
+            row = len(self.ids)
+            self._grow(row + 1)
+            self.ids.append(rid)
+            self.row_of[rid] = row
+        return row
+
+    def _bitset(self, dim: str, value: str) -> np.ndarray:
+        b = self.bits[dim].get(value)
+        if b is None:
+            b = self.bits[dim][value] = np.zeros(len(self.alive), dtype=np.uint8)
+        return b
+
+    def _fetch(self, session, ids: Optional[List[str]] = None):
+        """
+        (scalar rows, [(dim, resume_id, value)]) for `ids`, or for every candidate when None.
+        """
+        cols = [CandidateRecord.resume_id, CandidateRecord.years_experience] + list(SCALAR_DIMS.values())
+        batches = [None] if ids is None else list(_chunks(ids, 500))
+        scalars, multis = [], []
+        for chunk in batches:
+            q = session.query(*cols)
+            if chunk is not None:
+                q = q.filter(CandidateRecord.resume_id.in_(chunk))
+            scalars.extend(q.all())
+            for dim, model in MULTI_DIMS.items():
+                fq = session.query(model.resume_id, model.value)
+                if chunk is not None:
+                    fq = fq.filter(model.resume_id.in_(chunk))
+                multis.extend((dim, rid, v) for rid, v in fq)
+        return scalars, multis
+
+    def load(self, session) -> int:
+        """
+        Full (re)build from the candidates and facet tables.
+        """
+        with self._lock:
+            generation = data_generation(session)   # read first: later changes get re-applied by refresh
+            scalars, multis = self._fetch(session)
+            self._reset()
+            self._grow(len(scalars))
+            members: Dict[tuple, List[int]] = {}
+            for r in scalars:
+                row = self._row(r[0])
+                self.years[row] = np.nan if r[1] is None else float(r[1])
+                for dim, v in zip(SCALAR_DIMS, r[2:]):
+                    if v:
+                        members.setdefault((dim, v), []).append(row)
+            for dim, rid, v in multis:
+                row = self.row_of.get(rid)
+                if row is not None and v:
+                    members.setdefault((dim, v), []).append(row)
+            self.alive = self._pack(range(len(self.ids)))
+            for (dim, v), rows in members.items():
+                self.bits[dim][v] = self._pack(rows)
+            self.generation = generation
+            self.loaded = True
+            return len(self.ids)
+
+    def _pack(self, rows: Iterable[int]) -> np.ndarray:
+        flags = np.zeros(self.capacity, dtype=bool)
+        flags[rows if isinstance(rows, np.ndarray) else np.fromiter(rows, dtype=np.int64)] = True
+        return np.packbits(flags)
+
+    def refresh(self, session) -> int:
+        """
+        Apply candidates upserted since the last load/refresh; returns how many rows changed.
+        """
+        with self._lock:
+            changes = changed_since(session, self.generation)
+            if not changes:
+                return 0
+            ids = list(dict.fromkeys(rid for _seq, rid in changes))
+            scalars, multis = self._fetch(session, ids)
+            rows = [self._row(rid) for rid in ids]
+            self.years[rows] = np.nan
+            keep = ~self._pack(rows)
+            self.alive &= keep
+            for values in self.bits.values():
+                for b in values.values():
+                    b &= keep
+            for r in scalars:
+                row = self.row_of[r[0]]
+                _set_bit(self.alive, row)
+                self.years[row] = np.nan if r[1] is None else float(r[1])
+                for dim, v in zip(SCALAR_DIMS, r[2:]):
+                    if v:
+                        _set_bit(self._bitset(dim, v), row)
+            for dim, rid, v in multis:
+                if v:
+                    _set_bit(self._bitset(dim, v), self.row_of[rid])
+            self.generation = changes[-1][0]
+            self._asc_rows = None
+            return len(ids)
+
+    def sync(self, session) -> "FacetIndex":
+        if not self.loaded:
+            self.load(session)
+        else:
+            self.refresh(session)
+        return self
+
+    def _ensure_order(self) -> None:
+        if self._asc_rows is not None:
+            return
+        n = len(self.ids)
+        y = self.years[:n]
+        alive = np.unpackbits(self.alive, count=n).astype(bool)
+        known = np.flatnonzero(alive & ~np.isnan(y))
+        self._asc_rows = known[np.argsort(y[known], kind="stable")]
+        self._sorted_years = y[self._asc_rows]
+        unknown = np.flatnonzero(alive & np.isnan(y))
+        self._unknown = self._pack(unknown)
+        # Rank of each row's resume_id, for ties and keyset cursors.
+        order = sorted(range(n), key=self.ids.__getitem__)
+        self._sorted_ids = [self.ids[i] for i in order]
+        self._id_rank = np.empty(n, dtype=np.int64)
+        self._id_rank[order] = np.arange(n)
+        # Result order matches db.search_candidates: years desc, unknown experience last, then resume_id.
+        self._desc_rows = np.concatenate([
+            known[np.lexsort((self._id_rank[known], -y[known]))],
+            unknown[np.argsort(self._id_rank[unknown])],
+        ])
+
+    # ---- querying ----
+    def _union(self, dim: str, values: List[str]) -> np.ndarray:
+        out = np.zeros(len(self.alive), dtype=np.uint8)
+        for v in values:
+            b = self.bits[dim].get(v)
+            if b is not None:
+                out |= b
+        return out
+
+    def _intersection(self, dim: str, values: List[str]) -> np.ndarray:
+        out = self.alive.copy()
+        for v in values:
+            b = self.bits[dim].get(v)
+            if b is None:
+                return np.zeros_like(out)
+            out &= b
+        return out
+
+    def _years_mask(self, min_exp: Optional[float], max_exp: Optional[float], include_unknown: bool) -> np.ndarray:
+        lo = 0 if min_exp is None else int(np.searchsorted(self._sorted_years, min_exp, side="left"))
+        hi = len(self._sorted_years) if max_exp is None else int(np.searchsorted(self._sorted_years, max_exp, side="right"))
+        out = self._pack(self._asc_rows[lo:max(lo, hi)])
+        if include_unknown:
+            out |= self._unknown
+        return out
+
+    def mask(
+        self,
+        geo_markets: List[str] | None = None,
+        countries: List[str] | None = None,
+        approaches: List[str] | None = None,
+        sectors_any: List[str] | None = None,
+        roles_any: List[str] | None = None,
+        min_exp: float | None = None,
+        max_exp: float | None = None,
+        degree_levels: List[str] | None = None,
+        include_unknown_exp: bool = True,
+        sectors_all: List[str] | None = None,
+        roles_all: List[str] | None = None,
+        asset_classes_any: List[str] | None = None,
+        asset_classes_all: List[str] | None = None,
+        skills_any: List[str] | None = None,
+        skills_all: List[str] | None = None,
+    ) -> np.ndarray:
+        """
+        Packed bitset of matching rows; same filter semantics as db.query_candidates.
+        """
+        self._ensure_order()
+        m = self.alive.copy()
+        for dim, vals in [("geo_market", geo_markets), ("country", countries), ("approach", approaches),
+                          ("degree_level", degree_levels), ("sector", sectors_any), ("role", roles_any),
+                          ("asset_class", asset_classes_any), ("skill", skills_any)]:
+            if vals:
+                m &= self._union(dim, vals)
+        for dim, vals in [("sector", sectors_all), ("role", roles_all), ("asset_class", asset_classes_all), ("skill", skills_all)]:
+            if vals:
+                m &= self._intersection(dim, vals)
+        if min_exp is not None or max_exp is not None:
+            m &= self._years_mask(min_exp, max_exp, include_unknown_exp)
+        return m
+
+    def query(self, limit: int = 500, **filters) -> List[str]:
+        """
+        resume_ids matching `filters` (see mask), ordered by years_experience desc, unknown last.
+        """
+        with self._lock:
+            hits = np.unpackbits(self.mask(**filters), count=len(self.ids)).astype(bool)
+            rows = self._desc_rows[hits[self._desc_rows]]
+            return [self.ids[i] for i in rows[:limit]]
+
+    def page(self, page_size: int = 50, cursor: Optional[tuple] = None, **filters) -> Tuple[List[str], Optional[tuple]]:
+        """
+        One keyset page of resume_ids in query() order, and the cursor for the next page (None on
+        the last). Cursors are (years_experience or None, resume_id), as in db.search_candidates.
+        """
+        with self._lock:
+            hits = np.unpackbits(self.mask(**filters), count=len(self.ids)).astype(bool)
+            rows = self._desc_rows[hits[self._desc_rows]]
+            if cursor is not None:
+                y = self.years[rows]
+                after = self._id_rank[rows] >= bisect_right(self._sorted_ids, cursor[1])
+                if cursor[0] is None:
+                    rows = rows[np.isnan(y) & after]
+                else:
+                    rows = rows[(y < cursor[0]) | ((y == cursor[0]) & after) | np.isnan(y)]
+            ids = [self.ids[i] for i in rows[:page_size]]
+            next_cursor = None
+            if len(rows) > page_size:
+                last = rows[page_size - 1]
+                years = self.years[last]
+                next_cursor = (None if np.isnan(years) else float(years), self.ids[last])
+            return ids, next_cursor
+
+    def count(self, **filters) -> int:
+        with self._lock:
+            return int(np.unpackbits(self.mask(**filters), count=len(self.ids)).sum())
+
+_INDEXES: Dict[str, FacetIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_facet_index(session) -> FacetIndex:
+    """
+    Process-wide index for the session's database, loaded once and refreshed on each call.
+    """
+    key = str(session.get_bind().url)
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(key)
+        if idx is None:
+            idx = _INDEXES[key] = FacetIndex()
+    return idx.sync(session)
@@ -0,0 +1,426 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+import time
+
+from .extract import extract_document, join_pages, record_extract_stats
+from .parser import parse_text_to_record, aparse_text_to_record, normalize_for_db
+from .llm_factory import get_provider
+from .db import bulk_upsert_candidates, candidate_unchanged, write_savepoint, CandidateRecord
+from .cache import file_sha256, resume_id_for_hash, get_cached_parse, put_cached_parse
+from .text_store import get_text, put_text, iter_texts
+from .workers import SUPERVISED, SupervisedPool, WorkerError
+from . import dedupe, manifest, metrics, ocr, profiling
+
+def _extract_job(path: str) -> Dict[str, Any]:
+    """
+    Runs inside an extraction worker process; must stay a picklable top-level function.
+    """
+    # OCR is left to the parent: text-less pages are fanned out across the pool as separate jobs.
+    # Backend timings/fallbacks travel back with the result; metrics are exported by the parent.
+    profile = None
+    t0 = time.perf_counter()
+    if profiling.worker_enabled():
+        # Profiling run: per-file cProfile, tracemalloc peak and RSS, sent back to the parent.
+        with profiling.capture_file(path, "extract") as profile:
+            res = extract_document(path)
+    else:
+        res = extract_document(path)
+    res["extract_s"] = time.perf_counter() - t0
+    res["profile"] = profile
+    # MinHash here too: it is CPU-bound and the worker already holds the text (unless OCR will change it).
+    res["minhash"] = dedupe.minhash(res["text"]) if dedupe.ENABLED and not res["ocr_pages"] else None
+    return res
+
+def _parse_job(provider, text: str, rid: str, file_hash: str):
+    t0 = time.perf_counter()
+    parsed = parse_text_to_record(text, rid, provider=provider, file_hash=file_hash)
+    return parsed, time.perf_counter() - t0
+
+async def _aparse_job(provider, text: str, rid: str, file_hash: str):
+    t0 = time.perf_counter()
+    parsed = await aparse_text_to_record(text, rid, provider, file_hash=file_hash)
+    return parsed, time.perf_counter() - t0
+
+class _ProviderLoopExecutor:
+    """
+    Runs coroutine jobs on an async provider's own event loop; futures are concurrent.futures
+    ones, so they mix freely with the extraction pool in wait().
+    """
+    def __init__(self, provider):
+        self.provider = provider
+
+    def submit(self, coro_fn, *args) -> Future:
+        return self.provider.run_coroutine(coro_fn(*args))
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+def _llm_executor(provider, llm_concurrency: int):
+    """
+    (executor, job) for the LLM stage: async providers multiplex on one event loop and pooled
+    client; sync providers get a bounded thread pool.
+    """
+    if hasattr(provider, "aparse_resume") and hasattr(provider, "run_coroutine"):
+        return _ProviderLoopExecutor(provider), _aparse_job
+    return ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm"), _parse_job
+
+class _InlineExecutor:
+    """
+    Executor stand-in that runs jobs in the calling thread (workers=0: debugging/profiling).
+    """
+    def submit(self, fn, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+def _extract_executor(workers: int):
+    """
+    Extraction pool: supervised processes with a per-file timeout, RSS cap and recycling
+    (core/workers.py); a plain process pool with EXTRACT_SUPERVISED=0; in-process for workers=0.
+    """
+    if workers <= 0:
+        return _InlineExecutor()
+    if SUPERVISED:
+        return SupervisedPool(workers)
+    return ProcessPoolExecutor(max_workers=workers)
+
+class _StoreBuffer:
+    """
+    Collects normalized records and writes them with bulk_upsert_candidates, so ingest pays
+    one transaction per batch instead of one commit per resume. Pending text-store and
+    parse-cache rows ride along in the same commit.
+    """
+    def __init__(self, session, batch_size: int = 200, max_age_s: float = 2.0):
+        self.session = session
+        self.batch_size = max(1, batch_size)
+        self.max_age_s = max_age_s
+        self.items: List[tuple] = []      # (record, result)
+        self.started = 0.0
+
+    def add(self, record: Dict[str, Any], result: Dict[str, Any]) -> None:
+        if not self.items:
+            self.started = time.monotonic()
+        self.items.append((record, result))
+
+    def due(self) -> bool:
+        return bool(self.items) and (
+            len(self.items) >= self.batch_size or time.monotonic() - self.started >= self.max_age_s
+        )
+
+    def flush(self) -> List[Dict[str, Any]]:
+        if not self.items:
+            return []
+        items, self.items = self.items, []
+        t0 = time.perf_counter()
+        outcomes = {o["resume_id"]: o for o in bulk_upsert_candidates(self.session, [rec for rec, _ in items], chunk_size=self.batch_size)}
+        store_s = (time.perf_counter() - t0) / len(items)
+        out = []
+        for rec, res in items:
+            o = outcomes.get(rec["resume_id"], {})
+            if o.get("status") == "failed":
+                res = dict(res, status="failed", resume_id=None, error=o.get("error"))
+            else:
+                res = dict(res, store=o.get("status"), store_s=store_s)
+            out.append(res)
+        return out
+
+def _result(path: str, resume_id: Optional[str], status: str, error: Optional[str] = None, **extra) -> Dict[str, Any]:
+    out = {"path": path, "source_filename": Path(path).name, "resume_id": resume_id, "status": status, "error": error}
+    out.update(extra)
+    return out
+
+def sync_file_indexes(session) -> None:
+    """
+    Post-ingest hook for the file-backed indexes built from candidates: the similar-candidates
+    vectors and the Arrow snapshot. Both catch up incrementally via the candidate_changes log.
+    """
+    from .vectors import sync_vectors
+    from .snapshot import sync_snapshot
+    sync_vectors(session)
+    sync_snapshot(session)
+
+def run_ingest(
+    session,
+    paths: List[str],
+    workers: int = 4,
+    llm_concurrency: int = 4,
+    provider=None,
+    store_batch: int = 200,
+) -> Iterator[Dict[str, Any]]:
+    """
+    run_ingest_stages plus the ingest manifest: every file's final stored/failed state is
+    recorded in ingest_files (see core/manifest.py), so an interrupted run can be resumed.
+    """
+    for res in run_ingest_stages(session, paths, workers=workers, llm_concurrency=llm_concurrency,
+                                 provider=provider, store_batch=store_batch):
+        manifest.record_result(session, res)
+        metrics.record_ingest_result(res["status"])
+        if res["status"] in ("failed", "quarantined"):
+            session.commit()
+        metrics.export(min_interval_s=metrics.EXPORT_INTERVAL_S)
+        yield res
+    session.commit()
+    sync_file_indexes(session)
+    metrics.export()
+
+def run_ingest_stages(
+    session,
+    paths: List[str],
+    workers: int = 4,
+    llm_concurrency: int = 4,
+    provider=None,
+    store_batch: int = 200,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pipelined ingest: extract (process pool) -> LLM parse (thread pool, or the provider's
+    event loop for async providers) -> store (this thread, batched bulk upserts).
+
+    Stages are joined by bounded queues, so a slow LLM backs up into extraction instead of
+    piling extracted text up in memory. The DB session is only touched from the calling thread.
+    Files already in the parse cache skip extraction and the LLM entirely (status "cached", and no
+    upsert at all when the stored candidate row is already identical);
+    files whose text is in the text store skip extraction only. PDF pages without a text layer
+    are OCR'd as separate jobs on the extraction pool, so one scanned file uses every worker.
+    A file whose extraction times out, exceeds the worker memory cap or crashes its worker is
+    killed with its worker and comes back "quarantined"; the rest of the run is unaffected.
+    Yields one result dict per input file, in completion order.
+    """
+    provider = provider or get_provider()
+    llm_concurrency = max(1, llm_concurrency)
+
+    extract_pool = _extract_executor(workers)
+    llm_pool, parse_job = _llm_executor(provider, llm_concurrency)
+
+    max_extracting = max(1, workers) * 2
+    max_ready = llm_concurrency * 2
+
+    todo = deque(paths)
+    ready: deque = deque()                   # (path, file_hash, text, extra, minhash) waiting for an LLM slot
+    extracting: Dict[Future, tuple] = {}
+    ocr_jobs: Dict[Future, Dict[str, Any]] = {}      # page future -> its document's OCR state
+    ocr_docs = 0
+    parsing: Dict[Future, tuple] = {}
+    buffer = _StoreBuffer(session, batch_size=store_batch)
+
+    def store(path: str, rid: str, status: str, parsed, text: str, timings: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """
+        Buffer the record; a cache hit whose candidate row is already identical is not re-upserted
+        and its result is returned right away instead.
+        """
+        record = normalize_for_db(parsed, text, source_filename=Path(path).name)
+        if status == "cached" and candidate_unchanged(session, record):
+            return _result(path, rid, status, store="unchanged", **timings)
+        buffer.add(record, _result(path, rid, status, **timings))
+        return None
+
+    # Per-file session work runs in a SAVEPOINT: a failure rolls back that file's rows only, never
+    # the text-store, parse-cache and manifest rows of other files waiting for the next store batch.
+    def extracted(path: str, file_hash: str, text: str, timings: Dict[str, Any], sig) -> Iterator[Dict[str, Any]]:
+        try:
+            with write_savepoint(session):
+                put_text(session, file_hash, text, commit=False)
+                manifest.mark(session, path, "extracted", extract_s=timings.get("extract_s"))
+        except Exception as e:
+            yield _result(path, None, "failed", f"extract: {e}")
+            return
+        ready.append((path, file_hash, text, timings, sig))
+
+    try:
+        while todo or ready or extracting or ocr_jobs or parsing:
+            # Backpressure: only start extracting when there is room downstream.
+            while todo and len(extracting) + ocr_docs < max_extracting and len(ready) < max_ready:
+                path = todo.popleft()
+                try:
+                    file_hash = file_sha256(path)
+                    with write_savepoint(session):
+                        manifest.mark(session, path, "pending", file_sha256=file_hash)
+                        hit = get_cached_parse(session, file_hash, provider)
+                        text = None if hit else get_text(session, file_hash)
+                    if hit:
+                        parsed, text, rid = hit
+                        unchanged = store(path, rid, "cached", parsed, text, {})
+                except Exception as e:
+                    yield _result(path, None, "failed", str(e))
+                    continue
+                if hit:
+                    if unchanged is not None:
+                        yield unchanged
+                    # Cache hits never wait on a pool, so this loop could drain all of todo into the
+                    # buffer; flush as batches fill to keep memory bounded and results flowing.
+                    if buffer.due():
+                        yield from buffer.flush()
+                    continue
+                if text is not None:
+                    ready.append((path, file_hash, text, {}, None))
+                    continue
+                extracting[extract_pool.submit(_extract_job, path)] = (path, file_hash)
+
+            while ready and len(parsing) < llm_concurrency:
+                path, file_hash, text, timings, sig = ready.popleft()
+                rid = resume_id_for_hash(file_hash)
+                if dedupe.ENABLED:
+                    # LSH lookup before spending an LLM call; near-exact copies map onto the existing row.
+                    try:
+                        sig = dedupe.minhash(text) if sig is None else sig
+                        with write_savepoint(session):
+                            dup = dedupe.index_signature(session, file_hash, rid, sig, Path(path).name)
+                        # Only skip the LLM when the original is stored: its own parse may have failed
+                        # or still be in flight, and then this copy must be parsed.
+                        skip = dup["skip_llm"] and session.get(CandidateRecord, dup["duplicate_of"]) is not None
+                    except Exception as e:
+                        yield _result(path, None, "failed", f"dedupe: {e}")
+                        continue
+                    if skip:
+                        yield _result(path, dup["duplicate_of"], "duplicate", similarity=dup["similarity"], **timings)
+                        continue
+                    if dup["duplicate_of"]:
+                        timings = dict(timings, duplicate_of=dup["duplicate_of"], similarity=dup["similarity"])
+                fut = llm_pool.submit(parse_job, provider, text, rid, file_hash)
+                parsing[fut] = (path, file_hash, text, rid, timings)
+
+            if buffer.due():
+                yield from buffer.flush()
+
+            pending = set(extracting) | set(ocr_jobs) | set(parsing)
+            if not pending:
+                continue
+            done, _ = wait(pending, timeout=buffer.max_age_s if buffer.items else None, return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                if fut in extracting:
+                    path, file_hash = extracting.pop(fut)
+                    try:
+                        res = fut.result()
+                    except WorkerError as e:
+                        # Timed out, over the memory cap or crashed its worker: quarantined, so
+                        # --resume does not feed it to the pool again (see scripts/quarantine_report.py).
+                        metrics.stage_error("extract", e)
+                        yield _result(path, None, "quarantined", f"extract {e.reason}: {e}")
+                        continue
+                    except Exception as e:
+                        # Raised in the worker process, so count it here.
+                        metrics.stage_error("extract", e)
+                        yield _result(path, None, "failed", f"extract: {e}")
+                        continue
+                    metrics.observe_stage("extract", res["extract_s"])
+                    record_extract_stats(res["extract_stats"])
+                    profiling.record_file(res["profile"])
+                    if res["ocr_pages"]:
+                        doc = {"path": path, "file_hash": file_hash, "pages": res["pages"], "left": len(res["ocr_pages"]),
+                               "extract_s": res["extract_s"], "ocr_s": 0.0}
+                        for i in res["ocr_pages"]:
+                            ocr_jobs[extract_pool.submit(ocr.ocr_page, path, i)] = doc
+                        ocr_docs += 1
+                        continue
+                    yield from extracted(path, file_hash, res["text"], {"extract_s": res["extract_s"]}, res["minhash"])
+                elif fut in ocr_jobs:
+                    doc = ocr_jobs.pop(fut)
+                    try:
+                        page = fut.result()
+                        ocr.record_page(page)
+                        doc["ocr_s"] += page["seconds"]
+                        if page["text"]:
+                            doc["pages"][page["index"]] = page["text"]
+                    except Exception as e:
+                        # Keep the page as extracted; the rest of the document still counts.
+                        metrics.stage_error("ocr", e)
+                    doc["left"] -= 1
+                    if not doc["left"]:
+                        ocr_docs -= 1
+                        timings = {"extract_s": doc["extract_s"], "ocr_s": round(doc["ocr_s"], 3)}
+                        yield from extracted(doc["path"], doc["file_hash"], join_pages(doc["pages"]), timings, None)
+                else:
+                    path, file_hash, text, rid, timings = parsing.pop(fut)
+                    try:
+                        # LLM errors are raised here, off-session: nothing to roll back.
+                        parsed, parse_s = fut.result()
+                        with write_savepoint(session):
+                            put_cached_parse(session, file_hash, provider, parsed, text, commit=False)
+                            manifest.mark(session, path, "parsed", resume_id=rid, parse_s=parse_s)
+                        store(path, rid, "parsed", parsed, text, dict(timings, parse_s=parse_s))
+                    except Exception as e:
+                        yield _result(path, None, "failed", str(e))
+                        continue
+        yield from buffer.flush()
+    finally:
+        llm_pool.shutdown(wait=True, cancel_futures=True)
+        extract_pool.shutdown(wait=True, cancel_futures=True)
+
+def reparse_corpus(session, provider=None, llm_concurrency: int = 4, store_batch: int = 200) -> Iterator[Dict[str, Any]]:
+    """
+    Re-run the LLM stage for every text in the text store (e.g. after switching LLM_PROVIDER
+    or changing core/schema.py). Never opens a source file; existing parses for the current
+    provider/model/schema are reused from the parse cache.
+    """
+    provider = provider or get_provider()
+    llm_concurrency = max(1, llm_concurrency)
+    llm_pool, parse_job = _llm_executor(provider, llm_concurrency)
+    parsing: Dict[Future, tuple] = {}
+    buffer = _StoreBuffer(session, batch_size=store_batch)
+
+    def source_filename(rid: str) -> str:
+        row = session.query(CandidateRecord.source_filename).filter(CandidateRecord.resume_id == rid).first()
+        return (row[0] if row else None) or rid
+
+    def store(rid: str, status: str, parsed, text: str) -> Optional[Dict[str, Any]]:
+        name = source_filename(rid)
+        record = normalize_for_db(parsed, text, source_filename=name)
+        if status == "cached" and candidate_unchanged(session, record):
+            return _result(name, rid, status, store="unchanged")
+        buffer.add(record, _result(name, rid, status))
+        return None
+
+    def drain(block_until: int) -> Iterator[Dict[str, Any]]:
+        while len(parsing) > block_until:
+            done, _ = wait(set(parsing), return_when=FIRST_COMPLETED)
+            for fut in done:
+                file_hash, text, rid = parsing.pop(fut)
+                try:
+                    parsed, _ = fut.result()
+                    with write_savepoint(session):
+                        put_cached_parse(session, file_hash, provider, parsed, text, commit=False)
+                    store(rid, "reparsed", parsed, text)
+                except Exception as e:
+                    yield _result(source_filename(rid), rid, "failed", str(e))
+        if buffer.due():
+            yield from buffer.flush()
+
+    try:
+        for file_hash, text in iter_texts(session):
+            rid = resume_id_for_hash(file_hash)
+            hit = get_cached_parse(session, file_hash, provider)
+            if hit:
+                parsed, text, rid = hit
+                unchanged = store(rid, "cached", parsed, text)
+                if unchanged is not None:
+                    yield unchanged
+                continue
+            if dedupe.ENABLED:
+                try:
+                    sig = dedupe.minhash(text)
+                    with write_savepoint(session):
+                        dup = dedupe.index_signature(session, file_hash, rid, sig, source_filename(rid))
+                    skip = dup["skip_llm"] and session.get(CandidateRecord, dup["duplicate_of"]) is not None
+                except Exception as e:
+                    yield _result(source_filename(rid), rid, "failed", f"dedupe: {e}")
+                    continue
+                if skip:
+                    yield _result(source_filename(rid), dup["duplicate_of"], "duplicate", similarity=dup["similarity"])
+                    continue
+            yield from drain(llm_concurrency * 2 - 1)
+            parsing[llm_pool.submit(parse_job, provider, text, rid, file_hash)] = (file_hash, text, rid)
+        yield from drain(0)
+        yield from buffer.flush()
+        sync_file_indexes(session)
+        metrics.export()
+    finally:
+        llm_pool.shutdown(wait=True, cancel_futures=True)
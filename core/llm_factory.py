@@ -1,16 +1,27 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Dict
 import os
 from .llm_providers.mock import MockProvider
 from .llm_providers.openai_compatible import OpenAICompatibleProvider
 
+def _http_provider_kwargs() -> Dict[str, Any]:
+    return {
+        "api_base": os.environ["LLM_API_BASE"],
+        "api_key": os.environ["LLM_API_KEY"],
+        "model": os.environ["LLM_MODEL"],
+        "max_retries": int(os.getenv("LLM_MAX_RETRIES", "5")),
+        "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        "rpm": float(os.getenv("LLM_RPM", "0")) or None,
+        "tpm": float(os.getenv("LLM_TPM", "0")) or None,
+    }
+
 def get_provider():
     provider = os.getenv("LLM_PROVIDER", "mock").strip().lower()
     if provider == "mock":
         return MockProvider()
     if provider == "openai_compatible":
-        api_base = os.environ["LLM_API_BASE"]
-        api_key = os.environ["LLM_API_KEY"]
-        model = os.environ["LLM_MODEL"]
-        return OpenAICompatibleProvider(api_base=api_base, api_key=api_key, model=model)
-    raise ValueError(f"Unknown LLM_PROVIDER={provider}. Use mock or openai_compatible.")
+        return OpenAICompatibleProvider(**_http_provider_kwargs())
+    if provider == "openai_compatible_async":
+        from .llm_providers.openai_async import AsyncOpenAICompatibleProvider
+        return AsyncOpenAICompatibleProvider(**_http_provider_kwargs())
+    raise ValueError(f"Unknown LLM_PROVIDER={provider}. Use mock, openai_compatible or openai_compatible_async.")
@@ -2,5 +2,11 @@ from __future__ import annotations
 from typing import Dict, Any
 
 class LLMProvider:
+    # Identify what produced a parse; part of the parse-cache key.
+    name: str = "base"
+    model: str = ""
+    # Bump when prompts change in a way that can change outputs; also part of the cache key.
+    prompt_version: str = ""
+
     def parse_resume(self, resume_id: str, resume_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
@@ -95,99 +95,162 @@ def _estimate_years_experience(text: str) -> Optional[float]:
         years = 60.0
     return years
 
-def _infer_approach(text: str) -> List[str]:
+# Keyword tables for the heuristic inference below. Approach/sector terms match as plain
+# substrings; programming/data skills as whole words; ml/finance/tools skills also match with
+# spaces removed ("Capital IQ" ~ "capitaliq").
+SYSTEMATIC_TERMS = [
+    "quant", "systematic", "alpha", "signals", "backtest", "back-testing", "factor model",
+    "regression", "time series", "machine learning", "ml", "xgboost", "random forest",
+    "pytorch", "tensorflow", "feature engineering", "stat arb", "statistical arbitrage"
+]
+FUNDAMENTAL_TERMS = [
+    "fundamental", "valuation", "dcf", "comps", "earnings", "10-k", "10q", "10-q",
+    "industry research", "channel checks", "modeling", "financial model", "pitch book"
+]
+SECTOR_TERMS = [
+    ("Technology", ["software","saas","cloud","ai","artificial intelligence","data platform","semiconductor","tech"]),
+    ("Healthcare", ["healthcare","biotech","pharma","clinical","hospital","medical device"]),
+    ("Financial Services", ["investment bank","banking","bank","financial","fintech","insurance","asset management","private equity"]),
+    ("Energy", ["oil","gas","upstream","downstream","refining","energy","power generation","utilities"]),
+    ("Industrials", ["manufacturing","industrial","aerospace","defense","automation","supply chain","logistics"]),
+    ("Consumer", ["consumer","retail","e-commerce","ecommerce","cpg","brands","marketplace"]),
+]
+WORD_SKILLS = {
+    "programming": ["Python","C++","Java","R","Julia"],
+    "data": ["SQL","Pandas","Spark","Snowflake","Airflow"],
+}
+SPACELESS_SKILLS = {
+    "ml": ["Machine Learning","Deep Learning","XGBoost","PyTorch","TensorFlow","NLP"],
+    "finance": ["DCF","Valuation","Factor Models","Options","Derivatives","Risk"],
+    "tools": ["Bloomberg","FactSet","Capital IQ","Refinitiv","Koyfin"],
+}
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+def _at_word_boundary(t: str, i: int) -> bool:
+    """
+    Same test as regex \\b at position i.
+    """
+    left = i > 0 and _is_word_char(t[i - 1])
+    right = i < len(t) and _is_word_char(t[i])
+    return left != right
+
+def _trie_regex(words: List[str]) -> str:
+    """
+    Prefix-trie shaped alternation ("bank(?:ing)?" rather than "banking|bank"): the regex engine
+    follows one branch per character instead of retrying every keyword, and greedy optional
+    tails still return the longest keyword starting at each position.
+    """
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class _Lexicon:
+    """
+    A keyword table compiled once into a single trie-shaped regex.
+
+    scan() walks the text once: each search() jumps (in C) to the next position where a keyword
+    starts and reports the longest keyword there; shorter keywords that are prefixes of it are hit
+    at the same position, so overlapping hits ("fintech" / "tech") are not lost.
+    """
+    def __init__(self, entries: List[Tuple[str, str, bool]]):
+        # entries: (keyword, tag, whole_word)
+        self.tags: Dict[str, List[Tuple[str, bool]]] = {}
+        for kw, tag, whole_word in entries:
+            self.tags.setdefault(kw.lower(), []).append((tag, whole_word))
+        kws = sorted(self.tags, key=len, reverse=True)
+        self.pattern = re.compile(_trie_regex(kws))
+        self.prefixes = {k: [p for p in kws if k.startswith(p)] for k in kws}
+
+    def scan(self, t: str) -> set:
+        hits = set()
+        search = self.pattern.search
+        m = search(t)
+        while m:
+            start = m.start()
+            for kw in self.prefixes[m.group()]:
+                for tag, whole_word in self.tags[kw]:
+                    if tag in hits:
+                        continue
+                    if not whole_word or (_at_word_boundary(t, start) and _at_word_boundary(t, start + len(kw))):
+                        hits.add(tag)
+            m = search(t, start + 1)
+        return hits
+
+_TEXT_LEXICON = _Lexicon(
+    [(k, "approach:Systematic", False) for k in SYSTEMATIC_TERMS]
+    + [(k, "approach:Fundamental", False) for k in FUNDAMENTAL_TERMS]
+    + [(k, f"sector:{name}", False) for name, kws in SECTOR_TERMS for k in kws]
+    + [(s, f"skill:{cat}:{s}", True) for cat, skills in WORD_SKILLS.items() for s in skills]
+)
+_SPACELESS_LEXICON = _Lexicon(
+    [(s.replace(" ", ""), f"skill:{cat}:{s}", False) for cat, skills in SPACELESS_SKILLS.items() for s in skills]
+)
+
+def _scan_keywords(text: str) -> set:
+    """
+    Every approach/sector/skill tag found in `text`, e.g. "sector:Energy", "skill:ml:NLP".
+    (A whole-word hit on "capital iq" implies "capitaliq" in the space-stripped text, so the
+    space-stripped pass alone covers ml/finance/tools.)
+    """
     t = text.lower()
-    systematic_terms = [
-        "quant", "systematic", "alpha", "signals", "backtest", "back-testing", "factor model",
-        "regression", "time series", "machine learning", "ml", "xgboost", "random forest",
-        "pytorch", "tensorflow", "feature engineering", "stat arb", "statistical arbitrage"
-    ]
-    fundamental_terms = [
-        "fundamental", "valuation", "dcf", "comps", "earnings", "10-k", "10q", "10-q",
-        "industry research", "channel checks", "modeling", "financial model", "pitch book"
-    ]
-    sys_hit = any(k in t for k in systematic_terms)
-    fund_hit = any(k in t for k in fundamental_terms)
-    out=[]
-    if fund_hit:
-        out.append("Fundamental")
-    if sys_hit:
-        out.append("Systematic")
+    return _TEXT_LEXICON.scan(t) | _SPACELESS_LEXICON.scan(t.replace(" ", ""))
+
+def _approaches_from(hits: set) -> List[str]:
     # If nothing hit, leave empty (don't guess)
+    return [a for a in ["Fundamental", "Systematic"] if f"approach:{a}" in hits]
+
+def _sectors_from(hits: set) -> List[str]:
+    return [name for name, _ in SECTOR_TERMS if f"sector:{name}" in hits]
+
+def _skills_from(hits: set) -> Dict[str, List[str]]:
+    out = {cat: [s for s in skills if f"skill:{cat}:{s}" in hits] for cat, skills in {**WORD_SKILLS, **SPACELESS_SKILLS}.items()}
+    out["other"] = []
     return out
 
+def _infer_approach(text: str) -> List[str]:
+    return _approaches_from(_scan_keywords(text))
+
 def _infer_sectors(text: str) -> List[str]:
-    t = text.lower()
-    sectors=[]
-    def add(name, kws):
-        nonlocal sectors
-        if any(k in t for k in kws):
-            sectors.append(name)
-
-    add("Technology", ["software","saas","cloud","ai","artificial intelligence","data platform","semiconductor","tech"])
-    add("Healthcare", ["healthcare","biotech","pharma","clinical","hospital","medical device"])
-    add("Financial Services", ["investment bank","banking","bank","financial","fintech","insurance","asset management","private equity"])
-    add("Energy", ["oil","gas","upstream","downstream","refining","energy","power generation","utilities"])
-    add("Industrials", ["manufacturing","industrial","aerospace","defense","automation","supply chain","logistics"])
-    add("Consumer", ["consumer","retail","e-commerce","ecommerce","cpg","brands","marketplace"])
-
-    # unique preserve order
-    seen=set(); out=[]
-    for s in sectors:
-        if s not in seen:
-            seen.add(s); out.append(s)
-    return out
+    return _sectors_from(_scan_keywords(text))
+
+_GEO_PATTERNS = [
+    ("US", re.compile(r"\b(new york|nyc|boston|chicago|san francisco|california|usa|u\.s\.|united states)\b")),
+    ("Europe", re.compile(r"\b(london|uk|united kingdom|england|paris|france|germany|frankfurt|europe|emea)\b")),
+    ("APAC", re.compile(r"\b(singapore|hong kong|india|mumbai|bangalore|tokyo|japan|china|shanghai|seoul|asia|apac)\b")),
+]
 
 def _infer_geo_market(text: str) -> Optional[str]:
     t = text.lower()
-    if re.search(r"\b(new york|nyc|boston|chicago|san francisco|california|usa|u\.s\.|united states)\b", t):
-        return "US"
-    if re.search(r"\b(london|uk|united kingdom|england|paris|france|germany|frankfurt|europe|emea)\b", t):
-        return "Europe"
-    if re.search(r"\b(singapore|hong kong|india|mumbai|bangalore|tokyo|japan|china|shanghai|seoul|asia|apac)\b", t):
-        return "APAC"
+    for market, pat in _GEO_PATTERNS:
+        if pat.search(t):
+            return market
     return None
 
 def _infer_skills(text: str) -> Dict[str, List[str]]:
-    t = text.lower()
-    def has(word): return re.search(rf"\b{re.escape(word.lower())}\b", t) is not None
-
-    programming = [s for s in ["Python","C++","Java","R","Julia"] if has(s)]
-    data = [s for s in ["SQL","Pandas","Spark","Snowflake","Airflow"] if has(s)]
-    ml = []
-    for s in ["Machine Learning","Deep Learning","XGBoost","PyTorch","TensorFlow","NLP"]:
-        if s.lower().replace(" ","") in t.replace(" ","") or has(s):
-            ml.append(s)
-    finance = []
-    for s in ["DCF","Valuation","Factor Models","Options","Derivatives","Risk"]:
-        if s.lower().replace(" ","") in t.replace(" ","") or has(s):
-            finance.append(s)
-    tools = []
-    for s in ["Bloomberg","FactSet","Capital IQ","Refinitiv","Koyfin"]:
-        if s.lower().replace(" ","") in t.replace(" ","") or has(s):
-            tools.append(s)
-
-    # de-dupe preserve order
-    def uniq(xs):
-        out=[]; seen=set()
-        for x in xs:
-            if x not in seen:
-                seen.add(x); out.append(x)
-        return out
-    return {
-        "programming": uniq(programming),
-        "data": uniq(data),
-        "ml": uniq(ml),
-        "finance": uniq(finance),
-        "tools": uniq(tools),
-        "other": []
-    }
+    return _skills_from(_scan_keywords(text))
 
 class MockProvider(LLMProvider):
     """
     Deterministic parser for demo/testing (no API). Uses heuristics to populate the schema.
     Replace with a real LLM provider for production accuracy.
     """
+    name = "mock"
+    model = "mock_v2"
+
     def parse_resume(self, resume_id: str, resume_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
         lines = [l.strip() for l in resume_text.splitlines() if l.strip()]
         name = lines[0] if lines else None
@@ -196,10 +259,11 @@ class MockProvider(LLMProvider):
         phones = _find_phones(resume_text)
 
         geo = _infer_geo_market(resume_text)
-        approaches = _infer_approach(resume_text)
-        sectors = _infer_sectors(resume_text)
+        hits = _scan_keywords(resume_text)
+        approaches = _approaches_from(hits)
+        sectors = _sectors_from(hits)
         years = _estimate_years_experience(resume_text)
-        skills = _infer_skills(resume_text)
+        skills = _skills_from(hits)
 
         parsed = {
             "resume_id": resume_id,
@@ -234,7 +298,7 @@ class MockProvider(LLMProvider):
             "certifications": [],
             "metadata": {
                 "parsed_at": dt.datetime.utcnow().isoformat() + "Z",
-                "parser_version": "mock_v2",
+                "parser_version": self.model,
                 "quality": {"confidence": 0.6, "notes": ["Heuristic mock parser (improve by switching to LLM provider)."]}
             },
             "evidence": {
@@ -0,0 +1,120 @@
+from __future__ import annotations
+from typing import Any, Awaitable, Dict, Optional
+from concurrent.futures import Future
+import asyncio
+import threading
+import weakref
+import httpx
+from .base import LLMProvider
+from .. import metrics
+from .ratelimit import RateLimiter, RETRYABLE_STATUS, parse_retry_after, retry_delay
+from .openai_compatible import build_payload, parse_completion, usage_tokens
+
+class AsyncOpenAICompatibleProvider(LLMProvider):
+    """
+    asyncio variant of OpenAICompatibleProvider: one pooled httpx.AsyncClient, a concurrency cap,
+    RPM/TPM token buckets and jittered retries that honour Retry-After.
+
+    Use `await aparse_resume(...)` from async code. Sync callers (and core/ingest.py) can use
+    parse_resume / run_coroutine, which drive a private event loop on a background thread.
+    """
+    # Same endpoint/model/prompt as the sync provider, so both share parse-cache entries.
+    name = "openai_compatible"
+    prompt_version = "compact-v1"
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: str,
+        model: str,
+        timeout_s: int = 90,
+        max_retries: int = 5,
+        max_concurrency: int = 8,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+    ):
+        self.api_base = api_base.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.max_concurrency = max(1, max_concurrency)
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm)
+        # httpx clients and semaphores are bound to the loop they were created on.
+        self._per_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        st = self._per_loop.get(loop)
+        if st is None:
+            client = httpx.AsyncClient(
+                base_url=self.api_base,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                timeout=self.timeout_s,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+            st = (client, asyncio.Semaphore(self.max_concurrency))
+            self._per_loop[loop] = st
+        return st
+
+    async def aparse_resume(self, resume_id: str, resume_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        client, sem = self._state()
+        payload, est = build_payload(self.model, resume_text, schema)
+        attempt = 0
+        async with sem:
+            while True:
+                await self.limiter.acquire_async(est)
+                try:
+                    r = await client.post("/chat/completions", json=payload)
+                except (httpx.TransportError, httpx.TimeoutException):
+                    if attempt >= self.max_retries:
+                        raise
+                    metrics.record_llm_retry(self.name, "connection")
+                    await asyncio.sleep(retry_delay(attempt))
+                    attempt += 1
+                    continue
+                if r.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                    retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                    delay = retry_delay(attempt, retry_after)
+                    metrics.record_llm_retry(self.name, r.status_code)
+                    if r.status_code == 429:
+                        self.limiter.cooldown(delay)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                r.raise_for_status()
+                data = r.json()
+                self.limiter.record_usage(est, usage_tokens(data))
+                metrics.record_llm_usage(self.name, self.model, data.get("usage"))
+                return parse_completion(data, resume_id)
+
+    async def aclose(self) -> None:
+        st = self._per_loop.pop(asyncio.get_running_loop(), None)
+        if st:
+            await st[0].aclose()
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-async", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run_coroutine(self, coro: Awaitable) -> Future:
+        """
+        Schedule `coro` on the provider's background loop; returns a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._background_loop())
+
+    def parse_resume(self, resume_id: str, resume_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return self.run_coroutine(self.aparse_resume(resume_id, resume_text, schema)).result()
+
+    def close(self) -> None:
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
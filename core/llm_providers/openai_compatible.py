@@ -1,11 +1,17 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from functools import lru_cache
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from .base import LLMProvider
+from .. import metrics
+from ..schema import schema_outline
+from .ratelimit import RateLimiter, RETRYABLE_STATUS, parse_retry_after, retry_delay, estimate_tokens
 
 SYSTEM_PROMPT = """You are an information extraction engine for resumes.
-Return ONLY valid JSON that matches the provided JSON schema. Do not add extra keys.
+Return ONLY valid JSON that matches the output shape below. Do not add extra keys.
 Rules:
 - Do not guess. If missing, use null, empty string, or empty array as appropriate.
 - Always populate these objects even if values are empty: target_fit, summary, skills.
@@ -13,48 +19,118 @@ Rules:
 - For target_fit.geographic_markets use only: US, Europe, APAC (or empty).
 - Prefer short evidence snippets from the resume text for critical fields.
 - Keep lists de-duplicated.
+
+Output shape (TypeScript notation; `T|null` is nullable, `object` is free-form):
+{outline}
 """
 
+# Only the resume varies per call; everything before it is a byte-identical prefix that
+# provider-side prompt caching can reuse across requests.
 USER_PROMPT_TEMPLATE = """Extract a structured resume record from the text below.
 
-You MUST output JSON that conforms to this schema (JSON Schema):
-{schema}
-
 Resume text:
 \"\"\"{resume_text}\"\"\"
 """
 
+@lru_cache(maxsize=4)
+def _system_prompt(outline: str) -> str:
+    return SYSTEM_PROMPT.format(outline=outline)
+
+def system_prompt(schema: Optional[Dict[str, Any]] = None) -> str:
+    return _system_prompt(schema_outline(schema))
+
+# Completion budget assumed when pacing the tokens-per-minute limiter before a call.
+EST_COMPLETION_TOKENS = 2000
+
+def build_payload(model: str, resume_text: str, schema: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    Returns (chat-completions payload, estimated total tokens for rate limiting).
+    """
+    sys_prompt = system_prompt(schema)
+    user_prompt = USER_PROMPT_TEMPLATE.format(resume_text=resume_text[:120000])
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": sys_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "temperature": 0,
+        # Many compatible providers support some variant of JSON mode:
+        "response_format": {"type": "json_object"},
+    }
+    est = estimate_tokens(sys_prompt) + estimate_tokens(user_prompt) + EST_COMPLETION_TOKENS
+    return payload, est
+
+def parse_completion(data: Dict[str, Any], resume_id: str) -> Dict[str, Any]:
+    content = data["choices"][0]["message"]["content"]
+    parsed = json.loads(content)
+    parsed["resume_id"] = resume_id  # ensure stable id
+    return parsed
+
+def usage_tokens(data: Dict[str, Any]) -> Optional[int]:
+    usage = data.get("usage") or {}
+    return usage.get("total_tokens")
+
 class OpenAICompatibleProvider(LLMProvider):
     """
     Works with any endpoint that exposes an OpenAI-compatible /v1/chat/completions API.
+    Reuses one pooled HTTP session, and retries throttling/transient errors honouring Retry-After.
     """
-    def __init__(self, api_base: str, api_key: str, model: str, timeout_s: int = 90):
+    name = "openai_compatible"
+    prompt_version = "compact-v1"
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: str,
+        model: str,
+        timeout_s: int = 90,
+        max_retries: int = 5,
+        max_concurrency: int = 8,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+    ):
         self.api_base = api_base.rstrip("/")
         self.api_key = api_key
         self.model = model
         self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
 
     def parse_resume(self, resume_id: str, resume_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.api_base}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        user_prompt = USER_PROMPT_TEMPLATE.format(schema=json.dumps(schema), resume_text=resume_text[:120000])
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            "temperature": 0,
-            # Many compatible providers support some variant of JSON mode:
-            "response_format": {"type": "json_object"},
-        }
-        r = requests.post(url, headers=headers, json=payload, timeout=self.timeout_s)
-        r.raise_for_status()
-        data = r.json()
-        content = data["choices"][0]["message"]["content"]
-        parsed = json.loads(content)
-        parsed["resume_id"] = resume_id  # ensure stable id
-        return parsed
+        payload, est = build_payload(self.model, resume_text, schema)
+        attempt = 0
+        while True:
+            self.limiter.acquire(est)
+            try:
+                r = self.session.post(url, json=payload, timeout=self.timeout_s)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                metrics.record_llm_retry(self.name, "connection")
+                time.sleep(retry_delay(attempt))
+                attempt += 1
+                continue
+            if r.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                delay = retry_delay(attempt, retry_after)
+                metrics.record_llm_retry(self.name, r.status_code)
+                if r.status_code == 429:
+                    self.limiter.cooldown(delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            r.raise_for_status()
+            data = r.json()
+            self.limiter.record_usage(est, usage_tokens(data))
+            metrics.record_llm_usage(self.name, self.model, data.get("usage"))
+            return parse_completion(data, resume_id)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from typing import Optional
+import asyncio
+import email.utils
+import random
+import threading
+import time
+
+# HTTP statuses worth retrying: throttling, timeouts and transient upstream failures.
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` tokens/minute.
+
+    reserve() debits immediately (the balance may go negative) and returns how long the
+    caller must wait, so waiters queue up fairly and both sync and async callers can share it.
+    """
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def debit(self, amount: float) -> None:
+        """
+        Charge extra usage discovered after the fact (e.g. actual completion tokens).
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits plus a shared cooldown after a 429.
+    rpm/tpm of 0 (or None) disables that limit.
+    """
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, est_tokens: int) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(est_tokens))
+        with self._lock:
+            wait = max(wait, self._blocked_until - time.monotonic())
+        return wait
+
+    def acquire(self, est_tokens: int) -> None:
+        wait = self.reserve(est_tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, est_tokens: int) -> None:
+        wait = self.reserve(est_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record_usage(self, est_tokens: int, actual_tokens: Optional[int]) -> None:
+        if self.tokens and actual_tokens and actual_tokens > est_tokens:
+            self.tokens.debit(actual_tokens - est_tokens)
+
+    def cooldown(self, seconds: float) -> None:
+        """
+        The server said slow down: hold every caller sharing this limiter, not just the one that got the 429.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After is either delta-seconds or an HTTP-date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def retry_delay(attempt: int, retry_after: Optional[float] = None, base_s: float = 1.0, cap_s: float = 60.0) -> float:
+    """
+    Server-provided Retry-After plus a little jitter; otherwise exponential backoff with full jitter.
+    """
+    if retry_after is not None:
+        return min(cap_s, retry_after) + random.uniform(0, base_s)
+    return random.uniform(0, min(cap_s, base_s * (2 ** attempt)))
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; only used to pace the TPM bucket.
+    return len(text) // 4 + 1
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+import datetime as dt
+import os
+
+from .db import IngestFile
+
+# Ingest manifest: which stage each source file reached (pending -> extracted -> parsed -> stored,
+# or failed), with its hash, last error and per-stage timings. Lets batch_ingest.py --resume skip
+# finished work after a crash, and --watch pick up only new files.
+# Files whose extraction timed out, hit the worker memory cap or crashed a worker are "quarantined":
+# like stored files they are skipped until they change (or --retry-quarantined), so one bad file
+# does not cost a full timeout on every resumed run. scripts/quarantine_report.py lists them.
+
+STAGES = ["pending", "extracted", "parsed", "stored", "failed", "quarantined"]
+
+def manifest_key(path: str) -> str:
+    return str(Path(path).resolve())
+
+def _fingerprint(path: str) -> tuple:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def mark(session, path: str, stage: str, commit: bool = False, **fields: Any) -> None:
+    """
+    Record that `path` reached `stage`. Extra fields: file_sha256, resume_id, error, *_s timings.
+    Not committed unless commit=True; the ingest store batch commits it.
+    """
+    key = manifest_key(path)
+    row = session.get(IngestFile, key)
+    if row is None:
+        row = IngestFile(path=key, stage=stage, attempts=0)
+        session.add(row)
+    if stage == "pending":
+        row.attempts = (row.attempts or 0) + 1
+        row.error = None
+        try:
+            row.size, row.mtime_ns = _fingerprint(path)
+        except OSError:
+            pass
+    row.stage = stage
+    for k, v in fields.items():
+        if v is not None and hasattr(IngestFile, k):
+            setattr(row, k, v)
+    row.updated_at = dt.datetime.utcnow().isoformat() + "Z"
+    session.flush()
+    if commit:
+        session.commit()
+
+def record_result(session, res: Dict[str, Any]) -> None:
+    """
+    Fold one run_ingest result dict into the manifest.
+    """
+    if res["status"] in ("failed", "quarantined"):
+        mark(session, res["path"], res["status"], error=res.get("error"))
+    else:
+        mark(session, res["path"], "stored", resume_id=res.get("resume_id"),
+             extract_s=res.get("extract_s"), parse_s=res.get("parse_s"), store_s=res.get("store_s"))
+
+def files_to_ingest(session, paths: Iterable[str], chunk_size: int = 500, retry_quarantined: bool = False,
+                    retry_failed: bool = True) -> List[str]:
+    """
+    Drop files already stored (or quarantined, unless retry_quarantined) whose size/mtime haven't
+    changed since; failed (unless retry_failed=False) and pending (interrupted) files are kept for
+    retry. Uses stat() only, so it costs seconds on 20k files.
+    """
+    skip = ["stored"] + ([] if retry_quarantined else ["quarantined"]) + ([] if retry_failed else ["failed"])
+    paths = list(paths)
+    out: List[str] = []
+    for i in range(0, len(paths), chunk_size):
+        chunk = paths[i:i + chunk_size]
+        keys = {manifest_key(p): p for p in chunk}
+        done = {
+            r.path: r for r in session.query(IngestFile).filter(IngestFile.path.in_(list(keys)), IngestFile.stage.in_(skip))
+        }
+        for key, p in keys.items():
+            row = done.get(key)
+            if row is not None:
+                try:
+                    if (row.size, row.mtime_ns) == _fingerprint(p):
+                        continue
+                except OSError:
+                    pass
+            out.append(p)
+    return out
+
+def stage_counts(session) -> Dict[str, int]:
+    from sqlalchemy import func
+    return {stage: n for stage, n in session.query(IngestFile.stage, func.count()).group_by(IngestFile.stage)}
+
+def failed_files(session, limit: Optional[int] = None) -> List[IngestFile]:
+    q = session.query(IngestFile).filter(IngestFile.stage == "failed").order_by(IngestFile.updated_at.desc())
+    return q.limit(limit).all() if limit else q.all()
+
+def quarantined_files(session, limit: Optional[int] = None) -> List[IngestFile]:
+    q = session.query(IngestFile).filter(IngestFile.stage == "quarantined").order_by(IngestFile.updated_at.desc())
+    return q.limit(limit).all() if limit else q.all()
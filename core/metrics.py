@@ -0,0 +1,306 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from pathlib import Path
+import bisect
+import math
+import os
+import re
+import sys
+import threading
+import time
+
+from .config import project_root
+from . import profiling
+
+# In-process pipeline metrics: per-stage latency histograms, error counters by exception type,
+# LLM token usage and ingest outcomes. Stages: extract, llm, validate, normalize, store.
+# export() writes the registry in the Prometheus text exposition format to
+# METRICS_DIR/<job>.prom (atomic replace), which node_exporter's textfile collector can scrape;
+# the Metrics page reads the same files, so CLI ingest runs and the app show up side by side.
+# Counters are per process and restart from zero with it, as Prometheus expects.
+
+ENABLED = os.getenv("METRICS", "1") != "0"
+DEFAULT_DIR = os.getenv("METRICS_DIR", "data/metrics")
+EXPORT_INTERVAL_S = float(os.getenv("METRICS_EXPORT_INTERVAL_S", "15"))
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_SECONDS = "talent_stage_duration_seconds"
+STAGE_ERRORS = "talent_stage_errors_total"
+LLM_TOKENS = "talent_llm_tokens_total"
+LLM_RETRIES = "talent_llm_retries_total"
+INGEST_FILES = "talent_ingest_files_total"
+EXTRACT_FALLBACK = "talent_extract_fallback_pages_total"
+WORKER_EVENTS = "talent_worker_events_total"
+
+_HELP = {
+    STAGE_SECONDS: ("histogram", "Wall time per pipeline stage call"),
+    STAGE_ERRORS: ("counter", "Exceptions raised by a pipeline stage, by exception type"),
+    LLM_TOKENS: ("counter", "LLM tokens reported in the provider response usage"),
+    LLM_RETRIES: ("counter", "LLM requests retried, by reason"),
+    INGEST_FILES: ("counter", "Files finished by ingest, by final status"),
+    EXTRACT_FALLBACK: ("counter", "PDF pages re-read with pdfplumber after the fast backend, by reason"),
+    WORKER_EVENTS: ("counter", "Supervised worker kills (timeout/memory/crash) and recycles, by pool"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Bucket-interpolated quantile (what histogram_quantile() would report).
+        """
+        return quantile_from_buckets(list(self.buckets) + [math.inf], self.counts, q)
+
+def quantile_from_buckets(bounds: List[float], counts: List[int], q: float) -> Optional[float]:
+    """
+    bounds: upper bucket bounds ending in +Inf; counts: per-bucket (not cumulative) counts.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, (upper, n) in enumerate(zip(bounds, counts)):
+        if n and seen + n >= rank:
+            lower = bounds[i - 1] if i else 0.0
+            if math.isinf(upper):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / n
+        seen += n
+    return bounds[-2] if len(bounds) > 1 else None
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram()
+            h.observe(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(set(self.counters) | set(self.histograms)):
+                kind, help_text = _HELP.get(name, ("histogram" if name in self.histograms else "counter", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self.counters.get(name, {}).items()):
+                    lines.append(f"{name}{_fmt_labels(key)} {_fmt_value(value)}")
+                for key, h in sorted(self.histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for upper, n in zip(list(h.buckets) + [math.inf], h.counts):
+                        cumulative += n
+                        le = "+Inf" if math.isinf(upper) else _fmt_value(upper)
+                        lines.append(f"{name}_bucket{_fmt_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_fmt_labels(key)} {_fmt_value(h.sum)}")
+                    lines.append(f"{name}_count{_fmt_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+def _fmt_value(v: float) -> str:
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+REGISTRY = Registry()
+
+# ---- instrumentation hooks ----
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a pipeline stage; exceptions are counted by type and re-raised. Also usable as a decorator.
+    While a profiling run is active the stage is cProfiled too (see core/profiling.py).
+    """
+    t0 = time.perf_counter()
+    with profiling.stage(name):
+        try:
+            yield
+        except Exception as e:
+            if ENABLED:
+                REGISTRY.inc(STAGE_ERRORS, stage=name, error=type(e).__name__)
+            raise
+        finally:
+            if ENABLED:
+                REGISTRY.observe(STAGE_SECONDS, time.perf_counter() - t0, stage=name)
+
+def observe_stage(name: str, seconds: float) -> None:
+    """
+    Record a stage timed elsewhere (e.g. extraction inside a worker process).
+    """
+    if ENABLED:
+        REGISTRY.observe(STAGE_SECONDS, seconds, stage=name)
+
+def stage_error(name: str, error: BaseException) -> None:
+    if ENABLED:
+        REGISTRY.inc(STAGE_ERRORS, stage=name, error=type(error).__name__)
+
+def record_llm_usage(provider: str, model: str, usage: Optional[Dict[str, Any]]) -> None:
+    """
+    Token counts from an OpenAI-style `usage` object (prompt_tokens / completion_tokens).
+    """
+    if not (ENABLED and usage):
+        return
+    for kind in ("prompt", "completion"):
+        n = usage.get(f"{kind}_tokens")
+        if n:
+            REGISTRY.inc(LLM_TOKENS, n, provider=provider, model=model, kind=kind)
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    if cached:
+        REGISTRY.inc(LLM_TOKENS, cached, provider=provider, model=model, kind="cached_prompt")
+
+def record_llm_retry(provider: str, reason: Any) -> None:
+    if ENABLED:
+        REGISTRY.inc(LLM_RETRIES, provider=provider, reason=reason)
+
+def record_ingest_result(status: str) -> None:
+    if ENABLED:
+        REGISTRY.inc(INGEST_FILES, status=status)
+
+def record_extract_fallback(reason: str, pages: int = 1) -> None:
+    if ENABLED:
+        REGISTRY.inc(EXTRACT_FALLBACK, pages, reason=reason)
+
+def record_worker_event(pool: str, event: str) -> None:
+    if ENABLED:
+        REGISTRY.inc(WORKER_EVENTS, pool=pool, event=event)
+
+# ---- textfile export ----
+def metrics_dir(directory: Optional[str] = None) -> Path:
+    p = Path(directory or DEFAULT_DIR)
+    return p if p.is_absolute() else project_root() / p
+
+def _default_job() -> str:
+    job = os.getenv("METRICS_JOB") or Path(sys.argv[0] if sys.argv and sys.argv[0] else "python").stem
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", job) or "python"
+
+_last_export = 0.0
+
+def export(job: Optional[str] = None, directory: Optional[str] = None, min_interval_s: float = 0.0) -> Optional[Path]:
+    """
+    Write the registry to METRICS_DIR/<job>.prom. With min_interval_s, skip if the last export
+    was more recent (cheap enough to call once per ingested file).
+    """
+    global _last_export
+    if not ENABLED:
+        return None
+    now = time.monotonic()
+    if min_interval_s and now - _last_export < min_interval_s:
+        return None
+    _last_export = now
+    out = metrics_dir(directory) / f"{job or _default_job()}.prom"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(f".prom.{os.getpid()}.tmp")
+    tmp.write_text(REGISTRY.render(), encoding="utf-8")
+    os.replace(tmp, out)
+    return out
+
+# ---- reading textfiles back (Metrics page) ----
+_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)')
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+def parse_textfile(text: str) -> List[Dict[str, Any]]:
+    """
+    [{"name", "labels": {...}, "value"}] for every sample line.
+    """
+    out = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        m = _SAMPLE_RE.match(line)
+        if not m:
+            continue
+        labels = {k: v.replace('\\"', '"').replace("\\n", "\n").replace("\\\\", "\\") for k, v in _LABEL_RE.findall(m.group(2) or "")}
+        out.append({"name": m.group(1), "labels": labels, "value": float(m.group(3))})
+    return out
+
+def read_textfiles(directory: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    {job: samples} for every *.prom file in METRICS_DIR.
+    """
+    d = metrics_dir(directory)
+    if not d.exists():
+        return {}
+    return {p.stem: parse_textfile(p.read_text(encoding="utf-8")) for p in sorted(d.glob("*.prom"))}
+
+def stage_summary(samples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Per-stage {stage, calls, total_s, mean_ms, p50_ms, p95_ms, p99_ms, errors} from parsed samples.
+    """
+    buckets: Dict[str, List[Tuple[float, float]]] = {}
+    totals: Dict[str, Dict[str, float]] = {}
+    errors: Dict[str, float] = {}
+    for s in samples:
+        st = s["labels"].get("stage")
+        if st is None:
+            continue
+        if s["name"] == STAGE_SECONDS + "_bucket":
+            le = s["labels"]["le"]
+            buckets.setdefault(st, []).append((math.inf if le == "+Inf" else float(le), s["value"]))
+        elif s["name"] == STAGE_SECONDS + "_sum":
+            totals.setdefault(st, {})["sum"] = s["value"]
+        elif s["name"] == STAGE_SECONDS + "_count":
+            totals.setdefault(st, {})["count"] = s["value"]
+        elif s["name"] == STAGE_ERRORS:
+            errors[st] = errors.get(st, 0.0) + s["value"]
+    rows = []
+    for st in sorted(set(totals) | set(errors)):
+        t = totals.get(st, {})
+        calls = int(t.get("count", 0))
+        cum = sorted(buckets.get(st, []))
+        bounds = [b for b, _ in cum]
+        counts = [int(c - (cum[i - 1][1] if i else 0)) for i, (_, c) in enumerate(cum)]
+
+        def q(p: float) -> Optional[float]:
+            v = quantile_from_buckets(bounds, counts, p)
+            return round(v * 1000, 2) if v is not None else None
+
+        rows.append({
+            "stage": st, "calls": calls, "total_s": round(t.get("sum", 0.0), 3),
+            "mean_ms": round(t["sum"] / calls * 1000, 2) if calls else None,
+            "p50_ms": q(0.5), "p95_ms": q(0.95), "p99_ms": q(0.99), "errors": int(errors.get(st, 0)),
+        })
+    return rows
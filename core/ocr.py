@@ -0,0 +1,143 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+from functools import lru_cache
+from pathlib import Path
+import atexit
+import hashlib
+import importlib.util
+import os
+import shutil
+import threading
+import time
+
+from .config import project_root
+from . import metrics
+from .workers import SupervisedPool
+
+# OCR for scanned PDF pages. Only pages whose text layer is (nearly) empty are OCR'd: each is
+# rendered with pypdfium2 (already installed with pdfplumber) and passed to Tesseract via
+# pytesseract, both optional (pip install pytesseract + the tesseract binary). Without them,
+# pages are left as extracted.
+#
+# Results are cached on disk under OCR_CACHE_DIR, keyed by the SHA-256 of the rendered page
+# pixels plus the OCR language, so an identical page (re-saved PDF, shared cover sheet) is
+# only recognised once. Pages are spread over a process pool: ingest uses its extraction pool,
+# in-process callers (the Upload page) a lazily created pool of OCR_WORKERS processes. Both are
+# supervised (core/workers.py), so a page that hangs the renderer times out like any extraction.
+
+ENABLED = os.getenv("OCR", "1") != "0"
+MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "25"))
+MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+DPI = int(os.getenv("OCR_DPI", "300"))
+LANG = os.getenv("OCR_LANG", "eng")
+WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+CACHE_DIR = os.getenv("OCR_CACHE_DIR", "data/ocr_cache")
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "")
+MAX_SIDE_PX = 4000
+
+@lru_cache(maxsize=1)
+def available() -> bool:
+    """
+    pytesseract importable and a tesseract binary on PATH (or TESSERACT_CMD).
+    """
+    if importlib.util.find_spec("pytesseract") is None:
+        return False
+    return bool(shutil.which(TESSERACT_CMD or "tesseract"))
+
+def pages_needing_ocr(pages: List[str]) -> List[int]:
+    """
+    Indexes of pages without a usable text layer (first MAX_PAGES of them); [] when OCR is off.
+    """
+    if not (ENABLED and available()):
+        return []
+    todo = [i for i, t in enumerate(pages) if len((t or "").strip()) < MIN_PAGE_CHARS]
+    return todo[:MAX_PAGES] if MAX_PAGES else todo
+
+def _cache_path(key: str) -> Path:
+    base = Path(CACHE_DIR)
+    base = base if base.is_absolute() else project_root() / base
+    return base / key[:2] / f"{key}.txt"
+
+def _render(path: str, index: int, dpi: int):
+    import pypdfium2 as pdfium
+    from .extract import PDFIUM_LOCK   # pdfium is not thread-safe; shared with the text backend
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            page = pdf[index]
+            try:
+                # Oversized pages (posters, 72-dpi image PDFs) are capped; text stays legible well below this.
+                scale = min(dpi / 72, MAX_SIDE_PX / max(page.get_size()))
+                return page.render(scale=scale, grayscale=True).to_pil()
+            finally:
+                page.close()
+        finally:
+            pdf.close()
+
+def ocr_page(path: str, index: int, dpi: int = DPI, lang: str = LANG) -> Dict[str, object]:
+    """
+    Render and OCR one PDF page; runs in a worker process, so it stays a picklable top-level
+    function. Returns {"index", "text", "cached", "seconds"}.
+    """
+    t0 = time.perf_counter()
+    image = _render(path, index, dpi)
+    digest = hashlib.sha256(f"{image.mode}{image.size}".encode("ascii"))
+    digest.update(image.tobytes())
+    cache = _cache_path(f"{digest.hexdigest()}-{lang}")
+    try:
+        text = cache.read_text(encoding="utf-8")
+        return {"index": index, "text": text, "cached": True, "seconds": time.perf_counter() - t0}
+    except FileNotFoundError:
+        pass
+
+    import pytesseract
+    if TESSERACT_CMD:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    text = (pytesseract.image_to_string(image, lang=lang) or "").strip()
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, cache)
+    return {"index": index, "text": text, "cached": False, "seconds": time.perf_counter() - t0}
+
+def record_page(result: Dict[str, object]) -> None:
+    """
+    Metrics for one ocr_page result (call in the process that exports metrics).
+    """
+    metrics.observe_stage("ocr_cached" if result["cached"] else "ocr", float(result["seconds"]))
+
+_POOL: Optional[SupervisedPool] = None
+_POOL_LOCK = threading.Lock()
+
+def _pool() -> SupervisedPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SupervisedPool(WORKERS, name="ocr")
+            atexit.register(_POOL.shutdown, wait=False, cancel_futures=True)
+        return _POOL
+
+def fill_pages(path: str, pages: List[str]) -> List[str]:
+    """
+    Return `pages` with text-less pages replaced by their OCR text (in-process callers).
+    Several pages go to the OCR process pool; a single page is done inline.
+    """
+    todo = pages_needing_ocr(pages)
+    if not todo:
+        return pages
+    out = list(pages)
+    if len(todo) == 1 or WORKERS <= 1:
+        calls = [lambda i=i: ocr_page(path, i) for i in todo]
+    else:
+        calls = [_pool().submit(ocr_page, path, i).result for i in todo]
+    for call in calls:
+        try:
+            r = call()
+        except Exception as e:
+            # A page that fails OCR keeps its (empty) text layer; the document still goes through.
+            metrics.stage_error("ocr", e)
+            continue
+        record_page(r)
+        if r["text"]:
+            out[r["index"]] = r["text"]
+    return out
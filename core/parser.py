@@ -1,11 +1,15 @@
 from __future__ import annotations
-from typing import Dict, Any, Tuple, List
-import uuid
+from typing import Dict, Any, Optional, Tuple, List
 import datetime as dt
+from pathlib import Path
 
-from .extract import extract_resume_text, needs_ocr
+from .extract import extract_resume_text, extract_resume_text_supervised
 from .schema import ParsedResume, json_schema
 from .llm_factory import get_provider
+from .cache import file_sha256, resume_id_for_hash, get_cached_parse, put_cached_parse
+from .text_store import get_text, put_text
+from .db import CandidateRecord
+from . import dedupe, metrics, profiling, workers
 from .normalize import normalize_market, normalize_approach, normalize_sector_list, normalize_asset_class_list, clamp_years_exp
 
 def build_search_blob(parsed: Dict[str, Any], resume_text: str) -> str:
@@ -34,6 +38,7 @@ def build_search_blob(parsed: Dict[str, Any], resume_text: str) -> str:
     blob = blob.lower()
     return blob
 
+@metrics.stage("normalize")
 def normalize_for_db(parsed: ParsedResume, resume_text: str, source_filename: str) -> Dict[str, Any]:
     p = parsed.model_dump()
 
@@ -90,23 +95,78 @@ def normalize_for_db(parsed: ParsedResume, resume_text: str, source_filename: st
     }
     return rec
 
-def parse_file_to_record(path: str) -> Tuple[ParsedResume, str, str]:
-    resume_text = extract_resume_text(path)
-    # OCR not implemented here (placeholder)
-    if needs_ocr(resume_text):
-        # keep text as-is; in production call OCR here
-        pass
-
-    rid = str(uuid.uuid4())
-    provider = get_provider()
-    parsed_dict = provider.parse_resume(resume_id=rid, resume_text=resume_text, schema=json_schema())
-
+def finalize_parsed(parsed_dict: Dict[str, Any], file_hash: str | None = None) -> ParsedResume:
     # Validate schema
     parsed = ParsedResume.model_validate(parsed_dict)
 
     # Ensure metadata exists
     md = parsed.metadata or {}
     md.setdefault("parsed_at", dt.datetime.utcnow().isoformat()+"Z")
+    if file_hash:
+        md.setdefault("file_sha256", file_hash)
     parsed.metadata = md
 
+    return parsed
+
+def parse_text_to_record(resume_text: str, rid: str, provider=None, file_hash: str | None = None) -> ParsedResume:
+    """
+    LLM stage only: turn already-extracted text into a validated ParsedResume.
+    """
+    provider = provider or get_provider()
+    with metrics.stage("llm"):
+        parsed_dict = provider.parse_resume(resume_id=rid, resume_text=resume_text, schema=json_schema())
+    with metrics.stage("validate"):
+        return finalize_parsed(parsed_dict, file_hash)
+
+async def aparse_text_to_record(resume_text: str, rid: str, provider, file_hash: str | None = None) -> ParsedResume:
+    """
+    Same as parse_text_to_record for providers exposing `aparse_resume`.
+    """
+    with metrics.stage("llm"):
+        parsed_dict = await provider.aparse_resume(resume_id=rid, resume_text=resume_text, schema=json_schema())
+    with metrics.stage("validate"):
+        return finalize_parsed(parsed_dict, file_hash)
+
+def parse_file_to_record(path: str, session=None, provider=None) -> Tuple[Optional[ParsedResume], str, str]:
+    """
+    resume_id is derived from the file bytes, so the same file always maps to the same row.
+    With a session, parses are cached per (file, provider, model, schema version) and a
+    cache hit skips both extraction and the LLM call; extracted text is kept in the text
+    store, so a cache miss (new provider/schema) still skips extraction.
+    A near-exact copy of a stored resume (see core/dedupe.py) returns (None, text, existing
+    resume_id): the caller should report it as a duplicate and not upsert anything.
+    """
+    with profiling.track_file(path):
+        return _parse_file(path, session, provider)
+
+def _parse_file(path: str, session, provider) -> Tuple[Optional[ParsedResume], str, str]:
+    provider = provider or get_provider()
+    file_hash = file_sha256(path)
+    rid = resume_id_for_hash(file_hash)
+
+    if session is not None:
+        hit = get_cached_parse(session, file_hash, provider)
+        if hit:
+            return hit
+
+    resume_text = get_text(session, file_hash) if session is not None else None
+    if resume_text is None:
+        # Scanned pages are OCR'd inside extraction (core/ocr.py), page by page. Extraction runs in
+        # a supervised worker so a malformed file times out instead of hanging the app (core/workers.py).
+        with metrics.stage("extract"):
+            resume_text = extract_resume_text_supervised(path) if workers.SUPERVISED else extract_resume_text(path)
+        if session is not None:
+            put_text(session, file_hash, resume_text)
+
+    if session is not None and dedupe.ENABLED:
+        dup = dedupe.index_signature(session, file_hash, rid, dedupe.minhash(resume_text), Path(path).name)
+        session.commit()
+        if dup["skip_llm"] and session.get(CandidateRecord, dup["duplicate_of"]) is not None:
+            # Near-exact copy of a stored resume: no LLM call, and the stored row is left as it is.
+            return None, resume_text, dup["duplicate_of"]
+
+    parsed = parse_text_to_record(resume_text, rid, provider=provider, file_hash=file_hash)
+    if session is not None:
+        put_cached_parse(session, file_hash, provider, parsed, resume_text)
+
     return parsed, resume_text, rid
@@ -0,0 +1,408 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import cProfile
+import datetime as dt
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from .config import project_root
+
+# Opt-in profiling for ingest, export and the Streamlit pages. A Profiler run writes to
+# PROFILE_DIR/<label>-<timestamp>-<pid>/:
+#   <stage>.pstats / <stage>.txt  cProfile per pipeline stage (the metrics.stage hooks), merged
+#                                 across calls and across extraction worker processes
+#   stacks.collapsed              wall-clock stack samples of every thread, "thread;[stage];frames count",
+#                                 ready for flamegraph.pl / speedscope
+#   files.jsonl                   one line per input file: seconds, tracemalloc peak, RSS, and the
+#                                 allocation sites that grew most while it was processed
+#   summary.json                  peak RSS (self and worker processes), slowest / hungriest files,
+#                                 top allocation sites for the run
+# Only one cProfile can be enabled at a time, so when stages overlap across threads (concurrent
+# LLM calls) the per-stage profiles cover whichever call got there first; the stack sampler
+# sees every thread regardless. tracemalloc slows allocation-heavy code (pdfminer) several-fold;
+# PROFILE_TRACEMALLOC=0 keeps timings closer to production at the cost of the allocation data.
+
+DEFAULT_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PAGES_ENABLED = os.getenv("PROFILE_PAGES", "0") == "1"
+SAMPLE_INTERVAL_S = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000.0
+TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "1") != "0"
+TRACE_FRAMES = int(os.getenv("PROFILE_TRACE_FRAMES", "1"))
+TOP_N = 25
+
+# Set in the environment while a Profiler runs, so extraction worker processes profile each file.
+_WORKER_ENV = "TALENT_PROFILE_WORKER"
+
+_ACTIVE: Optional["Profiler"] = None
+_CPROFILE_LOCK = threading.Lock()
+_STAGES: Dict[int, List[str]] = {}      # thread ident -> stage stack, read by the sampler
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """
+    Peak resident set size of this process (or of its reaped children); None where unsupported.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return ru.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def active() -> Optional["Profiler"]:
+    return _ACTIVE
+
+def worker_enabled() -> bool:
+    return os.getenv(_WORKER_ENV) == "1"
+
+def _start_cprofile() -> Optional[cProfile.Profile]:
+    if not _CPROFILE_LOCK.acquire(blocking=False):
+        return None
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        # Another profiler (e.g. an outer `python -m cProfile`) owns the hook.
+        _CPROFILE_LOCK.release()
+        return None
+    return prof
+
+def _stop_cprofile(prof: Optional[cProfile.Profile]) -> Optional[dict]:
+    if prof is None:
+        return None
+    prof.disable()
+    _CPROFILE_LOCK.release()
+    prof.create_stats()
+    return prof.stats
+
+class _RawStats:
+    """
+    pstats.Stats accepts any object with create_stats()/stats; this wraps a raw stats dict
+    (e.g. one shipped back from a worker process).
+    """
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+@contextmanager
+def _stage_tag(name: str) -> Iterator[None]:
+    stack = _STAGES.setdefault(threading.get_ident(), [])
+    stack.append(name)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    cProfile a pipeline stage and tag stack samples with it; a no-op unless a Profiler is running.
+    """
+    prof = _ACTIVE
+    if prof is None:
+        yield
+        return
+    with _stage_tag(name):
+        cp = _start_cprofile()
+        try:
+            yield
+        finally:
+            raw = _stop_cprofile(cp)
+            if raw:
+                prof.add_stats(name, raw)
+
+def _own_filtered(snapshot):
+    # Leave out the profiler's own bookkeeping (pstats dicts, snapshots).
+    return snapshot.filter_traces([tracemalloc.Filter(False, pattern) for pattern in
+                                   ("*cProfile.py", "*pstats.py", "*tracemalloc.py", __file__)])
+
+def _growth(before, n: int) -> List[Dict[str, Any]]:
+    """
+    Source lines whose live allocations grew most since the `before` snapshot.
+    """
+    stats = _own_filtered(tracemalloc.take_snapshot()).compare_to(_own_filtered(before), "lineno")
+    return [{"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "bytes": s.size_diff, "count": s.count_diff}
+            for s in stats[:n] if s.size_diff > 0]
+
+@contextmanager
+def capture_file(path: str, stage_name: str = "extract", with_cprofile: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Measure one input file: wall time, tracemalloc peak, RSS and top allocation growth; with
+    with_cprofile, also the raw cProfile stats under "pstats". Works inside worker processes;
+    the yielded dict is filled in on exit and is picklable.
+    """
+    rec: Dict[str, Any] = {"file": str(path), "stage": stage_name, "pid": os.getpid()}
+    if TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+    before = None
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+    rss0 = current_rss_bytes()
+    cp = _start_cprofile() if with_cprofile else None
+    t0 = time.perf_counter()
+    try:
+        with _stage_tag(stage_name):
+            yield rec
+    except Exception as e:
+        rec["error"] = type(e).__name__
+        raise
+    finally:
+        rec["seconds"] = round(time.perf_counter() - t0, 6)
+        raw = _stop_cprofile(cp)
+        if raw:
+            rec["pstats"] = raw
+        if before is not None and tracemalloc.is_tracing():
+            rec["peak_alloc_bytes"] = tracemalloc.get_traced_memory()[1]
+            rec["top_alloc_growth"] = _growth(before, 5)
+        rss = current_rss_bytes()
+        rec["rss_bytes"] = rss
+        rec["rss_growth_bytes"] = rss - rss0 if rss is not None and rss0 is not None else None
+        rec["peak_rss_bytes"] = peak_rss_bytes()
+
+@contextmanager
+def track_file(path: str, stage_name: str = "file") -> Iterator[None]:
+    """
+    capture_file for in-process work, recorded on the running Profiler (no-op otherwise).
+    Stages inside keep their own cProfiles.
+    """
+    prof = _ACTIVE
+    if prof is None:
+        yield
+        return
+    rec: Dict[str, Any] = {}
+    try:
+        with capture_file(path, stage_name, with_cprofile=False) as rec:
+            yield
+    finally:
+        prof.record_file(rec)
+
+def record_file(rec: Optional[Dict[str, Any]]) -> None:
+    """
+    Hand a capture_file() record (e.g. returned by a worker process) to the running Profiler.
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.record_file(rec)
+
+class Profiler:
+    def __init__(self, label: str = "run", out_dir: Optional[str] = None, interval_s: float = SAMPLE_INTERVAL_S,
+                 trace_malloc: bool = TRACEMALLOC, whole_run: Optional[str] = None):
+        base = Path(out_dir or DEFAULT_DIR)
+        base = base if base.is_absolute() else project_root() / base
+        now = dt.datetime.now()
+        self.out = base / f"{label}-{now:%Y%m%d-%H%M%S}-{now.microsecond // 1000:03d}-{os.getpid()}"
+        self.label = label
+        self.interval_s = interval_s
+        self.trace_malloc = trace_malloc
+        self.stage_stats: Dict[str, pstats.Stats] = {}
+        self.stacks: Counter = Counter()
+        self.files: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._baseline = None
+        self._owns_tracing = False
+        self._prev_worker_env: Optional[str] = None
+        # Stage name under which the starting thread is cProfiled for the whole run (pages).
+        self.whole_run = whole_run
+        self._run_cprofile: Optional[cProfile.Profile] = None
+        self.thread: Optional[int] = None
+        self.started = 0.0
+
+    # ---- lifecycle ----
+    def start(self) -> "Profiler":
+        global _ACTIVE
+        self.started = time.perf_counter()
+        self.thread = threading.get_ident()
+        if self.trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._owns_tracing = True
+        self._baseline = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        self._prev_worker_env = os.environ.get(_WORKER_ENV)
+        os.environ[_WORKER_ENV] = "1"
+        _ACTIVE = self
+        self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+        self._sampler.start()
+        if self.whole_run:
+            self._run_cprofile = _start_cprofile()
+        return self
+
+    def stop(self) -> Path:
+        """
+        Stop sampling and write the report; returns the output directory.
+        """
+        global _ACTIVE
+        if self._stop.is_set():
+            return self.out
+        raw = _stop_cprofile(self._run_cprofile)
+        self._run_cprofile = None
+        if raw:
+            self.add_stats(self.whole_run, raw)
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if _ACTIVE is self:
+            _ACTIVE = None
+        if self._prev_worker_env is None:
+            os.environ.pop(_WORKER_ENV, None)
+        else:
+            os.environ[_WORKER_ENV] = self._prev_worker_env
+        top_allocs = self._top_allocations()
+        if self._owns_tracing:
+            tracemalloc.stop()
+        self._write(top_allocs)
+        return self.out
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---- collection ----
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        labels: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                    frames.append(label)
+                    frame = frame.f_back
+                stages = _STAGES.get(ident)
+                head = [names.get(ident, str(ident)), f"[{stages[-1] if stages else '-'}]"]
+                self.stacks[";".join(head + frames[::-1])] += 1
+
+    def add_stats(self, name: str, raw: dict) -> None:
+        with self._lock:
+            st = self.stage_stats.get(name)
+            if st is None:
+                self.stage_stats[name] = pstats.Stats(_RawStats(raw))
+            else:
+                st.add(_RawStats(raw))
+
+    def record_file(self, rec: Optional[Dict[str, Any]]) -> None:
+        """
+        Keep a capture_file() record; its cProfile stats are merged into that stage's profile.
+        """
+        if not rec:
+            return
+        rec = dict(rec)
+        raw = rec.pop("pstats", None)
+        if raw:
+            self.add_stats(rec.get("stage") or "file", raw)
+        with self._lock:
+            self.files.append(rec)
+
+    def _top_allocations(self) -> List[Dict[str, Any]]:
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return []
+        return _growth(self._baseline, TOP_N)
+
+    # ---- report ----
+    def _write(self, top_allocs: List[Dict[str, Any]]) -> None:
+        self.out.mkdir(parents=True, exist_ok=True)
+        for name, st in self.stage_stats.items():
+            safe = name.replace("/", "_").replace(".", "_")
+            st.dump_stats(str(self.out / f"{safe}.pstats"))
+            buf = io.StringIO()
+            st.stream = buf
+            st.sort_stats("cumulative").print_stats(40)
+            (self.out / f"{safe}.txt").write_text(buf.getvalue(), encoding="utf-8")
+        with open(self.out / "stacks.collapsed", "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        with open(self.out / "files.jsonl", "w", encoding="utf-8") as f:
+            for rec in self.files:
+                f.write(json.dumps(rec) + "\n")
+
+        def top(key: str) -> List[Dict[str, Any]]:
+            ranked = sorted((r for r in self.files if r.get(key) is not None), key=lambda r: -r[key])
+            return [{"file": r["file"], "stage": r.get("stage"), key: r[key]} for r in ranked[:TOP_N]]
+
+        summary = {
+            "label": self.label,
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "peak_rss_children_bytes": peak_rss_bytes(children=True),
+            "stages": sorted(self.stage_stats),
+            "stack_samples": sum(self.stacks.values()),
+            "files": len(self.files),
+            "slowest_files": top("seconds"),
+            "peak_alloc_files": top("peak_alloc_bytes"),
+            "rss_growth_files": top("rss_growth_bytes"),
+            "top_alloc_growth": top_allocs,
+        }
+        (self.out / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+@contextmanager
+def profile(label: str = "run", enabled: bool = True, **kwargs) -> Iterator[Optional[Profiler]]:
+    """
+    `with profile("ingest", enabled=args.profile) as prof:`; prints where the report went.
+    """
+    if not enabled:
+        yield None
+        return
+    prof = Profiler(label, **kwargs).start()
+    try:
+        yield prof
+    finally:
+        out = prof.stop()
+        print(f"Profile written to {out}")
+
+class _PageProfile:
+    def __init__(self, prof: Optional[Profiler]):
+        self.prof = prof
+
+    def finish(self) -> Optional[Path]:
+        if self.prof is None:
+            return None
+        prof, self.prof = self.prof, None
+        return prof.stop()
+
+    def __enter__(self) -> "_PageProfile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.finish()
+
+def page_profile(name: str) -> _PageProfile:
+    """
+    Profile one Streamlit script run when PROFILE_PAGES=1: `with page_profile("search"):` around
+    the page body, so the profile stops however the run ends (st.stop, rerun, exception).
+    The whole run is one cProfile ("page"), so stages inside it are tagged in the stack samples
+    but not split out. Runs that overlap another session's profile are skipped.
+    """
+    if not PAGES_ENABLED:
+        return _PageProfile(None)
+    prof = _ACTIVE
+    if prof is not None:
+        alive = {t.ident for t in threading.enumerate()}
+        if not (prof.label.startswith("page-") and (prof.thread == threading.get_ident() or prof.thread not in alive)):
+            return _PageProfile(None)
+        # A page run that was never finished (its script thread is gone): close it out.
+        prof.stop()
+    return _PageProfile(Profiler(f"page-{name}", whole_run="page").start())
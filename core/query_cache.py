@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from collections import OrderedDict
+import os
+import threading
+
+from .db import count_candidates, data_generation, facet_values, get_candidate_rows, load_cube, search_candidates
+
+# Process-wide LRU of query results for the Streamlit pages. Entries are keyed on the normalized
+# filter tuple and tagged with the data generation (max candidate_changes seq, bumped by every
+# upsert), so a repeat search is served from memory until ingest writes something new.
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_SIZE", "256"))
+
+class QueryCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: Dict[str, "OrderedDict[Hashable, Any]"] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, session, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Cached compute() for `key` at the database's current generation.
+        """
+        url = str(session.get_bind().url)
+        gen = data_generation(session)
+        with self._lock:
+            if self._generations.get(url) != gen:
+                # New data landed: every entry for this database is stale.
+                self._entries[url] = OrderedDict()
+                self._generations[url] = gen
+            entries = self._entries[url]
+            if key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key]
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            if self._generations.get(url) == gen:
+                entries = self._entries[url]
+                entries[key] = value
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+_CACHE = QueryCache()
+
+def normalize_filters(filters: Dict[str, Any]) -> tuple:
+    """
+    Order-insensitive, hashable form of query_candidates kwargs; empty filters are dropped.
+    """
+    out = []
+    for k in sorted(filters):
+        v = filters[k]
+        if v is None or v == [] or v == "":
+            continue
+        if isinstance(v, (list, tuple, set)):
+            v = tuple(sorted(set(v)))
+        elif k == "keyword":
+            v = " ".join(str(v).lower().split())
+            if not v:
+                continue
+        elif isinstance(v, int) and not isinstance(v, bool):
+            v = float(v)
+        out.append((k, v))
+    return tuple(out)
+
+def cached_search_page(session, page_size: int = 50, cursor: Optional[tuple] = None, **filters) -> Dict[str, Any]:
+    """
+    db.search_candidates page (list-view columns only), cached. Callers must not mutate it.
+    Without a keyword the facet index picks the page's resume_ids and only those rows are read.
+    """
+    def compute() -> Dict[str, Any]:
+        if (filters.get("keyword") or "").strip():
+            return search_candidates(session, page_size=page_size, cursor=cursor, **filters)
+        from .facet_index import get_facet_index
+        ids, next_cursor = get_facet_index(session).page(page_size, cursor, **{k: v for k, v in filters.items() if k != "keyword"})
+        return {"rows": get_candidate_rows(session, ids), "next_cursor": next_cursor, "total": None}
+
+    key = ("page", page_size, cursor, normalize_filters(filters))
+    return _CACHE.get_or_compute(session, key, compute)
+
+def cached_count(session, **filters) -> int:
+    """
+    Total matches. Without a keyword the in-memory facet index counts the bitset; otherwise SQL.
+    """
+    def compute() -> int:
+        if (filters.get("keyword") or "").strip():
+            return count_candidates(session, **filters)
+        from .facet_index import get_facet_index
+        return get_facet_index(session).count(**{k: v for k, v in filters.items() if k != "keyword"})
+
+    return _CACHE.get_or_compute(session, ("count", normalize_filters(filters)), compute)
+
+def cached_facet_values(session, facet: str) -> List[str]:
+    return _CACHE.get_or_compute(session, ("facet_values", facet), lambda: facet_values(session, facet))
+
+def cached_cube(session) -> List[Dict[str, Any]]:
+    return _CACHE.get_or_compute(session, ("insights_cube",), lambda: load_cube(session))
+
+def query_cache() -> QueryCache:
+    return _CACHE
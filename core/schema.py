@@ -1,5 +1,8 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
+from functools import lru_cache
+import hashlib
+import json
 from pydantic import BaseModel, Field
 
 class Location(BaseModel):
@@ -60,8 +63,49 @@ class ParsedResume(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     evidence: Dict[str, Any] = Field(default_factory=dict)
 
+@lru_cache(maxsize=1)
 def json_schema() -> Dict[str, Any]:
     """
     Returns a JSON schema that LLM providers can use for constrained output.
+    Built once per process; treat the returned dict as read-only.
     """
     return ParsedResume.model_json_schema()
+
+@lru_cache(maxsize=1)
+def schema_version() -> str:
+    """
+    Short digest of the JSON schema; changes whenever the models above change.
+    """
+    raw = json.dumps(json_schema(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+def _ts_type(node: Dict[str, Any], defs: Dict[str, Any], indent: str) -> str:
+    if "$ref" in node:
+        return _ts_type(defs[node["$ref"].split("/")[-1]], defs, indent)
+    if "anyOf" in node:
+        return "|".join(dict.fromkeys(_ts_type(n, defs, indent) for n in node["anyOf"]))
+    t = node.get("type")
+    if t == "array":
+        inner = _ts_type(node.get("items", {}), defs, indent)
+        return f"({inner})[]" if "|" in inner else f"{inner}[]"
+    if t == "object" and node.get("properties"):
+        pad = indent + "  "
+        fields = [f"{pad}{k}: {_ts_type(v, defs, pad)};" for k, v in node["properties"].items()]
+        return "{\n" + "\n".join(fields) + f"\n{indent}}}"
+    if t == "object":
+        return "object"
+    return {"string": "string", "integer": "number", "number": "number", "boolean": "boolean", "null": "null"}.get(t, "any")
+
+def schema_outline(schema: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Compact TypeScript-style outline of a JSON schema, a fraction of the tokens of the raw schema.
+    The outline for the ParsedResume schema is compiled once per schema version.
+    """
+    if schema is None or schema is json_schema():
+        return _resume_outline(schema_version())
+    return _ts_type(schema, schema.get("$defs", {}), "")
+
+@lru_cache(maxsize=4)
+def _resume_outline(version: str) -> str:
+    schema = json_schema()
+    return _ts_type(schema, schema.get("$defs", {}), "")
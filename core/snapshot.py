@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import importlib.util
+import json
+import os
+
+from .config import project_root
+from .db import CandidateRecord, changed_since, data_generation, iter_candidate_rows, _chunks
+
+# Columnar snapshot of `candidates` for analytics: an uncompressed Arrow IPC (Feather v2) file
+# with the *_json columns stored as native list<string>. Readers memory-map it, so every
+# Streamlit process and notebook shares one page-cached copy. After ingest, sync_snapshot
+# reuses the mapped file for unchanged rows and only reads candidates changed since the
+# snapshot's generation. The new file is written beside the old one and swapped in with
+# os.replace, so open readers keep a consistent copy.
+
+DEFAULT_PATH = os.getenv("SNAPSHOT_PATH", "data/snapshot/candidates.arrow")
+ENABLED = os.getenv("SNAPSHOT", "1") != "0"
+
+SCALAR_COLUMNS = ["resume_id", "full_name", "email", "phone", "geo_market", "country", "approach",
+                  "degree_level", "years_experience", "source_filename"]
+LIST_COLUMNS = {
+    "sectors": "sectors_json", "roles": "roles_json", "asset_classes": "asset_classes_json",
+    "skills_programming": "skills_programming_json", "skills_data": "skills_data_json",
+    "skills_ml": "skills_ml_json", "skills_finance": "skills_finance_json", "skills_tools": "skills_tools_json",
+}
+SOURCE_COLUMNS = SCALAR_COLUMNS + list(LIST_COLUMNS.values())
+
+def available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+def arrow_schema():
+    import pyarrow as pa
+    fields = [pa.field(c, pa.float64() if c == "years_experience" else pa.string()) for c in SCALAR_COLUMNS]
+    fields += [pa.field(name, pa.list_(pa.string())) for name in LIST_COLUMNS]
+    return pa.schema(fields)
+
+def to_records(rows: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    SOURCE_COLUMNS tuples -> dicts matching arrow_schema (list columns decoded once, here).
+    """
+    n = len(SCALAR_COLUMNS)
+    out = []
+    for r in rows:
+        rec = dict(zip(SCALAR_COLUMNS, r[:n]))
+        for name, raw in zip(LIST_COLUMNS, r[n:]):
+            rec[name] = json.loads(raw or "[]")
+        out.append(rec)
+    return out
+
+def _resolve(path: Optional[str]) -> Path:
+    p = Path(path or DEFAULT_PATH)
+    return p if p.is_absolute() else project_root() / p
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(".meta.json")
+
+def _read_meta(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(_meta_path(path).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _write(path: Path, batches, generation: int) -> int:
+    import pyarrow as pa
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".arrow.tmp")
+    n = 0
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, arrow_schema()) as writer:
+        for batch in batches:
+            if batch.num_rows:
+                writer.write(batch)
+                n += batch.num_rows
+    os.replace(tmp, path)
+    meta_tmp = _meta_path(path).with_suffix(".tmp")
+    meta_tmp.write_text(json.dumps({"generation": generation, "rows": n}), encoding="utf-8")
+    os.replace(meta_tmp, _meta_path(path))
+    return n
+
+def _db_batches(session, chunk_size: int, ids: Optional[List[str]] = None):
+    import pyarrow as pa
+    schema = arrow_schema()
+    if ids is None:
+        for chunk in iter_candidate_rows(session, SOURCE_COLUMNS, chunk_size=chunk_size):
+            yield pa.RecordBatch.from_pylist(to_records(chunk), schema=schema)
+        return
+    cols = [getattr(CandidateRecord, c) for c in SOURCE_COLUMNS]
+    for chunk in _chunks(ids, chunk_size):
+        rows = session.query(*cols).filter(CandidateRecord.resume_id.in_(chunk)).all()
+        yield pa.RecordBatch.from_pylist(to_records(rows), schema=schema)
+
+def build_snapshot(session, path: Optional[str] = None, chunk_size: int = 5000) -> int:
+    """
+    Full rewrite from the database; returns the row count.
+    """
+    target = _resolve(path)
+    generation = data_generation(session)
+    return _write(target, _db_batches(session, chunk_size), generation)
+
+def sync_snapshot(session, path: Optional[str] = None, chunk_size: int = 5000) -> int:
+    """
+    Bring the snapshot up to the current data generation; returns how many rows were re-read
+    from the database. Unchanged rows are copied from the mapped file without decoding.
+    """
+    if not (ENABLED and available()):
+        return 0
+    target = _resolve(path)
+    meta = _read_meta(target)
+    if not target.exists() or "generation" not in meta:
+        return build_snapshot(session, path, chunk_size)
+    changes = changed_since(session, meta["generation"])
+    if not changes:
+        return 0
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    ids = list(dict.fromkeys(rid for _seq, rid in changes))
+    changed = pa.array(ids, pa.string())
+
+    def batches():
+        # Stream the old file batch by batch, dropping rows that are about to be re-read.
+        for b in load_snapshot_table(target).to_batches(max_chunksize=chunk_size):
+            yield b.filter(pc.invert(pc.is_in(b.column("resume_id"), value_set=changed)))
+        yield from _db_batches(session, chunk_size, ids)
+
+    _write(target, batches(), changes[-1][0])
+    return len(ids)
+
+def load_snapshot_table(path: Optional[str] = None):
+    """
+    The snapshot as a pyarrow.Table backed by a memory map (zero-copy; pages shared across processes).
+    """
+    import pyarrow as pa
+    source = pa.memory_map(str(_resolve(path)), "r")
+    return pa.ipc.open_file(source).read_all()
+
+def load_snapshot(path: Optional[str] = None):
+    """
+    The snapshot as a pandas DataFrame whose columns stay Arrow-backed (pd.ArrowDtype), so the
+    data is not copied out of the memory map and list columns are not re-decoded.
+    """
+    import pandas as pd
+    return load_snapshot_table(path).to_pandas(types_mapper=pd.ArrowDtype)
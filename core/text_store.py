@@ -0,0 +1,48 @@
+from __future__ import annotations
+from typing import Iterator, Optional, Tuple
+import zlib
+
+from .db import ResumeText
+
+# Extracted-text store: sits between core/extract.py and core/parser.py so the LLM stage can be
+# re-run (new provider, new schema) without re-opening any source file.
+# Text is zlib-compressed and keyed by the SHA-256 of the source file bytes.
+
+def get_text(session, file_hash: str) -> Optional[str]:
+    row = session.get(ResumeText, file_hash)
+    if not row:
+        return None
+    return zlib.decompress(row.text_z).decode("utf-8")
+
+def put_text(session, file_hash: str, text: str, commit: bool = True) -> None:
+    if session.get(ResumeText, file_hash) is None:
+        session.add(ResumeText(file_sha256=file_hash, text_z=zlib.compress(text.encode("utf-8"), 6)))
+        session.flush()
+    if commit:
+        session.commit()
+
+def has_text(session, file_hash: str) -> bool:
+    return session.query(ResumeText.file_sha256).filter(ResumeText.file_sha256 == file_hash).first() is not None
+
+def count_texts(session) -> int:
+    return session.query(ResumeText).count()
+
+def iter_texts(session, chunk_size: int = 500) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (file_sha256, text) for the whole store, in hash order, one chunk in memory at a time.
+    """
+    last = ""
+    while True:
+        # Column tuples, not ORM objects: nothing accumulates in the session's identity map.
+        rows = (
+            session.query(ResumeText.file_sha256, ResumeText.text_z)
+            .filter(ResumeText.file_sha256 > last)
+            .order_by(ResumeText.file_sha256)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return
+        for file_hash, text_z in rows:
+            yield file_hash, zlib.decompress(text_z).decode("utf-8")
+        last = rows[-1][0]
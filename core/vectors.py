@@ -0,0 +1,311 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows: no advisory locks, run a single writer process
+    fcntl = None
+
+from .config import project_root
+from .db import CandidateRecord, changed_since, data_generation, _chunks
+
+# Offline "similar candidates" search. Each candidate's search_blob is embedded as a hashed,
+# signed TF-IDF vector (unigrams + bigrams folded into VECTOR_DIM buckets, sublinear TF,
+# L2-normalised), so no model download or network is needed. Vectors live in a float32
+# memory-mapped matrix under VECTOR_DIR, one row per candidate; top-k is a single
+# matrix-vector product plus argpartition over the mapped rows.
+#
+# Files: vectors.f32 (capacity x dim), ids.txt (row -> resume_id), idf.npy (fitted by a full
+# build; all-ones until then), meta.json (dim, count, generation, ids_bytes). meta.json is replaced last,
+# so readers never see rows that are not written yet.
+#
+# Writers (batch_ingest, the Upload page, build_vectors.py) may be separate processes, so every
+# write holds an flock on write.lock in the index dir and re-reads meta.json under it before
+# appending: two writers never claim the same rows or publish from a stale count.
+
+DEFAULT_DIM = int(os.getenv("VECTOR_DIM", "256"))
+DEFAULT_DIR = os.getenv("VECTOR_DIR", "data/vectors")
+ENABLED = os.getenv("VECTOR_INDEX", "1") != "0"
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*")
+_STOP = frozenset("a an and are as at be by for from in into is it of on or the to with".split())
+
+def tokenize(text: str) -> List[str]:
+    words = [w for w in _TOKEN_RE.findall((text or "").lower()) if w not in _STOP and len(w) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def _bucket(term: str, dim: int) -> Tuple[int, float]:
+    h = zlib.crc32(term.encode("utf-8"))
+    return h % dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+def term_counts(text: str, dim: int) -> Dict[int, float]:
+    """
+    Signed hashed term frequencies: {bucket: sum of +/-1 per occurrence}.
+    """
+    out: Dict[int, float] = {}
+    for t in tokenize(" ".join(w for w in (text or "").split() if "@" not in w)):
+        b, sign = _bucket(t, dim)
+        out[b] = out.get(b, 0.0) + sign
+    return out
+
+def embed(text: str, dim: int = DEFAULT_DIM, idf: Optional[np.ndarray] = None) -> np.ndarray:
+    v = np.zeros(dim, dtype=np.float32)
+    for b, tf in term_counts(text, dim).items():
+        v[b] = np.sign(tf) * (1.0 + np.log(abs(tf))) if tf else 0.0
+    if idf is not None:
+        v *= idf
+    norm = float(np.linalg.norm(v))
+    return v / norm if norm else v
+
+class VectorIndex:
+    """
+    Persisted, memory-mapped embedding matrix keyed by resume_id.
+    """
+    def __init__(self, directory: str = DEFAULT_DIR, dim: int = DEFAULT_DIM):
+        path = Path(directory)
+        self.dir = path if path.is_absolute() else project_root() / path
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._write_depth = 0
+        self._meta_mtime = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.count = 0
+        self.capacity = 0
+        self.generation = 0
+        self.idf: Optional[np.ndarray] = None
+        self._mat: Optional[np.memmap] = None
+
+    # ---- persistence ----
+    @property
+    def _meta_path(self) -> Path:
+        return self.dir / "meta.json"
+
+    def reload_if_changed(self, force: bool = False) -> "VectorIndex":
+        with self._lock:
+            try:
+                mtime = self._meta_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return self
+            if mtime == self._meta_mtime and not force:
+                return self
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            self._reset()
+            self.dim = meta["dim"]
+            self.count = meta["count"]
+            self.generation = meta.get("generation", 0)
+            with open(self.dir / "ids.txt", encoding="utf-8") as f:
+                self.ids = [line.rstrip("\n") for _, line in zip(range(self.count), f)]
+            self.row_of = {rid: i for i, rid in enumerate(self.ids)}
+            idf_path = self.dir / "idf.npy"
+            self.idf = np.load(idf_path) if idf_path.exists() else None
+            self._map()
+            self._meta_mtime = mtime
+            return self
+
+    def _map(self) -> None:
+        path = self.dir / "vectors.f32"
+        size = path.stat().st_size if path.exists() else 0
+        self.capacity = size // (4 * self.dim)
+        self._mat = np.memmap(path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim)) if self.capacity else None
+
+    def _grow(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        cap = max(1024, self.capacity)
+        while cap < rows:
+            cap *= 2
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if self._mat is not None:
+            self._mat.flush()
+        self._mat = None
+        with open(self.dir / "vectors.f32", "ab") as f:
+            f.truncate(cap * self.dim * 4)
+        self._map()
+
+    def _write_meta(self, new_ids: List[str], ids_bytes: int) -> None:
+        self._mat.flush()
+        # Append after the last published id, dropping any tail left by an interrupted commit.
+        path = self.dir / "ids.txt"
+        with open(path, "r+b" if path.exists() else "w+b") as f:
+            f.seek(ids_bytes)
+            f.truncate()
+            f.write("".join(rid + "\n" for rid in new_ids).encode("utf-8"))
+            ids_bytes = f.tell()
+        tmp = self._meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"dim": self.dim, "count": self.count, "generation": self.generation,
+                                   "ids_bytes": ids_bytes}), encoding="utf-8")
+        os.replace(tmp, self._meta_path)
+        self._meta_mtime = self._meta_path.stat().st_mtime_ns
+
+    # ---- writing ----
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Hold the cross-process writer lock (re-entrant within this index) with meta re-read under it.
+        """
+        with self._lock:
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            with open(self.dir / "write.lock", "a+b") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                self._write_depth = 1
+                try:
+                    self.reload_if_changed(force=True)
+                    yield
+                finally:
+                    self._write_depth = 0
+                    # Closing the file releases the flock.
+
+    def add(self, items: Iterable[Tuple[str, str]]) -> int:
+        """
+        Embed and store (resume_id, text) pairs; existing ids are overwritten in place.
+        Published on return, or once at the end when called from sync/build.
+        """
+        with self._writing():
+            outermost = self._write_depth == 1
+            n = 0
+            for rid, text in items:
+                row = self.row_of.get(rid)
+                if row is None:
+                    row = self.count
+                    self._grow(row + 1)
+                    self.ids.append(rid)
+                    self.row_of[rid] = row
+                    self.count += 1
+                self._mat[row] = embed(text, self.dim, self.idf)
+                n += 1
+            if outermost:
+                self.commit()
+            return n
+
+    def commit(self, generation: Optional[int] = None) -> None:
+        with self._writing():
+            if self._mat is None:
+                return
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8")) if self._meta_path.exists() else {}
+            if generation is not None:
+                self.generation = generation
+            self._write_meta(self.ids[meta.get("count", 0):self.count], meta.get("ids_bytes", 0))
+
+    def sync(self, session, chunk_size: int = 500) -> int:
+        """
+        Embed candidates upserted since the last sync (via the candidate_changes log).
+        """
+        with self._writing():
+            changes = changed_since(session, self.generation)
+            if not changes:
+                return 0
+            ids = list(dict.fromkeys(rid for _seq, rid in changes))
+            n = 0
+            for chunk in _chunks(ids, chunk_size):
+                rows = session.query(CandidateRecord.resume_id, CandidateRecord.search_blob).filter(CandidateRecord.resume_id.in_(chunk))
+                n += self.add((rid, blob or "") for rid, blob in rows)
+            self.commit(changes[-1][0])
+            return n
+
+    def build(self, session, chunk_size: int = 1000) -> int:
+        """
+        Full rebuild: fit IDF over every candidate, then re-embed all of them.
+        """
+        with self._writing():
+            generation = data_generation(session)
+            df = np.zeros(self.dim, dtype=np.float64)
+            docs = 0
+            for rows in self._iter_blobs(session, chunk_size):
+                for _rid, blob in rows:
+                    for b in term_counts(blob or "", self.dim):
+                        df[b] += 1
+                    docs += 1
+            self.dir.mkdir(parents=True, exist_ok=True)
+            for name in ("vectors.f32", "ids.txt", "meta.json"):
+                (self.dir / name).unlink(missing_ok=True)
+            self._reset()
+            self._meta_mtime = None
+            self.idf = (np.log((1 + docs) / (1 + df)) + 1.0).astype(np.float32)
+            np.save(self.dir / "idf.npy", self.idf)
+            self._grow(docs)
+            for rows in self._iter_blobs(session, chunk_size):
+                self.add((rid, blob or "") for rid, blob in rows)
+            self.generation = generation
+            if self._mat is not None:
+                self._write_meta(self.ids, 0)
+            return self.count
+
+    @staticmethod
+    def _iter_blobs(session, chunk_size: int):
+        last = ""
+        while True:
+            rows = session.query(CandidateRecord.resume_id, CandidateRecord.search_blob) \
+                .filter(CandidateRecord.resume_id > last).order_by(CandidateRecord.resume_id).limit(chunk_size).all()
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    # ---- searching ----
+    def search(self, query: np.ndarray, k: int = 10, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k (resume_id, cosine similarity), best first.
+        """
+        with self._lock:
+            if self._mat is None or not self.count:
+                return []
+            scores = np.asarray(self._mat[:self.count] @ query)
+            if exclude is not None and exclude in self.row_of:
+                scores[self.row_of[exclude]] = -np.inf
+            k = min(k, self.count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.ids[i], float(scores[i])) for i in top if np.isfinite(scores[i]) and scores[i] > 0]
+
+    def similar_to(self, resume_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        self.reload_if_changed()
+        row = self.row_of.get(resume_id)
+        if row is None:
+            return []
+        return self.search(np.array(self._mat[row]), k=k, exclude=resume_id)
+
+    def search_text(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        self.reload_if_changed()
+        return self.search(embed(text, self.dim, self.idf), k=k)
+
+_INDEXES: Dict[str, VectorIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_vector_index(directory: str = DEFAULT_DIR) -> VectorIndex:
+    """
+    Process-wide reader/writer for `directory`, reloaded when another process publishes rows.
+    """
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(directory)
+        if idx is None:
+            idx = _INDEXES[directory] = VectorIndex(directory)
+    return idx.reload_if_changed()
+
+def sync_vectors(session, directory: str = DEFAULT_DIR) -> int:
+    """
+    Ingest hook: embed newly stored candidates (no-op when VECTOR_INDEX=0).
+    """
+    if not ENABLED:
+        return 0
+    return get_vector_index(directory).sync(session)
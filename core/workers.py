@@ -0,0 +1,278 @@
+from __future__ import annotations
+from typing import Any, Callable, List, Optional
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait as wait_any
+import atexit
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from . import metrics
+
+# Supervised worker processes for extraction. ProcessPoolExecutor cannot stop a single job, so
+# one PDF that hangs pdfplumber/pdfium or balloons memory would hold a worker (and, through
+# backpressure, the whole ingest) forever. SupervisedPool gives each worker its own pipe and a
+# supervisor thread that:
+#   - kills a worker whose job runs past TIMEOUT_S, and fails that job with WorkerError("timeout"),
+#   - polls each busy worker's RSS (Linux /proc) and kills it above MAX_RSS_MB ("memory"),
+#   - fails the job of a worker that dies on its own (segfault, OOM killer: "crash"),
+#   - retires a worker after MAX_TASKS jobs, or when it is over MAX_RSS_MB between jobs, so slow
+#     leaks in the PDF libraries never accumulate.
+# A killed worker is replaced immediately; the other workers keep going. Futures are ordinary
+# concurrent.futures ones, so the pool drops in wherever ingest used the process pool.
+
+TIMEOUT_S = float(os.getenv("EXTRACT_TIMEOUT_S", "120"))
+MAX_RSS_MB = float(os.getenv("EXTRACT_MAX_RSS_MB", "2048"))
+MAX_TASKS = int(os.getenv("EXTRACT_MAX_TASKS_PER_WORKER", "200"))
+SUPERVISED = os.getenv("EXTRACT_SUPERVISED", "1") != "0"
+SHARED_WORKERS = int(os.getenv("EXTRACT_SHARED_WORKERS", "2"))
+POLL_S = 0.25
+
+class WorkerError(RuntimeError):
+    """
+    A supervised job did not finish: reason is "timeout", "memory" or "crash".
+    """
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+def rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _worker_main(conn) -> None:
+    # Ctrl+C goes to the whole process group; the parent decides what to stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        fn, args = msg
+        try:
+            out = (True, fn(*args))
+        except Exception as e:
+            out = (False, e)
+        try:
+            conn.send(out + (rss_bytes(os.getpid()),))
+        except Exception as e:
+            # Result or exception that does not pickle.
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}"), rss_bytes(os.getpid())))
+
+def _default_context():
+    # forkserver: workers fork from a clean single-threaded server that has already imported the
+    # extraction code (PDF libraries included), so (re)starting one is cheap and safe while the
+    # parent runs LLM threads. The preload is explicit: forkserver's own __main__ preload does not
+    # take effect on 3.11. spawn where forkserver is unavailable (Windows).
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload([f"{__package__}.ingest"])
+    return ctx
+
+class _Worker:
+    __slots__ = ("proc", "conn", "fut", "deadline", "started", "tasks")
+
+    def __init__(self, proc, conn):
+        self.proc = proc
+        self.conn = conn
+        self.fut: Optional[Future] = None
+        self.deadline = 0.0
+        self.started = 0.0
+        self.tasks = 0
+
+class SupervisedPool:
+    """
+    Executor-like process pool (submit / shutdown) with per-job timeouts, an RSS cap and worker
+    recycling. Workers start on first use. Jobs must be picklable top-level functions.
+    """
+    def __init__(self, max_workers: int, timeout_s: float = TIMEOUT_S, max_rss_mb: float = MAX_RSS_MB,
+                 max_tasks: int = MAX_TASKS, name: str = "extract", mp_context=None):
+        self._ctx = mp_context or _default_context()
+        self.name = name
+        self.timeout_s = timeout_s
+        self.max_rss = int(max_rss_mb * 1024 * 1024) if max_rss_mb else 0
+        self.max_tasks = max_tasks
+        self._workers: List[Optional[_Worker]] = [None] * max(1, max_workers)
+        self._queue: deque = deque()      # (future, fn, args)
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = self._ctx.Pipe(duplex=False)
+        self._shutdown = False
+        self._thread = threading.Thread(target=self._run, name=f"{name}-supervisor", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            self._queue.append((fut, fn, args))
+            self._wake_w.send_bytes(b"")
+        return fut
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """
+        Running jobs finish (they are bounded by the timeout); queued ones too unless cancel_futures.
+        """
+        with self._lock:
+            if not self._shutdown:
+                self._shutdown = True
+                if cancel_futures:
+                    while self._queue:
+                        self._queue.popleft()[0].cancel()
+                self._wake_w.send_bytes(b"")
+        if wait:
+            self._thread.join()
+
+    # ---- supervisor thread ----
+    def _spawn(self) -> _Worker:
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_worker_main, args=(child,), name=f"{self.name}-worker", daemon=True)
+        proc.start()
+        child.close()
+        return _Worker(proc, parent)
+
+    def _stop(self, i: int, kill: bool = False) -> None:
+        w = self._workers[i]
+        self._workers[i] = None
+        if w is None:
+            return
+        if not kill:
+            try:
+                w.conn.send(None)
+            except OSError:
+                pass    # already gone (or already asked to exit)
+            w.proc.join(5)
+        if w.proc.is_alive():
+            w.proc.kill()
+        w.proc.join()
+        w.conn.close()
+
+    @staticmethod
+    def _exit_message(w: _Worker) -> str:
+        # Under forkserver the exit status arrives a moment after the pipe closes.
+        w.proc.join(1)
+        return f"worker exited with code {w.proc.exitcode}"
+
+    def _fail(self, i: int, reason: str, message: str) -> None:
+        w = self._workers[i]
+        fut = w.fut
+        self._stop(i, kill=True)
+        metrics.record_worker_event(self.name, reason)
+        fut.set_exception(WorkerError(reason, message))
+
+    def _dispatch(self) -> None:
+        for i in range(len(self._workers)):
+            w = self._workers[i]
+            if w is not None and w.fut is not None:
+                continue
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        return
+                    fut, fn, args = self._queue.popleft()
+                if fut.set_running_or_notify_cancel():
+                    break
+            if w is None or not w.proc.is_alive():
+                if w is not None:
+                    self._stop(i, kill=True)
+                w = self._workers[i] = self._spawn()
+            try:
+                w.conn.send((fn, args))
+            except Exception as e:
+                # Unpicklable job; the worker never saw it.
+                fut.set_exception(e)
+                continue
+            w.fut = fut
+            w.started = time.monotonic()
+            w.deadline = w.started + self.timeout_s if self.timeout_s else float("inf")
+
+    def _collect(self, i: int) -> None:
+        w = self._workers[i]
+        try:
+            ok, value, rss = w.conn.recv()
+        except (EOFError, OSError):
+            self._fail(i, "crash", self._exit_message(w))
+            return
+        fut, w.fut = w.fut, None
+        w.tasks += 1
+        if (self.max_tasks and w.tasks >= self.max_tasks) or (self.max_rss and rss and rss > self.max_rss):
+            self._stop(i)
+            metrics.record_worker_event(self.name, "recycle")
+        if ok:
+            fut.set_result(value)
+        else:
+            fut.set_exception(value)
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return self._shutdown and not self._queue and all(w is None or w.fut is None for w in self._workers)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                self._dispatch()
+                if self._idle():
+                    return
+                busy = [(i, w) for i, w in enumerate(self._workers) if w is not None and w.fut is not None]
+                timeout = None
+                if busy:
+                    timeout = max(0.0, min(POLL_S, min(w.deadline for _, w in busy) - time.monotonic()))
+                ready = wait_any([self._wake_r] + [w.conn for _, w in busy] + [w.proc.sentinel for _, w in busy], timeout)
+                if self._wake_r in ready:
+                    while self._wake_r.poll():
+                        self._wake_r.recv_bytes()
+                now = time.monotonic()
+                for i, w in busy:
+                    if w.conn.poll():
+                        self._collect(i)
+                    elif not w.proc.is_alive():
+                        self._fail(i, "crash", self._exit_message(w))
+                    elif now >= w.deadline:
+                        self._fail(i, "timeout", f"timed out after {self.timeout_s:g}s")
+                    elif self.max_rss:
+                        rss = rss_bytes(w.proc.pid)
+                        if rss and rss > self.max_rss:
+                            self._fail(i, "memory", f"worker RSS {rss // 2**20} MB over the {self.max_rss // 2**20} MB limit")
+        finally:
+            for i, w in enumerate(self._workers):
+                if w is not None and w.fut is not None:
+                    self._fail(i, "crash", "pool shut down")
+            # Ask every worker to exit first, then reap them, so they wind down in parallel.
+            for w in self._workers:
+                if w is not None:
+                    try:
+                        w.conn.send(None)
+                    except OSError:
+                        pass
+            for i in range(len(self._workers)):
+                self._stop(i)
+            # Only non-empty if the supervisor itself failed; never leave a caller waiting.
+            with self._lock:
+                self._shutdown = True
+                while self._queue:
+                    fut = self._queue.popleft()[0]
+                    if fut.set_running_or_notify_cancel():
+                        fut.set_exception(RuntimeError(f"{self.name} pool supervisor stopped"))
+
+_SHARED: Optional[SupervisedPool] = None
+_SHARED_LOCK = threading.Lock()
+
+def shared_pool() -> SupervisedPool:
+    """
+    Lazily created pool for in-process callers (the Upload page) that want extraction isolated.
+    """
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = SupervisedPool(SHARED_WORKERS)
+            atexit.register(_SHARED.shutdown, wait=False, cancel_futures=True)
+        return _SHARED
@@ -13,12 +13,38 @@ def _ensure_project_root_on_path():
 _ensure_project_root_on_path()
 
 import os
+import time
 import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
-from core.db import get_session, upsert_candidate
-from core.parser import parse_file_to_record, normalize_for_db
+from core.db import get_session
+from core.ingest import run_ingest
+from core.manifest import files_to_ingest, stage_counts
+from core.profiling import profile
+
+def _scan(inp: Path):
+    return sorted(list(inp.glob("*.pdf")) + list(inp.glob("*.docx")))
+
+def _settled(files, before: float):
+    # Leave files alone until they've stopped changing (still being copied in); drop ones that
+    # were removed since the scan.
+    out = []
+    for f in files:
+        try:
+            if f.stat().st_mtime < before:
+                out.append(f)
+        except OSError:
+            pass
+    return out
+
+def _ingest(session, files, args) -> None:
+    for res in run_ingest(session, [str(f) for f in files], workers=args.workers,
+                          llm_concurrency=args.llm_concurrency, store_batch=args.store_batch):
+        if res["status"] in ("failed", "quarantined"):
+            print(f"{res['status'].upper()}: {res['source_filename']}: {res['error']}")
+        else:
+            print(f"{res['status'].capitalize()}: {res['source_filename']} -> {res['resume_id']}")
 
 def main():
     load_dotenv()
@@ -27,22 +53,54 @@ def main():
 
     ap = argparse.ArgumentParser()
     ap.add_argument("--input_dir", required=True, help="Directory with PDF/DOCX resumes")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Extraction processes (0 = extract in-process)")
+    ap.add_argument("--llm-concurrency", type=int, default=4,
+                    help="Concurrent LLM provider calls")
+    ap.add_argument("--store-batch", type=int, default=200,
+                    help="Records per bulk-upsert transaction")
+    ap.add_argument("--resume", action="store_true",
+                    help="Skip files the ingest manifest already has as stored; retry failed/pending ones")
+    ap.add_argument("--retry-quarantined", action="store_true",
+                    help="With --resume/--watch, also retry files quarantined for timing out or exceeding the worker memory cap")
+    ap.add_argument("--watch", action="store_true",
+                    help="Keep running and ingest new files as they land in input_dir (implies --resume); "
+                         "files that fail are retried when they change or on restart")
+    ap.add_argument("--watch-interval", type=float, default=10.0, help="Seconds between directory scans")
+    ap.add_argument("--profile", action="store_true",
+                    help="Write per-stage cProfile, stack samples and per-file memory stats under PROFILE_DIR")
     args = ap.parse_args()
 
     inp = Path(args.input_dir)
-    files = list(inp.glob("*.pdf")) + list(inp.glob("*.docx"))
-    if not files:
+    files = _scan(inp)
+    if not files and not args.watch:
         print("No PDF/DOCX found.")
         return
 
-    for f in files:
-        try:
-            parsed, resume_text, rid = parse_file_to_record(str(f))
-            record = normalize_for_db(parsed, resume_text, source_filename=f.name)
-            upsert_candidate(session, record)
-            print(f"Parsed: {f.name} -> {rid}")
-        except Exception as e:
-            print(f"FAILED: {f.name}: {e}")
+    if args.resume or args.watch:
+        todo = files_to_ingest(session, [str(f) for f in files], retry_quarantined=args.retry_quarantined)
+        print(f"{len(files) - len(todo)} of {len(files)} files already stored; ingesting {len(todo)}")
+        files = todo
+    with profile("ingest", enabled=args.profile):
+        _ingest(session, files, args)
+        counts = stage_counts(session)
+        print(f"Manifest: {counts}")
+        if counts.get("quarantined"):
+            print(f"{counts['quarantined']} files quarantined; see scripts/quarantine_report.py")
+
+        if args.watch:
+            print(f"Watching {inp} (Ctrl+C to stop)")
+            try:
+                while True:
+                    time.sleep(args.watch_interval)
+                    # Failed files are left alone until they change, not retried on every scan.
+                    settled = _settled(_scan(inp), time.time() - args.watch_interval)
+                    todo = files_to_ingest(session, [str(f) for f in settled],
+                                           retry_quarantined=args.retry_quarantined, retry_failed=False)
+                    if todo:
+                        _ingest(session, todo, args)
+            except KeyboardInterrupt:
+                pass
 
 if __name__ == "__main__":
     main()
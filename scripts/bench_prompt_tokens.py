@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import argparse
+import json
+
+from core.schema import json_schema, schema_outline, schema_version
+from core.llm_providers.openai_compatible import build_payload
+
+# Prompt layout before the compact outline: full JSON schema pasted into every user message.
+LEGACY_SYSTEM_PROMPT = """You are an information extraction engine for resumes.
+Return ONLY valid JSON that matches the provided JSON schema. Do not add extra keys.
+Rules:
+- Do not guess. If missing, use null, empty string, or empty array as appropriate.
+- Always populate these objects even if values are empty: target_fit, summary, skills.
+- For target_fit.investment_approaches use only: Fundamental, Systematic (or empty).
+- For target_fit.geographic_markets use only: US, Europe, APAC (or empty).
+- Prefer short evidence snippets from the resume text for critical fields.
+- Keep lists de-duplicated.
+"""
+
+LEGACY_USER_PROMPT_TEMPLATE = """Extract a structured resume record from the text below.
+
+You MUST output JSON that conforms to this schema (JSON Schema):
+{schema}
+
+Resume text:
+\"\"\"{resume_text}\"\"\"
+"""
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +1 212 555 0100 | New York, NY
+Equity Research Analyst, Acme Capital (Jan 2020 - Present)
+- Built DCF and comps models for software and semiconductor coverage
+- Python, SQL, Bloomberg, FactSet
+Analyst, Big Bank (Jun 2017 - Dec 2019)
+MBA, Columbia Business School
+"""
+
+def _counter():
+    """
+    Exact counts with tiktoken when installed, else the ~4 chars/token estimate.
+    """
+    try:
+        import tiktoken
+        enc = tiktoken.get_encoding("cl100k_base")
+        return (lambda s: len(enc.encode(s))), "tiktoken/cl100k_base"
+    except Exception:
+        return (lambda s: len(s) // 4 + 1), "chars/4 estimate"
+
+def main():
+    ap = argparse.ArgumentParser(description="Prompt tokens per resume call: full JSON schema vs compact outline")
+    ap.add_argument("--resume_file", help="Plain-text resume to use instead of the built-in sample")
+    args = ap.parse_args()
+
+    resume_text = Path(args.resume_file).read_text(encoding="utf-8") if args.resume_file else SAMPLE_RESUME
+    count, method = _counter()
+
+    legacy_system = LEGACY_SYSTEM_PROMPT
+    legacy_user = LEGACY_USER_PROMPT_TEMPLATE.format(schema=json.dumps(json_schema()), resume_text=resume_text)
+
+    payload, _ = build_payload("bench", resume_text, json_schema())
+    system, user = payload["messages"][0]["content"], payload["messages"][1]["content"]
+
+    before = count(legacy_system) + count(legacy_user)
+    after = count(system) + count(user)
+    report = {
+        "schema_version": schema_version(),
+        "token_counter": method,
+        "resume_tokens": count(resume_text),
+        "before": {"system": count(legacy_system), "user": count(legacy_user), "total": before},
+        "after": {"system": count(system), "user": count(user), "total": after},
+        # Stable prefix = everything the provider can cache across calls (system prompt here).
+        "after_cacheable_prefix_tokens": count(system),
+        "saved_tokens": before - after,
+        "saved_pct": round(100.0 * (before - after) / before, 1) if before else 0.0,
+        "outline_chars": len(schema_outline()),
+        "json_schema_chars": len(json.dumps(json_schema())),
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import os
+import argparse
+import time
+from dotenv import load_dotenv
+
+from core.db import get_session
+from core.snapshot import DEFAULT_PATH, available, build_snapshot, sync_snapshot
+
+def main():
+    load_dotenv()
+    db_url = os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite")
+    session = get_session(db_url)
+
+    ap = argparse.ArgumentParser(description="Materialize candidates into a memory-mappable Arrow snapshot")
+    ap.add_argument("--path", default=DEFAULT_PATH, help="Snapshot file (default: SNAPSHOT_PATH)")
+    ap.add_argument("--full", action="store_true", help="Rewrite from the database instead of applying changes")
+    ap.add_argument("--chunk_size", type=int, default=5000)
+    args = ap.parse_args()
+
+    if not available():
+        print("pyarrow not installed (pip install pyarrow)")
+        return
+    t0 = time.perf_counter()
+    if args.full:
+        n = build_snapshot(session, args.path, chunk_size=args.chunk_size)
+        print(f"Wrote {n} candidates to {args.path} in {time.perf_counter() - t0:.1f}s")
+    else:
+        n = sync_snapshot(session, args.path, chunk_size=args.chunk_size)
+        print(f"Refreshed {n} changed candidates in {args.path} in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
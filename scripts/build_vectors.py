@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import os
+import argparse
+import time
+from dotenv import load_dotenv
+
+from core.db import get_session
+from core.vectors import VectorIndex, DEFAULT_DIR
+
+def main():
+    load_dotenv()
+    db_url = os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite")
+    session = get_session(db_url)
+
+    ap = argparse.ArgumentParser(description="Build or update the similar-candidates vector index")
+    ap.add_argument("--dir", default=DEFAULT_DIR, help="Vector index directory (default: VECTOR_DIR)")
+    ap.add_argument("--rebuild", action="store_true", help="Refit IDF and re-embed every candidate")
+    args = ap.parse_args()
+
+    index = VectorIndex(args.dir).reload_if_changed()
+    t0 = time.perf_counter()
+    if args.rebuild:
+        n = index.build(session)
+        print(f"Embedded {n} candidates into {index.dir} in {time.perf_counter() - t0:.1f}s")
+    else:
+        n = index.sync(session)
+        print(f"Embedded {n} new/changed candidates ({index.count} total) in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import argparse
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from core.llm_providers.openai_compatible import OpenAICompatibleProvider
+from core.llm_providers.openai_async import AsyncOpenAICompatibleProvider
+from scripts.stub_llm_server import make_handler
+
+# Scripted check of the HTTP providers' retry policy against the stub endpoint (no API key, ~15s):
+#   python scripts/check_llm_retries.py
+# Each scenario starts a stub that answers the first requests with fixed statuses, then checks how
+# many requests the provider made, how long it waited and whether it succeeded. Exits 1 on failure.
+
+RESUME = "Jane Doe\njane@example.com\nQuantitative researcher, 6 years, Python, equities.\n"
+
+# name, scripted statuses, Retry-After on 429s, max_retries, succeeds, requests made, min/max seconds
+SCENARIOS = [
+    ("429 waits for Retry-After", "429", 1.5, 5, True, 2, 1.5, 3.5),
+    ("503 backs off and retries", "503,503", 1.0, 5, True, 3, 0.0, 3.5),
+    ("409 is not retried", "409", 1.0, 5, False, 1, 0.0, 0.5),
+    ("gives up after max_retries", "429,429,429", 0.0, 2, False, 3, 0.0, 3.5),
+]
+
+def _stub(script: str, retry_after: float):
+    args = argparse.Namespace(latency_ms=0.0, rpm=0, throttle_rate=0.0, error_rate=0.0, verbose=False,
+                              script=script, retry_after=retry_after)
+    handler, stats = make_handler(args)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+def run(kind: str, name: str, script: str, retry_after: float, max_retries: int, succeeds: bool,
+        requests: int, min_s: float, max_s: float) -> bool:
+    server, stats = _stub(script, retry_after)
+    base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    cls = OpenAICompatibleProvider if kind == "sync" else AsyncOpenAICompatibleProvider
+    provider = cls(api_base=base, api_key="x", model="stub", timeout_s=10, max_retries=max_retries)
+    t0 = time.perf_counter()
+    try:
+        provider.parse_resume("check", RESUME, {})
+        outcome = "ok"
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        outcome = f"HTTP {status}" if status else f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - t0
+    if kind == "async":
+        provider.close()
+    server.shutdown()
+    server.server_close()
+
+    made = sum(stats.values())
+    problems = []
+    if (outcome == "ok") != succeeds:
+        problems.append(f"expected {'success' if succeeds else 'an error'}")
+    if made != requests:
+        problems.append(f"expected {requests} requests")
+    if not min_s <= elapsed <= max_s:
+        problems.append(f"expected {min_s:g}-{max_s:g}s")
+    print(f"{'FAIL' if problems else 'PASS'} [{kind}] {name}: {outcome}, {made} requests in {elapsed:.2f}s"
+          + (f" ({'; '.join(problems)})" if problems else ""))
+    return not problems
+
+def main():
+    ap = argparse.ArgumentParser(description="Check LLM provider retries (429/Retry-After, backoff, non-retryable statuses) against the stub endpoint")
+    ap.add_argument("--provider", choices=["sync", "async", "both"], default="both")
+    args = ap.parse_args()
+
+    kinds = ["sync", "async"] if args.provider == "both" else [args.provider]
+    ok = all([run(kind, *scenario) for kind in kinds for scenario in SCENARIOS])
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
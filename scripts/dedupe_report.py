@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import os, json
+import argparse
+import csv
+from dotenv import load_dotenv
+
+from core.db import get_session
+from core.cache import resume_id_for_hash
+from core.text_store import iter_texts
+from core import dedupe
+
+def main():
+    load_dotenv()
+    db_url = os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite")
+    session = get_session(db_url)
+
+    ap = argparse.ArgumentParser(description="Near-duplicate resume clusters (MinHash/LSH)")
+    ap.add_argument("--backfill", action="store_true", help="Index signatures for stored texts ingested before dedupe existed")
+    ap.add_argument("--min_size", type=int, default=2)
+    ap.add_argument("--out_csv", help="Write one row per cluster member")
+    ap.add_argument("--out_json", help="Write clusters as JSON")
+    args = ap.parse_args()
+
+    if args.backfill:
+        n = 0
+        for file_hash, text in iter_texts(session):
+            dedupe.index_signature(session, file_hash, resume_id_for_hash(file_hash), dedupe.minhash(text))
+            n += 1
+            if n % 500 == 0:
+                session.commit()
+        session.commit()
+        print(f"Indexed signatures for {n} stored texts")
+
+    clusters = dedupe.duplicate_clusters(session, min_size=args.min_size)
+    members = sum(len(c["members"]) for c in clusters)
+    print(f"{len(clusters)} duplicate clusters covering {members} files")
+    for c in clusters[:20]:
+        names = ", ".join(m["source_filename"] or m["file_sha256"][:12] for m in c["members"])
+        print(f"  {c['resume_id']} ({len(c['members'])}): {names}")
+
+    if args.out_json:
+        with open(args.out_json, "w", encoding="utf-8") as f:
+            json.dump(clusters, f, indent=2)
+    if args.out_csv:
+        with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["cluster", "resume_id", "file_sha256", "source_filename", "similarity"])
+            for c in clusters:
+                for m in c["members"]:
+                    w.writerow([c["resume_id"], m["resume_id"], m["file_sha256"], m["source_filename"], m["similarity"]])
+
+if __name__ == "__main__":
+    main()
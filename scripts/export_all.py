@@ -12,11 +12,69 @@ def _ensure_project_root_on_path():
 
 _ensure_project_root_on_path()
 
-import os, json
+import os
 import argparse
-import pandas as pd
+import csv
+import time
+from urllib.parse import quote
 from dotenv import load_dotenv
-from core.db import get_session, query_candidates, get_candidate_json
+from core.db import get_session, iter_candidate_rows
+from core.snapshot import SOURCE_COLUMNS, arrow_schema, to_records
+from core.profiling import profile, stage
+
+# Streaming export: candidates are read in keyset-paginated chunks and each chunk is written to
+# JSONL (parsed_json verbatim, no decode/re-encode), CSV and Parquet before the next is read.
+
+CSV_COLUMNS = [
+    ("resume_id", "resume_id"), ("name", "full_name"), ("geo_market", "geo_market"),
+    ("approach", "approach"), ("years_experience", "years_experience"), ("source_filename", "source_filename"),
+]
+
+class _ParquetSink:
+    """
+    One ParquetWriter per output file (per geo_market when partitioned), fed a row group per chunk.
+    Partition files leave out geo_market: readers take it from the directory name, and a copy in the
+    file would clash with the dictionary-typed partition column. Rows without a geo_market go to a
+    file at the dataset root, which readers give a null geo_market (pandas cannot yet read a
+    __HIVE_DEFAULT_PARTITION__ directory: "Cannot yet unify dictionaries with nulls").
+    """
+    def __init__(self, out: str, partition: bool):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa, self.pq = pa, pq
+        self.schema = arrow_schema()
+        if partition:
+            self.schema = self.schema.remove(self.schema.get_field_index("geo_market"))
+        self.out = Path(out)
+        self.partition = partition
+        self.writers = {}
+
+    def _writer(self, key):
+        w = self.writers.get(key)
+        if w is None:
+            if self.partition and key is None:
+                path = self.out / "part-null.parquet"
+            elif self.partition:
+                path = self.out / f"geo_market={quote(key, safe='')}" / "part-0.parquet"
+            else:
+                path = self.out
+            path.parent.mkdir(parents=True, exist_ok=True)
+            w = self.writers[key] = self.pq.ParquetWriter(str(path), self.schema, compression="zstd")
+        return w
+
+    def write(self, rows):
+        if not self.partition:
+            groups = {None: rows}
+        else:
+            groups = {}
+            for r in rows:
+                groups.setdefault(r.pop("geo_market") or None, []).append(r)
+        for key, group in groups.items():
+            self._writer(key).write_table(self.pa.Table.from_pylist(group, schema=self.schema))
+
+    def close(self):
+        for w in self.writers.values():
+            w.close()
 
 def main():
     load_dotenv()
@@ -26,24 +84,46 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--out_csv", default="all_candidates.csv")
     ap.add_argument("--out_jsonl", default="all_candidates.jsonl")
+    ap.add_argument("--out_parquet", default="all_candidates.parquet", help="Parquet file, or dataset dir with --partition_by_geo ('' to skip)")
+    ap.add_argument("--partition_by_geo", action="store_true", help="Write a hive-partitioned Parquet dataset by geo_market")
+    ap.add_argument("--chunk_size", type=int, default=5000)
+    ap.add_argument("--profile", action="store_true", help="Write cProfile/stack samples for the read and write stages under PROFILE_DIR")
     args = ap.parse_args()
 
-    recs = query_candidates(session=session, limit=100000)
-    rows=[]
-    with open(args.out_jsonl, "w", encoding="utf-8") as f:
-        for r in recs:
-            cand = get_candidate_json(session, r.resume_id)
-            f.write(json.dumps(cand, ensure_ascii=False) + "\n")
-            rows.append({
-                "resume_id": r.resume_id,
-                "name": r.full_name,
-                "geo_market": r.geo_market,
-                "approach": r.approach,
-                "years_experience": r.years_experience,
-                "source_filename": r.source_filename,
-            })
-    pd.DataFrame(rows).to_csv(args.out_csv, index=False)
-    print(f"Wrote {args.out_csv} and {args.out_jsonl}")
+    sink = None
+    if args.out_parquet:
+        try:
+            sink = _ParquetSink(args.out_parquet, args.partition_by_geo)
+        except ImportError:
+            print("pyarrow not installed; skipping Parquet output (pip install pyarrow)")
+
+    columns = SOURCE_COLUMNS + ["parsed_json"]
+    t0 = time.perf_counter()
+    n = 0
+    try:
+        with profile("export", enabled=args.profile), open(args.out_jsonl, "w", encoding="utf-8") as fj, \
+                open(args.out_csv, "w", newline="", encoding="utf-8") as fc:
+            writer = csv.writer(fc)
+            writer.writerow([name for name, _ in CSV_COLUMNS])
+            chunks = iter_candidate_rows(session, columns, chunk_size=args.chunk_size)
+            while True:
+                with stage("read"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                with stage("write"):
+                    rows = [dict(zip(columns, r)) for r in chunk]
+                    fj.write("\n".join(r["parsed_json"] for r in rows))
+                    fj.write("\n")
+                    writer.writerows([[r[col] for _, col in CSV_COLUMNS] for r in rows])
+                    if sink is not None:
+                        sink.write(to_records([r[:len(SOURCE_COLUMNS)] for r in chunk]))
+                n += len(rows)
+    finally:
+        if sink is not None:
+            sink.close()
+    outputs = [args.out_csv, args.out_jsonl] + ([args.out_parquet] if sink is not None else [])
+    print(f"Wrote {n} candidates to {', '.join(outputs)} in {time.perf_counter() - t0:.1f}s")
 
 if __name__ == "__main__":
     main()
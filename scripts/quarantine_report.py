@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import os, json
+import argparse
+import csv
+from collections import Counter
+from dotenv import load_dotenv
+
+from core.db import get_session
+from core.manifest import quarantined_files
+
+FIELDS = ["path", "reason", "error", "attempts", "size", "file_sha256", "updated_at"]
+
+def main():
+    load_dotenv()
+    db_url = os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite")
+    session = get_session(db_url)
+
+    ap = argparse.ArgumentParser(description="Files quarantined by ingest (extraction timed out, hit the memory cap or crashed its worker)")
+    ap.add_argument("--out_csv", help="Write one row per quarantined file")
+    ap.add_argument("--out_json", help="Write quarantined files as JSON")
+    args = ap.parse_args()
+
+    rows = []
+    for f in quarantined_files(session):
+        # Errors read "extract <reason>: <detail>" (see core/ingest.py).
+        reason = (f.error or "").split(":", 1)[0].replace("extract ", "") or "unknown"
+        rows.append({"path": f.path, "reason": reason, "error": f.error, "attempts": f.attempts,
+                     "size": f.size, "file_sha256": f.file_sha256, "updated_at": f.updated_at})
+
+    by_reason = Counter(r["reason"] for r in rows)
+    print(f"{len(rows)} quarantined files" + (f" ({', '.join(f'{k}: {n}' for k, n in by_reason.most_common())})" if rows else ""))
+    for r in rows[:50]:
+        print(f"  [{r['reason']}] {r['path']} ({r['size'] or '?'} bytes, {r['attempts']} attempts): {r['error']}")
+    if rows:
+        print("Retry them with: scripts/batch_ingest.py --resume --retry-quarantined")
+
+    if args.out_json:
+        with open(args.out_json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    if args.out_csv:
+        with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import os
+from dotenv import load_dotenv
+
+from core.db import get_session, rebuild_facets, rebuild_fts, rebuild_cube, fts_enabled
+
+def main():
+    """
+    Rebuild tables derived from `candidates` (needed once for DBs created before they existed).
+    """
+    load_dotenv()
+    db_url = os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite")
+    session = get_session(db_url)
+
+    n = rebuild_facets(session)
+    print(f"Facet tables rebuilt for {n} candidates")
+    n = rebuild_cube(session)
+    print(f"Insights cube recounted over {n} candidates")
+    if fts_enabled(session):
+        n = rebuild_fts(session)
+        print(f"FTS5 keyword index rebuilt for {n} candidates")
+    else:
+        print("FTS5 not available in this SQLite build; keyword search uses LIKE")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import os
+import argparse
+from dotenv import load_dotenv
+
+from core.db import get_session
+from core.ingest import reparse_corpus
+from core.text_store import count_texts
+
+def main():
+    """
+    Re-parse every stored resume text with the current LLM_PROVIDER / schema.
+    No PDF/DOCX is re-opened; see core/text_store.py.
+    """
+    load_dotenv()
+    db_url = os.getenv("DB_URL", "sqlite:///data/db/candidates.sqlite")
+    session = get_session(db_url)
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent LLM provider calls")
+    args = ap.parse_args()
+
+    print(f"Re-parsing {count_texts(session)} stored texts")
+    for res in reparse_corpus(session, llm_concurrency=args.llm_concurrency):
+        if res["status"] == "failed":
+            print(f"FAILED: {res['source_filename']}: {res['error']}")
+        else:
+            print(f"{res['status'].capitalize()}: {res['source_filename']} -> {res['resume_id']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import sys
+from pathlib import Path
+
+def _ensure_project_root_on_path():
+    here = Path(__file__).resolve()
+    # Walk up until we find the project root containing 'core/'
+    for p in [here] + list(here.parents):
+        if (p / "core").exists():
+            if str(p) not in sys.path:
+                sys.path.insert(0, str(p))
+            return
+
+_ensure_project_root_on_path()
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.llm_providers.mock import MockProvider
+
+# Local stand-in for an OpenAI-compatible /chat/completions endpoint, for exercising the
+# HTTP providers (pooling, retries, Retry-After, rate limits) without a real API key:
+#   python scripts/stub_llm_server.py --port 8808 --latency-ms 300 --rpm 120
+#   LLM_PROVIDER=openai_compatible_async LLM_API_BASE=http://127.0.0.1:8808/v1 LLM_API_KEY=x LLM_MODEL=stub
+# --script 429,503,409 answers the first requests with those statuses, in order (429s carry
+# Retry-After: --retry-after); scripts/check_llm_retries.py uses it to check the retry policy.
+
+_RESUME_RE = re.compile(r'"""(.*)"""', re.DOTALL)
+
+class _Window:
+    """
+    Server-side requests-per-minute quota over a sliding 60s window.
+    """
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.hits = []
+        self.lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        if not self.rpm:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.hits = [t for t in self.hits if now - t < 60]
+            if len(self.hits) >= self.rpm:
+                return 60 - (now - self.hits[0])
+            self.hits.append(now)
+            return 0.0
+
+def make_handler(args):
+    provider = MockProvider()
+    window = _Window(args.rpm)
+    script = deque(int(s) for s in args.script.split(",") if s.strip())
+    stats = {"ok": 0, "throttled": 0, "errors": 0, "scripted": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is visible
+
+        def log_message(self, fmt, *a):
+            if args.verbose:
+                super().log_message(fmt, *a)
+
+        def _send(self, status: int, body: dict, headers: dict | None = None):
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": "not found"})
+                return
+
+            with lock:
+                forced = script.popleft() if script else None
+                if forced is not None:
+                    stats["scripted"] += 1
+            if forced is not None:
+                self._send(forced, {"error": f"scripted {forced}"},
+                           {"Retry-After": f"{args.retry_after:g}"} if forced == 429 else None)
+                return
+
+            wait = window.retry_after()
+            if wait or random.random() < args.throttle_rate:
+                with lock:
+                    stats["throttled"] += 1
+                self._send(429, {"error": "rate limited"}, {"Retry-After": f"{max(wait, 1):.0f}"})
+                return
+            if random.random() < args.error_rate:
+                with lock:
+                    stats["errors"] += 1
+                self._send(503, {"error": "unavailable"})
+                return
+
+            time.sleep(args.latency_ms / 1000.0)
+            messages = body.get("messages") or []
+            prompt = "\n".join(m.get("content", "") for m in messages)
+            m = _RESUME_RE.search(messages[-1].get("content", "") if messages else "")
+            resume_text = m.group(1) if m else ""
+            parsed = provider.parse_resume(resume_id="stub", resume_text=resume_text, schema={})
+            content = json.dumps(parsed)
+            with lock:
+                stats["ok"] += 1
+            self._send(200, {
+                "id": "stub",
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": (len(prompt) + len(content)) // 4,
+                },
+            })
+
+    return Handler, stats
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8808)
+    ap.add_argument("--latency-ms", type=float, default=200.0, help="Simulated model latency per request")
+    ap.add_argument("--rpm", type=int, default=0, help="Enforced requests/minute quota (0 = none)")
+    ap.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    ap.add_argument("--script", default="", help="Statuses for the first requests, in order (e.g. 429,503,409)")
+    ap.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on scripted 429s")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    handler, stats = make_handler(args)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Stub LLM endpoint on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served: {stats}")
+
+if __name__ == "__main__":
+    main()